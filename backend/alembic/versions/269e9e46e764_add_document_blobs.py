@@ -0,0 +1,47 @@
+"""add document blobs
+
+Revision ID: 269e9e46e764
+Revises: ff7654b527dd
+Create Date: 2026-10-17 16:12:40.118592
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '269e9e46e764'
+down_revision = 'ff7654b527dd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('document_blobs',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('storage_path', sa.String(), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('sha256', name=op.f('pk_document_blobs'))
+    )
+
+    # Documents hashed before this revision keep their own files; the first one
+    # becomes the blob that later uploads of the same bytes reuse
+    op.execute(
+        "INSERT INTO document_blobs (sha256, storage_path, size, ref_count) "
+        "SELECT content_sha256, min(file_path), max(file_size), count(*) "
+        "FROM documents WHERE content_sha256 IS NOT NULL "
+        "GROUP BY content_sha256"
+    )
+
+    op.create_foreign_key(
+        op.f('fk_documents_content_sha256_document_blobs'),
+        'documents', 'document_blobs',
+        ['content_sha256'], ['sha256']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(op.f('fk_documents_content_sha256_document_blobs'), 'documents', type_='foreignkey')
+    op.drop_table('document_blobs')
@@ -0,0 +1,24 @@
+"""add claim version
+
+Revision ID: 3f9a6c1e8b27
+Revises: 7c2e41b9d5a3
+Create Date: 2026-10-17 19:22:05.841390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a6c1e8b27'
+down_revision = '7c2e41b9d5a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('claims', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('claims', 'version')
@@ -0,0 +1,24 @@
+"""add document processing attempts
+
+Revision ID: 5d1e7a3c9f42
+Revises: 3f9a6c1e8b27
+Create Date: 2026-10-17 20:05:13.274518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d1e7a3c9f42'
+down_revision = '3f9a6c1e8b27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('documents', sa.Column('processing_attempts', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('documents', 'processing_attempts')
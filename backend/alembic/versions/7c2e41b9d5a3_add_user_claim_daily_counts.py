@@ -0,0 +1,42 @@
+"""add user claim daily counts
+
+Revision ID: 7c2e41b9d5a3
+Revises: 269e9e46e764
+Create Date: 2026-10-17 18:40:21.503117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '7c2e41b9d5a3'
+down_revision = '269e9e46e764'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('user_claim_daily_counts',
+    sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('claim_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_user_claim_daily_counts_user_id_users')),
+    sa.PrimaryKeyConstraint('user_id', 'day', name=op.f('pk_user_claim_daily_counts'))
+    )
+
+    # Counters for the claims created before this revision; the ORM listeners
+    # keep them up to date from here on
+    op.execute(
+        "INSERT INTO user_claim_daily_counts (user_id, day, claim_count) "
+        "SELECT user_id, (created_at AT TIME ZONE 'UTC')::date, count(*) "
+        "FROM claims GROUP BY 1, 2"
+    )
+
+    op.create_index('ix_claims_user_id_created_at', 'claims', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_claims_user_id_created_at', table_name='claims')
+    op.drop_table('user_claim_daily_counts')
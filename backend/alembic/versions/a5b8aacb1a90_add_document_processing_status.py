@@ -0,0 +1,39 @@
+"""add document processing status
+
+Revision ID: a5b8aacb1a90
+Revises: d9b4789ca8b5
+Create Date: 2026-10-17 15:41:52.208317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5b8aacb1a90'
+down_revision = 'd9b4789ca8b5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing documents were analysed during upload
+    op.add_column('documents', sa.Column('processing_status', sa.String(), server_default='completed', nullable=False))
+    op.add_column('documents', sa.Column('processing_error', sa.Text(), nullable=True))
+    op.add_column('documents', sa.Column('processing_started_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('documents', sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'ix_documents_processing_queue',
+        'documents',
+        ['created_at'],
+        unique=False,
+        postgresql_where=sa.text("processing_status IN ('pending', 'processing')")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_documents_processing_queue', table_name='documents')
+    op.drop_column('documents', 'processed_at')
+    op.drop_column('documents', 'processing_started_at')
+    op.drop_column('documents', 'processing_error')
+    op.drop_column('documents', 'processing_status')
@@ -0,0 +1,45 @@
+"""add phash int and band columns
+
+Revision ID: d9b4789ca8b5
+Revises: d12da06cf9f2
+Create Date: 2026-10-17 15:24:10.512803
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9b4789ca8b5'
+down_revision = 'd12da06cf9f2'
+branch_labels = None
+depends_on = None
+
+BAND_COUNT = 4
+BAND_BITS = 16
+
+
+def upgrade() -> None:
+    op.add_column('documents', sa.Column('phash_int', sa.BigInteger(), nullable=True))
+    for band in range(BAND_COUNT):
+        op.add_column('documents', sa.Column(f'phash_band_{band}', sa.Integer(), nullable=True))
+        op.create_index(op.f(f'ix_documents_phash_band_{band}'), 'documents', [f'phash_band_{band}'], unique=False)
+
+    # Backfill from the hex strings: left-pad to 64 bits and reinterpret as a signed bigint
+    op.execute(
+        "UPDATE documents "
+        "SET phash_int = ('x' || lpad(phash, 16, '0'))::bit(64)::bigint "
+        "WHERE phash ~ '^[0-9a-fA-F]{1,16}$'"
+    )
+    band_assignments = ", ".join(
+        f"phash_band_{band} = (phash_int >> {band * BAND_BITS}) & {(1 << BAND_BITS) - 1}"
+        for band in range(BAND_COUNT)
+    )
+    op.execute(f"UPDATE documents SET {band_assignments} WHERE phash_int IS NOT NULL")
+
+
+def downgrade() -> None:
+    for band in reversed(range(BAND_COUNT)):
+        op.drop_index(op.f(f'ix_documents_phash_band_{band}'), table_name='documents')
+        op.drop_column('documents', f'phash_band_{band}')
+    op.drop_column('documents', 'phash_int')
@@ -0,0 +1,27 @@
+"""add document content sha256
+
+Revision ID: ff7654b527dd
+Revises: a5b8aacb1a90
+Create Date: 2026-10-17 15:58:06.731420
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ff7654b527dd'
+down_revision = 'a5b8aacb1a90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing rows stay NULL; their digest was never computed
+    op.add_column('documents', sa.Column('content_sha256', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_documents_content_sha256'), 'documents', ['content_sha256'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_documents_content_sha256'), table_name='documents')
+    op.drop_column('documents', 'content_sha256')
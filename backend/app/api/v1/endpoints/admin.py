@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, status
+
+from app.dependencies import require_admin_key
+from app.schemas.admin import RescoreJobResponse, RescoreRequest
+from app.services import fraud_rescore_service
+
+router = APIRouter(dependencies=[Depends(require_admin_key)])
+
+
+@router.post("/fraud/rescore", response_model=RescoreJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def start_fraud_rescore(payload: RescoreRequest):
+    """
+    Re-score fraud for all claims in the given statuses (open claims by
+    default) with the current rules, in the background. Poll the job for
+    progress and the summary of score changes.
+    """
+    job = fraud_rescore_service.start_rescore_job(
+        payload.statuses,
+        chunk_size=payload.chunk_size,
+        workers=payload.workers,
+        dry_run=payload.dry_run
+    )
+    return job.to_dict()
+
+
+@router.get("/fraud/rescore/{job_id}", response_model=RescoreJobResponse)
+def get_fraud_rescore(job_id: str):
+    """Status, progress and score change summary of a re-scoring job."""
+    return fraud_rescore_service.get_rescore_job(job_id).to_dict()
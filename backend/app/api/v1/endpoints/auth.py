@@ -1,12 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dependencies import get_db, get_current_user
+from app.dependencies import get_async_db, get_current_user
 from app.schemas.auth import RegisterRequest, LoginRequest, TokenResponse
 from app.schemas.user import UserResponse
 from app.models.user import User
-from app.utils.security import hash_password, verify_password, create_access_token, sanitize_phone
+from app.utils.security import (
+    hash_password_async,
+    verify_and_update_password_async,
+    create_access_token,
+    sanitize_phone
+)
 from app.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -17,7 +23,7 @@ router = APIRouter(tags=["Auth"])
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
 async def register(
     request: RegisterRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> TokenResponse:
     # Sanitize phone number
     clean_phone = sanitize_phone(request.phone)
@@ -33,7 +39,8 @@ async def register(
     """
 
     # Check if phone already exists
-    existing_user = db.query(User).filter(User.phone == clean_phone).first()
+    result = await db.execute(select(User).where(User.phone == clean_phone))
+    existing_user = result.scalar_one_or_none()
     if existing_user:
         logger.warning(f"Registration attempt with existing phone: {clean_phone}")
         raise HTTPException(
@@ -41,8 +48,8 @@ async def register(
             detail="Phone number already registered"
         )
 
-    # Hash password
-    password_hash = hash_password(request.password)
+    # Hash password (bcrypt is deliberately slow: bounded pool, 429 when saturated)
+    password_hash = await hash_password_async(request.password)
 
     # Create new user
     new_user = User(
@@ -55,11 +62,11 @@ async def register(
 
     try:
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        await db.refresh(new_user)
         logger.info(f"New user registered: {new_user.id}")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Failed to create user: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -75,7 +82,7 @@ async def register(
 @router.post("/login", response_model=TokenResponse)
 async def login(
     request: LoginRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> TokenResponse:
     # Sanitize phone number
     clean_phone = sanitize_phone(request.phone)
@@ -91,7 +98,8 @@ async def login(
     password = request.password
 
     # Find user by phone
-    user = db.query(User).filter(User.phone == clean_phone).first()
+    result = await db.execute(select(User).where(User.phone == clean_phone))
+    user = result.scalar_one_or_none()
 
     if not user:
         logger.warning(f"Login attempt with non-existent phone: {clean_phone}")
@@ -102,7 +110,8 @@ async def login(
         )
 
     # Verify password
-    if not verify_password(password, user.password_hash):
+    valid, new_hash = await verify_and_update_password_async(password, user.password_hash)
+    if not valid:
         logger.warning(f"Failed login attempt for user: {user.id}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -110,6 +119,16 @@ async def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Upgrade the stored hash when BCRYPT_ROUNDS changed since it was made
+    if new_hash:
+        user.password_hash = new_hash
+        try:
+            await db.commit()
+            logger.info(f"Rehashed password for user: {user.id}")
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Failed to rehash password for user {user.id}: {str(e)}")
+
     # Generate JWT token
     access_token = create_access_token(data={"sub": str(user.id)})
 
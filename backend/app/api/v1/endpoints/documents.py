@@ -5,20 +5,20 @@ from uuid import UUID
 
 from app.dependencies import get_db, get_current_user
 from app.models.user import User
-from app.schemas.document import DocumentUploadResponse, DocumentListResponse
+from app.schemas.document import DocumentUploadResponse, DocumentListResponse, DocumentStatusResponse
 from app.services import document_service
 
 router = APIRouter()
 
 @router.post("/claims/{claim_id}/documents", response_model=DocumentUploadResponse, status_code=status.HTTP_201_CREATED)
-def upload_document(
+async def upload_document(
     claim_id: UUID,
     document_type: str = Form(...),
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return document_service.upload_document(db, current_user, claim_id, document_type, file)
+    return await document_service.upload_document(db, current_user, claim_id, document_type, file)
 
 @router.get("/claims/{claim_id}/documents", response_model=List[DocumentUploadResponse])
 def list_documents(
@@ -27,3 +27,19 @@ def list_documents(
     current_user: User = Depends(get_current_user)
 ):
     return document_service.list_documents_for_claim(db, current_user, claim_id)
+
+@router.get("/documents/{document_id}/status", response_model=DocumentStatusResponse)
+def get_document_status(
+    document_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    return document_service.get_document_for_user(db, current_user, document_id)
+
+@router.post("/documents/{document_id}/reprocess", response_model=DocumentStatusResponse)
+async def reprocess_document(
+    document_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    return await document_service.reprocess_document(db, current_user, document_id)
@@ -1,15 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from sqlalchemy.orm import Session
-from pathlib import Path
-import mimetypes
-from starlette.responses import FileResponse
 from typing import Optional
+from datetime import datetime, timezone
+from uuid import UUID
+from starlette.concurrency import run_in_threadpool
+import os
+import time
 
+from app.config import settings
 from app.dependencies import get_db, get_current_user
 from app.models.user import User
 from app.models.document import Document
-from app.config import settings
+from app.schemas.document import SignedUrlListResponse, SignedUrlResponse
+from app.services import rendition_service
+from app.storage import get_storage, storage_key
 from app.utils.security import sanitize_file_path
+from app.utils.constants import RENDITION_SIZES
+from app.utils.file_response import cached_file_response, document_file_response, stored_file_response
+from app.utils.renditions import RENDITION_MEDIA_TYPES
+from app.utils.signed_urls import sign_document, verify_token
 
 router = APIRouter()
 
@@ -19,8 +28,11 @@ def verify_user_can_access_document(db: Session, current_user: User, file_path:
     Verify that the current user has access to the requested document.
     Checks that the file_path corresponds to a document that belongs to a claim owned by the user.
     Works without model relationships to avoid circular imports.
+    
+    Content-addressed blobs are shared, so several documents (possibly of
+    different users) can have the same file_path; ownership is part of the lookup.
     """
-    # Extract claim_id from file_path (format: uploads/<claim_id>/filename)
+    # Stored paths look like uploads/blobs/<aa>/<sha256><ext> (or uploads/<claim_id>/filename)
     path_parts = file_path.split('/')
     if len(path_parts) < 3 or path_parts[0] != 'uploads':
         raise HTTPException(
@@ -28,143 +40,187 @@ def verify_user_can_access_document(db: Session, current_user: User, file_path:
             detail="Invalid file path format"
         )
     
-    claim_id_str = path_parts[1]
+    # Find a document with this file_path on a claim owned by the current user
+    from app.models.claim import Claim  # Import locally to avoid circular imports
+    document = db.query(Document).join(Claim, Claim.id == Document.claim_id).filter(
+        Document.file_path == file_path,
+        Claim.user_id == current_user.id
+    ).first()
     
-    # First, find the document by file_path
-    document = db.query(Document).filter(Document.file_path == file_path).first()
     if not document:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document not found"
         )
     
-    # Verify the claim exists and belongs to the current user
+    return document
+
+
+def get_accessible_document(db: Session, current_user: User, document_id: str) -> Document:
+    """
+    Load a document on a claim owned by the current user (one joined query).
+    Documents of other users are reported as not found.
+    """
     from app.models.claim import Claim  # Import locally to avoid circular imports
-    claim = db.query(Claim).filter(
-        Claim.id == document.claim_id,
+    document = db.query(Document).join(Claim, Claim.id == Document.claim_id).filter(
+        Document.id == document_id,
         Claim.user_id == current_user.id
     ).first()
     
-    if not claim:
+    if not document:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied or file not found"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
         )
     
     return document
 
 
-@router.get("/files/{document_id}/view")
-def view_document(
-    document_id: str,
+@router.get("/claims/{claim_id}/signed-urls", response_model=SignedUrlListResponse)
+def get_claim_signed_urls(
+    claim_id: UUID,
+    request: Request,
+    disposition: str = Query(default="inline", pattern="^(inline|attachment)$"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    View a document by document ID.
-    Returns the file with inline Content-Disposition for browser preview.
+    Issue short-lived signed URLs for all documents of a claim.
+    Ownership is checked once here; the URLs are then served without
+    authentication or database access until they expire (SIGNED_URL_EXPIRE_SECONDS).
+    Storage backends that can presign (S3) return direct object URLs instead.
     """
-    # Get document by ID and verify ownership without using relationships
-    document = db.query(Document).filter(Document.id == document_id).first()
-    if not document:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Document not found"
-        )
-    
-    # Verify the claim exists and belongs to the current user
     from app.models.claim import Claim  # Import locally to avoid circular imports
-    claim = db.query(Claim).filter(
-        Claim.id == document.claim_id,
-        Claim.user_id == current_user.id
-    ).first()
-    
+    claim = db.query(Claim).filter(Claim.id == claim_id, Claim.user_id == current_user.id).first()
     if not claim:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Claim not found"
         )
-    
-    # Construct the full file path
-    full_file_path = Path(settings.UPLOAD_DIR) / document.file_path
-    
-    # Check if file exists
-    if not full_file_path.exists():
+
+    documents = db.query(Document)\
+        .filter(Document.claim_id == claim.id)\
+        .order_by(Document.created_at)\
+        .all()
+
+    storage = get_storage()
+    expires_in = settings.SIGNED_URL_EXPIRE_SECONDS
+    urls = []
+    for document in documents:
+        token, expires_at = sign_document(document, disposition, expires_in)
+        url = storage.presign(storage_key(document.file_path), expires_in, document.file_name, disposition) \
+            or request.app.url_path_for("serve_signed_file", token=token)
+        urls.append(SignedUrlResponse(
+            document_id=document.id,
+            document_type=document.document_type,
+            file_name=document.file_name,
+            mime_type=document.mime_type,
+            url=str(url),
+            expires_at=datetime.fromtimestamp(expires_at, tz=timezone.utc)
+        ))
+
+    return SignedUrlListResponse(claim_id=claim.id, urls=urls)
+
+
+@router.get("/signed/{token}", name="serve_signed_file")
+def serve_signed_file(token: str, request: Request):
+    """
+    Serve a file from a signed URL issued by get_claim_signed_urls.
+    Only the signature and expiry are checked: no token, user or document lookup.
+    """
+    signed = verify_token(token)
+    if signed is None:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="File not found on disk"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid or expired link"
         )
-    
-    # Determine content type
-    content_type, _ = mimetypes.guess_type(str(full_file_path))
-    if not content_type:
-        content_type = "application/octet-stream"
+
+    # The URL is the credential, so the browser may reuse the response until it expires
+    max_age = max(signed.expires_at - int(time.time()), 0)
+    return stored_file_response(
+        request,
+        signed.file_path,
+        signed.file_name,
+        media_type=signed.mime_type,
+        disposition=signed.disposition,
+        sha256=signed.sha256,
+        cache_control=f"private, max-age={max_age}"
+    )
+
+
+@router.get("/files/{document_id}/view")
+def view_document(
+    document_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    View a document by document ID.
+    Returns the file with inline Content-Disposition for browser preview.
+    Supports conditional GET (ETag / If-None-Match) and byte ranges.
+    """
+    # Get document by ID and verify ownership in one query
+    document = get_accessible_document(db, current_user, document_id)
     
     # Return the file with inline disposition for viewing
-    return FileResponse(
-        path=str(full_file_path),
-        media_type=content_type,
-        headers={"Content-Disposition": f'inline; filename="{document.file_name}"'}
-    )
+    return document_file_response(request, document, disposition="inline")
 
 
 @router.get("/files/{document_id}/download")
 def download_document(
     document_id: str,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Download a document by document ID.
     Returns the file with attachment Content-Disposition for download.
+    Supports conditional GET (ETag / If-None-Match) and byte ranges.
     """
-    # Get document by ID and verify ownership without using relationships
-    document = db.query(Document).filter(Document.id == document_id).first()
-    if not document:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Document not found"
-        )
+    # Get document by ID and verify ownership in one query
+    document = get_accessible_document(db, current_user, document_id)
     
-    # Verify the claim exists and belongs to the current user
-    from app.models.claim import Claim  # Import locally to avoid circular imports
-    claim = db.query(Claim).filter(
-        Claim.id == document.claim_id,
-        Claim.user_id == current_user.id
-    ).first()
-    
-    if not claim:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
-    
-    # Construct the full file path
-    full_file_path = Path(settings.UPLOAD_DIR) / document.file_path
+    # Return the file with attachment disposition for download
+    return document_file_response(request, document, disposition="attachment")
+
+
+@router.get("/files/{document_id}/thumbnail")
+async def document_thumbnail(
+    document_id: str,
+    request: Request,
+    size: str = Query(default="small", pattern=f"^({'|'.join(RENDITION_SIZES)})$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Preview of a document (photo thumbnail or first PDF page) at a fixed size:
+    small, medium or large. Rendered once and served from the rendition cache.
+    """
+    document = await run_in_threadpool(get_accessible_document, db, current_user, document_id)
     
-    # Check if file exists
-    if not full_file_path.exists():
+    path = await rendition_service.get_rendition(document, size)
+    if path is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="File not found on disk"
+            detail="No preview available for this document"
         )
     
-    # Determine content type
-    content_type, _ = mimetypes.guess_type(str(full_file_path))
-    if not content_type:
-        content_type = "application/octet-stream"
-    
-    # Return the file with attachment disposition for download
-    return FileResponse(
-        path=str(full_file_path),
-        media_type=content_type,
-        headers={"Content-Disposition": f'attachment; filename="{document.file_name}"'}
+    # Renditions are derived from immutable content, so the browser may keep them
+    return cached_file_response(
+        request,
+        path,
+        RENDITION_MEDIA_TYPES[settings.RENDITION_FORMAT],
+        etag=f'"{os.path.basename(path)}"',
+        cache_control="private, max-age=86400"
     )
 
 
 @router.get("/files/{file_path:path}")
 def serve_file(
     file_path: str,
+    request: Request,
     download: Optional[bool] = Query(default=False),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -187,34 +243,8 @@ def serve_file(
     # Verify user has access to this file
     document = verify_user_can_access_document(db, current_user, file_path)
     
-    # Construct the full file path
-    full_file_path = Path(settings.UPLOAD_DIR) / sanitized_path
-    
-    # Check if file exists
-    if not full_file_path.exists():
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="File not found"
-        )
-    
-    # Determine content type
-    content_type, _ = mimetypes.guess_type(str(full_file_path))
-    if not content_type:
-        content_type = "application/octet-stream"
-    
-    # Prepare headers
-    headers = {"Content-Type": content_type}
-    
     # Set content disposition based on download parameter
-    if download:
-        headers["Content-Disposition"] = f'attachment; filename="{document.file_name}"'
-    else:
-        headers["Content-Disposition"] = f'inline; filename="{document.file_name}"'
+    disposition = "attachment" if download else "inline"
     
     # Return the file
-    return FileResponse(
-        path=str(full_file_path),
-        media_type=content_type,
-        headers=headers,
-        filename=document.file_name
-    )
\ No newline at end of file
+    return document_file_response(request, document, disposition=disposition)
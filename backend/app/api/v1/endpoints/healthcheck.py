@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
-from app.dependencies import get_db
+from app.dependencies import get_async_db
 from app.utils.constants import API_HEALTHY
 from app.utils.logger import setup_logger
 
@@ -12,7 +12,7 @@ router = APIRouter(tags=["Health"])
 
 
 @router.get("/health")
-async def health_check(db: Session = Depends(get_db)) -> dict:
+async def health_check(db: AsyncSession = Depends(get_async_db)) -> dict:
     """
     Health check endpoint.
     
@@ -21,7 +21,7 @@ async def health_check(db: Session = Depends(get_db)) -> dict:
     """
     try:
         # Test database connection
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         db_status = "healthy"
     except Exception as e:
         logger.error(f"Database health check failed: {str(e)}")
@@ -9,12 +9,12 @@ from app.services import ocr_service
 router = APIRouter()
 
 @router.post("/extract", response_model=OCRExtractResponse)
-def ocr_extract(
+async def ocr_extract(
     request: OCRExtractRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    document = ocr_service.extract_ocr_for_document(db, current_user, request.document_id)
+    document = await ocr_service.extract_ocr_for_document_async(db, current_user, request.document_id)
     return OCRExtractResponse(
         document_id=document.id,
         extracted_text=document.ocr_text,
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from uuid import UUID
 from pydantic import BaseModel
@@ -7,8 +7,8 @@ from typing import List, Optional
 from app.dependencies import get_db, get_current_user
 from app.models.user import User
 from app.models.claim import Claim
-from app.services.readiness_service import calculate_readiness_score
-from app.services.fraud_service import calculate_fraud_score
+from app.services import risk_service
+from app.utils.file_response import etag_matches
 
 router = APIRouter()
 
@@ -21,11 +21,15 @@ class RiskAssessmentResponse(BaseModel):
 @router.get("/claims/{claim_id}/risk", response_model=RiskAssessmentResponse)
 def get_risk_assessment(
     claim_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get risk assessment for a claim including readiness and fraud scores.
+    Cached until the claim or its documents change; supports conditional GET
+    (ETag / If-None-Match) for polling clients.
     """
     # Verify user owns the claim
     claim = db.query(Claim).filter(
@@ -34,19 +38,18 @@ def get_risk_assessment(
     ).first()
     
     if not claim:
-        from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Claim not found")
     
-    # Calculate readiness score
-    readiness_score = calculate_readiness_score(db, claim_id)
-    
-    # Calculate fraud score
-    fraud_result = calculate_fraud_score(db, claim)
-    fraud_score = fraud_result.get("fraud_score", 0)
+    assessment = risk_service.get_risk_assessment(db, claim)
+    # no-cache: the client may store the response but must revalidate it
+    headers = {"ETag": assessment["etag"], "Cache-Control": "private, no-cache"}
+    if etag_matches(request, assessment["etag"]):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
     
     return RiskAssessmentResponse(
         claim_id=claim_id,
-        readiness_score=readiness_score,
-        fraud_score=fraud_score,
-        signals=fraud_result.get("signals", [])
-    )
\ No newline at end of file
+        readiness_score=assessment["readiness_score"],
+        fraud_score=assessment["fraud_score"],
+        signals=assessment["signals"]
+    )
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import healthcheck, auth, policies, claims, documents, files, ocr, timeline, workflow, summary_pdf, risk
+from app.api.v1.endpoints import healthcheck, auth, policies, claims, documents, files, ocr, timeline, workflow, summary_pdf, risk, admin
 
 # Create API v1 router
 api_router = APIRouter()
@@ -17,4 +17,5 @@ api_router.include_router(timeline.router, tags=["Timeline"])
 api_router.include_router(workflow.router, tags=["Workflow"])
 api_router.include_router(summary_pdf.router, tags=["PDF"])
 api_router.include_router(risk.router, tags=["Risk"])
+api_router.include_router(admin.router, prefix="/admin", tags=["Admin"])
 
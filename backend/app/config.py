@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -11,18 +12,92 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: Optional[str] = None  # defaults to DATABASE_URL with the asyncpg driver
+    DB_POOL_SIZE: int = 10  # persistent connections per engine (sync and async each have one)
+    DB_MAX_OVERFLOW: int = 20  # extra connections opened under load and closed when returned
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a free connection before failing
+    DB_POOL_RECYCLE: int = 1800  # reconnect connections older than this (seconds), -1 never
+    DB_POOL_PRE_PING: bool = True  # test connections on checkout (survives DB restarts, costs a round trip)
+    DB_POOL_SLOW_CHECKOUT_MS: float = 100.0  # checkouts slower than this are logged as warnings
+    DB_ECHO: bool = False  # log every SQL statement (independent of DEBUG)
     
     # JWT Configuration (placeholder for later)
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    JWT_CACHE_SIZE: int = 10000  # verified tokens kept per process (until their exp)
+    JWT_NEGATIVE_CACHE_SECONDS: int = 30  # rejected tokens are refused without re-verification for this long
+    
+    # Password Hashing
+    BCRYPT_ROUNDS: int = 12  # cost factor; existing hashes are upgraded on the next login
+    PASSWORD_HASH_WORKERS: int = 2  # threads hashing/verifying passwords per process
+    PASSWORD_HASH_QUEUE_SIZE: int = 16  # waiting requests beyond the workers, then 429
+    
+    # Caching
+    CACHE_BACKEND: str = "memory"  # "memory" (per process) or "redis" (shared, needs redis)
+    REDIS_URL: str = "redis://localhost:6379/0"
+    AUTH_USER_CACHE_TTL_SECONDS: int = 60  # authenticated user per token, 0 disables; keep below the token lifetime
+    AUTH_USER_CACHE_SIZE: int = 10000  # max tokens per process (memory backend)
+    RISK_CACHE_TTL_SECONDS: int = 300  # risk assessment per claim version, 0 disables; bounds staleness of the claim frequency feature
+    RISK_CACHE_SIZE: int = 10000  # max claims per process (memory backend)
     
     # File Upload
-    UPLOAD_DIR: str = "uploads"
+    UPLOAD_DIR: str = "uploads"  # local storage root; also holds upload temp files
+    IMAGE_ANALYSIS_MAX_SIDE: int = 1024  # working resolution for quality/pHash, 0 = full size
+    
+    # Storage Backend
+    STORAGE_BACKEND: str = "local"  # "local" (UPLOAD_DIR), "s3" (S3-compatible, needs boto3) or "memory"
+    S3_BUCKET: str = ""
+    S3_PREFIX: str = ""
+    S3_ENDPOINT_URL: Optional[str] = None  # e.g. http://minio:9000 for MinIO
+    S3_REGION: Optional[str] = None
+    S3_ACCESS_KEY_ID: Optional[str] = None
+    S3_SECRET_ACCESS_KEY: Optional[str] = None
+    
+    # File Delivery
+    FILE_DELIVERY_MODE: str = "app"  # "app" (Python sends bytes), "x-accel" (nginx) or "x-sendfile" (Apache/lighttpd)
+    X_ACCEL_REDIRECT_PREFIX: str = "/protected-files"  # internal nginx location aliased to UPLOAD_DIR
+    SIGNED_URL_EXPIRE_SECONDS: int = 300  # lifetime of signed file URLs
+    FILE_URL_SECRET: Optional[str] = None  # HMAC key for signed file URLs, defaults to JWT_SECRET
+    
+    # Renditions (thumbnails and previews)
+    RENDITION_FORMAT: str = "webp"  # "webp" or "jpeg"
+    RENDITION_CACHE_DIR: str = "rendition_cache"  # local disk, also with remote storage
+    RENDITION_CACHE_MAX_MB: int = 512  # least recently used renditions are evicted beyond this
+    RENDITION_PREGENERATE_SIZES: str = "small"  # comma-separated sizes rendered at upload, empty = on demand only
+    
+    # Compute Pool (image analysis and OCR run in worker processes)
+    COMPUTE_POOL_WORKERS: int = 2  # 0 runs CPU-bound work in-process
+    
+    # Document Processing
+    DOCUMENT_PROCESSING_MODE: str = "inline"  # "inline" (during upload) or "background" (queued)
+    DOCUMENT_QUEUE_BACKEND: str = "database"  # "database" (shared, SKIP LOCKED) or "memory" (single process)
+    DOCUMENT_QUEUE_WORKERS: int = 2  # concurrent jobs per API process
+    DOCUMENT_QUEUE_POLL_SECONDS: float = 5.0  # idle poll interval for the database queue
+    DOCUMENT_QUEUE_STALE_SECONDS: int = 600  # jobs stuck in "processing" longer than this are retried
+    DOCUMENT_PROCESSING_MAX_ATTEMPTS: int = 3  # attempts before a transient error marks a document failed
+    DOCUMENT_PROCESSING_RETRY_SECONDS: int = 30  # delay before a document is retried after a transient error
+    
+    # Duplicate Detection
+    PHASH_DUPLICATE_THRESHOLD: int = 5  # max Hamming distance for a duplicate
+    PHASH_INDEX_BANDS: int = 4  # bands in the in-memory pHash index
+    PHASH_INDEX_BACKEND: str = "database"  # "database" (band columns, shared) or "memory" (per process, single-worker only)
+    
+    # Fraud Rules
+    FRAUD_RULES_FILE: Optional[str] = None  # JSON rules file, defaults to the bundled app/rules/fraud_rules.json
+    FRAUD_RULES_RELOAD_SECONDS: int = 30  # how often to check the file for changes, 0 loads it once
+    FRAUD_RESCORE_CHUNK_SIZE: int = 1000  # claims per chunk in bulk re-scoring
+    FRAUD_RESCORE_WORKERS: int = 4  # chunks processed in parallel (each holds a DB connection)
+    
+    # Admin
+    ADMIN_API_KEY: Optional[str] = None  # X-Admin-Key for /admin endpoints, unset disables them
     
     # Logging
     LOG_LEVEL: str = "INFO"
     
+    # Metrics
+    METRICS_ENABLED: bool = True  # request/stage metrics and the Prometheus /metrics endpoint
+    
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
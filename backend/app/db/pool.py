@@ -0,0 +1,127 @@
+"""
+Instrumented connection pools.
+
+The sync and async engines use these QueuePool subclasses, which time every
+connection checkout (waiting for a free connection, opening a new one and the
+pre-ping). The numbers, together with the pool gauges, are exported as the
+db_pool_* metrics on the Prometheus /metrics endpoint so pool sizes can be
+planned against Postgres max_connections. Checkouts slower than
+DB_POOL_SLOW_CHECKOUT_MS are logged and passed to the listeners registered with add_slow_checkout_listener().
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.config import settings
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Upper bounds (ms) of the checkout latency histogram
+CHECKOUT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+SlowCheckoutListener = Callable[[str, float, Dict[str, Any]], None]
+_slow_checkout_listeners: List[SlowCheckoutListener] = []
+
+
+def add_slow_checkout_listener(listener: SlowCheckoutListener) -> None:
+    """Call listener(pool_name, elapsed_ms, gauges) for every slow checkout."""
+    _slow_checkout_listeners.append(listener)
+
+
+class PoolStats:
+    """Thread-safe checkout counters of one pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0  # checkouts that found no idle connection and no overflow room
+        self.timeouts = 0
+        self.slow = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(CHECKOUT_BUCKETS_MS) + 1)
+
+    def record(self, elapsed_ms: float, waited: bool, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.waits += waited
+            self.timeouts += timed_out
+            self.slow += elapsed_ms >= settings.DB_POOL_SLOW_CHECKOUT_MS
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+            for index, bound in enumerate(CHECKOUT_BUCKETS_MS):
+                if elapsed_ms <= bound:
+                    self.buckets[index] += 1
+                    break
+            else:
+                self.buckets[-1] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "slow_checkouts": self.slow,
+                "checkout_ms_avg": round(self.total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "checkout_ms_max": round(self.max_ms, 3),
+                "checkout_ms_histogram": {
+                    **{f"le_{bound}": count for bound, count in zip(CHECKOUT_BUCKETS_MS, self.buckets)},
+                    "inf": self.buckets[-1],
+                },
+            }
+
+
+class _InstrumentedPoolMixin:
+    # Class-level so the numbers survive pool.recreate() on engine.dispose()
+    stats: PoolStats
+
+    def gauges(self) -> Dict[str, Any]:
+        return {
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+        }
+
+    def connect(self):
+        waited = self.checkedin() == 0 and self.overflow() >= self._max_overflow
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.stats.record(elapsed_ms, waited, timed_out)
+            if elapsed_ms >= settings.DB_POOL_SLOW_CHECKOUT_MS:
+                self._slow_checkout(elapsed_ms)
+
+    def _slow_checkout(self, elapsed_ms: float) -> None:
+        gauges = self.gauges()
+        logger.warning(
+            f"Slow DB connection checkout ({self.stats.name} pool): {elapsed_ms:.0f} ms, "
+            f"{gauges['checked_out']} checked out, {gauges['overflow']} overflow"
+        )
+        for listener in _slow_checkout_listeners:
+            try:
+                listener(self.stats.name, elapsed_ms, gauges)
+            except Exception as e:
+                logger.error(f"Slow checkout listener failed: {str(e)}")
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    stats = PoolStats("sync")
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    stats = PoolStats("async")
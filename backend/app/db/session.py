@@ -1,19 +1,31 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from app.config import settings
+from app.db.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
 from app.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Pool settings shared by the sync and async engines (each has its own pool,
+# so a process may hold up to 2 * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections)
+POOL_OPTIONS = dict(
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    echo=settings.DB_ECHO
+)
+
 # Create SQLAlchemy engine
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-    echo=settings.DEBUG
+    poolclass=InstrumentedQueuePool,
+    **POOL_OPTIONS
 )
 
 # Create SessionLocal class
@@ -43,3 +55,44 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
         logger.debug("Database session closed")
+
+
+def _async_database_url() -> str:
+    """ASYNC_DATABASE_URL, or DATABASE_URL with the asyncpg driver."""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(settings.DATABASE_URL)
+    return url.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+# Async engine for endpoints ported to AsyncSession. It runs side by side with
+# the sync engine above; each has its own connection pool.
+async_engine = create_async_engine(
+    _async_database_url(),
+    poolclass=InstrumentedAsyncQueuePool,
+    **POOL_OPTIONS
+)
+
+# Objects stay usable after commit without an implicit (blocking) refresh
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    expire_on_commit=False,
+    autoflush=False
+)
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function to get an async database session.
+    
+    Yields:
+        Async database session
+        
+    Example:
+        @app.get("/items")
+        async def read_items(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(select(Item))
+            return result.scalars().all()
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
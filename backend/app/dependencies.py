@@ -3,14 +3,20 @@ Shared dependencies for the application.
 These can be used across different API endpoints.
 """
 
-from fastapi import Depends, HTTPException, status
+import secrets
+
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError
+from uuid import UUID
 
-from app.db.session import get_db
+from app.config import settings
+from app.db.session import get_async_db, get_db
 from app.utils.security import decode_access_token
 from app.models.user import User
+from app.services.user_cache_service import cache_user, get_cached_user
 from app.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -20,14 +26,16 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
 async def get_current_user(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     token: str = Depends(oauth2_scheme)
 ) -> User:
     """
     Dependency to get the current authenticated user from JWT token.
+    Users are cached per token (see user_cache_service), so repeated
+    requests with the same token skip JWT decoding and the user query.
     
     Args:
-        db: Database session
+        db: Async database session (the lookup never blocks the event loop)
         token: JWT token from Authorization header
         
     Returns:
@@ -42,6 +50,10 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    user = get_cached_user(token)
+    if user is not None:
+        return user
+    
     try:
         # Decode JWT token
         payload = decode_access_token(token)
@@ -50,20 +62,46 @@ async def get_current_user(
         if user_id is None:
             logger.warning("Token missing 'sub' claim")
             raise credentials_exception
+        
+        user_uuid = UUID(str(user_id))
             
+    except ValueError:
+        logger.warning(f"Token 'sub' claim is not a user id: {user_id}")
+        raise credentials_exception
     except JWTError as e:
-        logger.warning(f"JWT validation failed: {str(e)}")
+        # decode_access_token already logged the first rejection of this token
+        logger.debug(f"JWT validation failed: {str(e)}")
         raise credentials_exception
     
     # Fetch user from database
-    user = db.query(User).filter(User.id == user_id).first()
+    result = await db.execute(select(User).where(User.id == user_uuid))
+    user = result.scalar_one_or_none()
     
     if user is None:
         logger.warning(f"User not found for id: {user_id}")
         raise credentials_exception
     
+    cache_user(token, user, payload.get("exp"))
     return user
 
 
+def require_admin_key(x_admin_key: str = Header(default="")) -> None:
+    """
+    Dependency for operator endpoints: the X-Admin-Key header must match
+    ADMIN_API_KEY. Admin endpoints are disabled while ADMIN_API_KEY is unset.
+    """
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found"
+        )
+    if not secrets.compare_digest(x_admin_key.encode(), settings.ADMIN_API_KEY.encode()):
+        logger.warning("Admin request with an invalid X-Admin-Key")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin key"
+        )
+
+
 # Re-export for convenience
-__all__ = ["get_db", "get_current_user", "oauth2_scheme"]
+__all__ = ["get_db", "get_async_db", "get_current_user", "oauth2_scheme", "require_admin_key"]
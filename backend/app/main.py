@@ -1,10 +1,21 @@
-from fastapi import FastAPI
+import os
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
 from app.api.v1.router import api_router
 from app.utils.logger import setup_logger
-from app.utils.constants import API_WELCOME_MESSAGE
+from app.utils.constants import API_WELCOME_MESSAGE, MAX_REQUEST_BODY_SIZE
+from app.middleware.body_limit import BodySizeLimitMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.db.session import SessionLocal, async_engine
+from app.services.duplicate_service import rebuild_phash_index
+from app.services import document_processing_service
+from app.services.fraud_rules import get_plan as load_fraud_rules
+from app.utils import compute_pool
+from app.utils.security import shutdown_hashing_pool
+from app.utils.metrics import CONTENT_TYPE_LATEST, render_latest
 
 # Setup logger
 logger = setup_logger(__name__)
@@ -54,6 +65,13 @@ app.add_middleware(
     max_age=86400,  # Cache preflight requests for 24 hours
 )
 
+# Reject oversized uploads before multipart parsing spools them to disk
+app.add_middleware(BodySizeLimitMiddleware, max_body_size=MAX_REQUEST_BODY_SIZE)
+
+# Outermost, so rejected and failed requests are counted too
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, routes=app.routes)
+
 
 @app.on_event("startup")
 async def startup_event():
@@ -61,12 +79,44 @@ async def startup_event():
     logger.info(f"Starting {settings.APP_NAME}")
     logger.info(f"API docs available at: /docs")
     logger.info(f"Database URL: {settings.DATABASE_URL.split('@')[1] if '@' in settings.DATABASE_URL else 'Not configured'}")
+    
+    # Build the in-memory pHash duplicate index from stored documents
+    if settings.PHASH_INDEX_BACKEND == "memory":
+        # uvicorn and gunicorn take their default worker count from WEB_CONCURRENCY
+        workers = int(os.environ.get("WEB_CONCURRENCY") or 1)
+        if workers > 1 or os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            logger.warning(
+                "PHASH_INDEX_BACKEND=memory with several API workers: each worker only sees the "
+                "hashes it stored itself, so near-duplicates uploaded through another worker are "
+                "missed. Use PHASH_INDEX_BACKEND=database."
+            )
+        db = SessionLocal()
+        try:
+            rebuild_phash_index(db)
+        except Exception as e:
+            logger.error(f"Failed to build pHash index, falling back to database lookup: {str(e)}")
+        finally:
+            db.close()
+    
+    # Compile the fraud rules now so an invalid rules file fails the deploy
+    load_fraud_rules()
+    
+    # Start the worker processes for image analysis and OCR
+    compute_pool.start()
+    
+    # Background document analysis workers
+    if settings.DOCUMENT_PROCESSING_MODE == "background":
+        await document_processing_service.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Application shutdown tasks."""
     logger.info(f"Shutting down {settings.APP_NAME}")
+    await document_processing_service.stop()
+    compute_pool.shutdown()
+    shutdown_hashing_pool()
+    await async_engine.dispose()
 
 
 @app.get("/")
@@ -84,6 +134,13 @@ async def root() -> dict:
     }
 
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics() -> Response:
+        """Prometheus metrics in the text exposition format."""
+        return Response(render_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 # Include API v1 router AFTER CORS middleware
 app.include_router(api_router, prefix=settings.API_PREFIX)
 
@@ -0,0 +1,82 @@
+"""
+Request metrics.
+
+Records request count, latency and in-flight requests per method, route
+template (e.g. /api/v1/claims/{claim_id}) and status code. Using the template
+instead of the raw path keeps the number of label combinations bounded;
+paths that match no route are counted under "<unmatched>".
+
+The route is resolved up front against the application's routes so in-flight
+requests can be labelled too, and label children are cached, so the cost per
+request is a few regex matches and dictionary lookups.
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS, HTTP_REQUESTS_IN_PROGRESS
+
+UNMATCHED_ROUTE = "<unmatched>"
+KNOWN_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp, routes: List[BaseRoute]):
+        self.app = app
+        self.routes = routes
+        self._in_progress: Dict[Tuple[str, str], object] = {}
+        self._observers: Dict[Tuple[str, str, int], Tuple[object, object]] = {}
+
+    def _route_template(self, path: str) -> str:
+        for route in self.routes:
+            path_regex = getattr(route, "path_regex", None)
+            if path_regex is not None and path_regex.match(path):
+                return route.path
+        return UNMATCHED_ROUTE
+
+    def _in_progress_gauge(self, method: str, route: str):
+        gauge = self._in_progress.get((method, route))
+        if gauge is None:
+            gauge = self._in_progress[(method, route)] = HTTP_REQUESTS_IN_PROGRESS.labels(method, route)
+        return gauge
+
+    def _observe(self, method: str, route: str, status_code: int, elapsed: float) -> None:
+        key = (method, route, status_code)
+        observers = self._observers.get(key)
+        if observers is None:
+            status_code_label = str(status_code)
+            observers = self._observers[key] = (
+                HTTP_REQUESTS.labels(method, route, status_code_label),
+                HTTP_REQUEST_DURATION.labels(method, route, status_code_label),
+            )
+        counter, histogram = observers
+        counter.inc()
+        histogram.observe(elapsed)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"] if scope["method"] in KNOWN_METHODS else "OTHER"
+        route = self._route_template(scope["path"])
+        status_code: Optional[int] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = self._in_progress_gauge(method, route)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            # An exception before the response started ends up as a 500
+            self._observe(method, route, status_code or 500, time.perf_counter() - started)
@@ -8,6 +8,12 @@ from app.models.user import User
 from app.models.policy import Policy
 from app.models.claim import Claim
 from app.models.document import Document
+from app.models.document_blob import DocumentBlob
 from app.models.timeline_event import TimelineEvent
+from app.models.user_claim_stats import UserClaimDailyCount
 
-__all__ = ["Base", "User", "Policy", "Claim", "Document", "TimelineEvent"]
+# ORM listeners that keep derived columns in step with every write:
+# per-user daily claim counters and claim versions
+from app.services import claim_stats_service, claim_version_service  # noqa: E402,F401
+
+__all__ = ["Base", "User", "Policy", "Claim", "Document", "DocumentBlob", "TimelineEvent", "UserClaimDailyCount"]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Numeric, DateTime, Text, Integer, ForeignKey, func
+from sqlalchemy import Column, String, Numeric, DateTime, Text, Integer, ForeignKey, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
@@ -30,9 +30,17 @@ class Claim(Base):
     decision_type = Column(String, nullable=True) # auto_approved, auto_rejected, human_reviewed
     rejection_reason = Column(Text, nullable=True)
     
+    # Bumped whenever the claim or one of its documents changes (see claim_version_service)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
         DateTime(timezone=True), 
         server_default=func.now(), 
         onupdate=func.now()
     )
+
+    __table_args__ = (
+        # A user's claims by date: frequency checks, counter backfill and checks
+        Index("ix_claims_user_id_created_at", "user_id", "created_at"),
+    )
@@ -1,9 +1,10 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Boolean, Text
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, ForeignKey, Boolean, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 import uuid
 
 from app.db.base import Base
+from app.utils.constants import DOCUMENT_STATUS_COMPLETED, DOCUMENT_STATUS_PENDING, DOCUMENT_STATUS_PROCESSING
 
 class Document(Base):
     __tablename__ = "documents"
@@ -19,6 +20,7 @@ class Document(Base):
     file_path = Column(String, nullable=False)
     mime_type = Column(String, nullable=False)
     file_size = Column(Integer, nullable=False)
+    content_sha256 = Column(String(64), ForeignKey("document_blobs.sha256"), nullable=True, index=True) # hex digest of the stored bytes
     
     ocr_text = Column(Text, nullable=True)
     ocr_confidence = Column(Integer, nullable=True) # 0-100
@@ -26,7 +28,29 @@ class Document(Base):
     quality_score = Column(Integer, nullable=False, default=0) # 0-100
     
     phash = Column(String, nullable=True, index=True) # perceptual hash (hex)
+    phash_int = Column(BigInteger, nullable=True) # same hash as a signed 64-bit integer
+    # 16-bit bands of phash_int (least significant first) for indexed candidate lookup
+    phash_band_0 = Column(Integer, nullable=True, index=True)
+    phash_band_1 = Column(Integer, nullable=True, index=True)
+    phash_band_2 = Column(Integer, nullable=True, index=True)
+    phash_band_3 = Column(Integer, nullable=True, index=True)
     is_duplicate = Column(Boolean, nullable=False, default=False)
     duplicate_of_document_id = Column(UUID(as_uuid=True), nullable=True)
     
+    # Background analysis state: pending, processing, completed, failed
+    processing_status = Column(String, nullable=False, default=DOCUMENT_STATUS_COMPLETED, server_default=DOCUMENT_STATUS_COMPLETED)
+    processing_error = Column(Text, nullable=True)
+    processing_attempts = Column(Integer, nullable=False, default=0, server_default="0") # jobs claimed, reset on reprocess
+    processing_started_at = Column(DateTime(timezone=True), nullable=True)
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Small partial index the processing queue scans for work
+        Index(
+            "ix_documents_processing_queue",
+            "created_at",
+            postgresql_where=processing_status.in_([DOCUMENT_STATUS_PENDING, DOCUMENT_STATUS_PROCESSING])
+        ),
+    )
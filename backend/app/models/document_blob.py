@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+class DocumentBlob(Base):
+    """
+    Content-addressed file shared by every document with the same bytes.
+    ref_count is the number of documents pointing at it.
+    """
+    __tablename__ = "document_blobs"
+
+    sha256 = Column(String(64), primary_key=True)  # hex digest of the content
+    storage_path = Column(String, nullable=False)  # uploads/blobs/<aa>/<sha256><ext>
+    size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Date, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base import Base
+
+class UserClaimDailyCount(Base):
+    """
+    Number of claims a user created on one UTC day, maintained alongside the
+    claims table (see claim_stats_service) for the fraud frequency feature.
+    """
+    __tablename__ = "user_claim_daily_counts"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)  # UTC date of claims.created_at
+    claim_count = Column(Integer, nullable=False, default=0)
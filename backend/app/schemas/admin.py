@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+from app.utils.constants import OPEN_CLAIM_STATUSES
+
+class RescoreRequest(BaseModel):
+    statuses: List[str] = Field(default_factory=lambda: list(OPEN_CLAIM_STATUSES), min_length=1)
+    chunk_size: Optional[int] = Field(default=None, ge=1, le=10000)
+    workers: Optional[int] = Field(default=None, ge=1, le=16)
+    dry_run: bool = False
+
+class RescoreJobResponse(BaseModel):
+    job_id: str
+    status: str  # running, completed or failed
+    error: Optional[str] = None
+    summary: Dict[str, Any]
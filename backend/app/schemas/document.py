@@ -15,8 +15,34 @@ class DocumentUploadResponse(BaseModel):
     file_name: str
     file_size: int
     mime_type: str
+    processing_status: str
+    
+    model_config = ConfigDict(from_attributes=True)
+
+class DocumentStatusResponse(BaseModel):
+    id: UUID
+    processing_status: str
+    processing_error: Optional[str] = None
+    processing_attempts: int = 0
+    quality_score: int
+    is_duplicate: bool
+    created_at: datetime
+    processing_started_at: Optional[datetime] = None
+    processed_at: Optional[datetime] = None
     
     model_config = ConfigDict(from_attributes=True)
 
 class DocumentListResponse(BaseModel):
     documents: List[DocumentUploadResponse]
+
+class SignedUrlResponse(BaseModel):
+    document_id: UUID
+    document_type: str
+    file_name: str
+    mime_type: Optional[str] = None
+    url: str
+    expires_at: datetime
+
+class SignedUrlListResponse(BaseModel):
+    claim_id: UUID
+    urls: List[SignedUrlResponse]
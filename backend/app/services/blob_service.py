@@ -0,0 +1,95 @@
+from sqlalchemy import literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from typing import Optional, Tuple
+import os
+
+from app.models.document import Document
+from app.models.document_blob import DocumentBlob
+from app.utils.constants import DOCUMENT_STATUS_COMPLETED
+from app.storage import get_storage, storage_key
+from app.utils.file_storage import blob_storage_path, place_blob
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def acquire_blob(
+    db: Session,
+    sha256: str,
+    size: int,
+    temp_path: str,
+    extension: str,
+    content_type: Optional[str] = None
+) -> Tuple[str, bool]:
+    """
+    Take a reference on the blob for sha256, creating it from temp_path if it
+    does not exist yet. The temp file is moved into place or discarded.
+    Returns (storage_path, created).
+    """
+    stmt = insert(DocumentBlob).values(
+        sha256=sha256,
+        storage_path=blob_storage_path(sha256, extension),
+        size=size,
+        ref_count=1
+    ).on_conflict_do_update(
+        index_elements=[DocumentBlob.sha256],
+        set_={"ref_count": DocumentBlob.ref_count + 1}
+    ).returning(
+        DocumentBlob.storage_path,
+        # xmax is 0 only for a freshly inserted row
+        literal_column("xmax = 0").label("created")
+    )
+
+    try:
+        row = db.execute(stmt).one()
+        # The row lock taken by the upsert is held until commit, so a concurrent
+        # release cannot delete the file between this check and the commit
+        place_blob(temp_path, row.storage_path, content_type)
+        db.commit()
+    except Exception:
+        db.rollback()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return row.storage_path, row.created
+
+
+def release_blob(db: Session, sha256: Optional[str]) -> None:
+    """
+    Drop one reference on a blob. The row and file are removed with the last
+    reference. Call when a document pointing at the blob is deleted.
+    """
+    if not sha256:
+        return
+
+    blob = db.query(DocumentBlob).filter(DocumentBlob.sha256 == sha256).with_for_update().first()
+    if blob is None:
+        return
+
+    blob.ref_count -= 1
+    if blob.ref_count <= 0:
+        db.delete(blob)
+        try:
+            get_storage().delete(storage_key(blob.storage_path))
+        except Exception as e:
+            logger.warning(f"Could not remove blob file {blob.storage_path}: {str(e)}")
+    db.commit()
+
+
+def find_exact_duplicate(db: Session, sha256: Optional[str]) -> Optional[Document]:
+    """
+    Earliest fully processed document with exactly these bytes, found through
+    the content_sha256 index.
+    """
+    if not sha256:
+        return None
+
+    return db.query(Document)\
+        .filter(
+            Document.content_sha256 == sha256,
+            Document.processing_status == DOCUMENT_STATUS_COMPLETED
+        )\
+        .order_by(Document.created_at)\
+        .first()
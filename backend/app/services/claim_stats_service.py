@@ -0,0 +1,147 @@
+"""
+Per-user claim counters for the fraud frequency feature.
+
+user_claim_daily_counts holds how many claims each user created per UTC day.
+It is maintained in the same transaction as the claim itself: an ORM insert
+of a Claim increments that day's counter with an upsert, an ORM delete
+decrements it. The number of claims in the frequency window is then a sum
+over at most window + 1 primary-key rows per user, however many claims the
+user has. app.models imports this module, so the listeners are active in
+every process that loads the models.
+
+Claims written outside the ORM (bulk SQL, manual fixes, claims created by an
+older release while the counters were being backfilled) are not counted.
+find_counter_mismatches() compares the counters with the claims table and
+repair_counters() rewrites the rows that differ; scripts/check_claim_counters.py
+runs both.
+"""
+
+from datetime import date, datetime, timezone
+from typing import Any, List, Optional
+
+from sqlalchemy import Date, and_, cast, delete, event, func, literal_column, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.claim import Claim
+from app.models.user_claim_stats import UserClaimDailyCount
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def claim_day(created_at: Optional[datetime]) -> Any:
+    """UTC day of a claim; the transaction's now() for a claim whose created_at comes from the server default."""
+    if isinstance(created_at, datetime):
+        return created_at.astimezone(timezone.utc).date()
+    return cast(func.timezone("UTC", func.now()), Date)
+
+
+def _day_of(column: Any) -> Any:
+    return cast(func.timezone("UTC", column), Date)
+
+
+@event.listens_for(Claim, "after_insert")
+def _claim_created(mapper, connection, target: Claim) -> None:
+    # Read from the instance state: a server default may not be loaded yet
+    stmt = insert(UserClaimDailyCount).values(
+        user_id=target.user_id,
+        day=claim_day(target.__dict__.get("created_at")),
+        claim_count=1
+    ).on_conflict_do_update(
+        index_elements=[UserClaimDailyCount.user_id, UserClaimDailyCount.day],
+        set_={"claim_count": UserClaimDailyCount.claim_count + 1}
+    )
+    connection.execute(stmt)
+
+
+@event.listens_for(Claim, "before_delete")
+def _claim_deleted(mapper, connection, target: Claim) -> None:
+    connection.execute(
+        update(UserClaimDailyCount)
+        .where(
+            UserClaimDailyCount.user_id == target.user_id,
+            UserClaimDailyCount.day == claim_day(target.created_at),
+            UserClaimDailyCount.claim_count > 0
+        )
+        .values(claim_count=UserClaimDailyCount.claim_count - 1)
+    )
+
+
+def claims_since(user_id: Any, since: date):
+    """Select of a user's claim count on or after `since` (use .scalar_subquery() to embed it)."""
+    return select(func.coalesce(func.sum(UserClaimDailyCount.claim_count), 0))\
+        .where(UserClaimDailyCount.user_id == user_id, UserClaimDailyCount.day >= since)
+
+
+def claims_since_by_user(user_ids: List[Any], since: date):
+    """Select of (user_id, claims_in_window) for several users."""
+    return select(
+        UserClaimDailyCount.user_id,
+        func.sum(UserClaimDailyCount.claim_count).label("claims_in_window")
+    ).where(
+        UserClaimDailyCount.user_id.in_(user_ids),
+        UserClaimDailyCount.day >= since
+    ).group_by(UserClaimDailyCount.user_id)
+
+
+def find_counter_mismatches(db: Session, limit: Optional[int] = None) -> List[Any]:
+    """
+    (user_id, day, counted, actual) for every user and day where the counter
+    differs from the claims table. A missing row counts as 0 on either side.
+    """
+    actual = select(
+        Claim.user_id,
+        _day_of(Claim.created_at).label("day"),
+        func.count(Claim.id).label("actual")
+    ).group_by(Claim.user_id, literal_column("day")).subquery("actual")
+    counters = UserClaimDailyCount.__table__
+
+    counted = func.coalesce(counters.c.claim_count, 0)
+    actual_count = func.coalesce(actual.c.actual, 0)
+    stmt = select(
+        func.coalesce(counters.c.user_id, actual.c.user_id).label("user_id"),
+        func.coalesce(counters.c.day, actual.c.day).label("day"),
+        counted.label("counted"),
+        actual_count.label("actual")
+    ).select_from(
+        counters.join(
+            actual,
+            and_(counters.c.user_id == actual.c.user_id, counters.c.day == actual.c.day),
+            full=True
+        )
+    ).where(counted != actual_count)\
+        .order_by(literal_column("user_id"), literal_column("day"))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return db.execute(stmt).all()
+
+
+def repair_counters(db: Session) -> int:
+    """
+    Rewrite every counter that differs from the claims table. Returns the
+    number of rows fixed. Claims created while it runs are counted by the
+    listeners as usual, but run it when claim traffic is low.
+    """
+    mismatches = find_counter_mismatches(db)
+    for row in mismatches:
+        if row.actual == 0:
+            db.execute(
+                delete(UserClaimDailyCount)
+                .where(UserClaimDailyCount.user_id == row.user_id, UserClaimDailyCount.day == row.day)
+            )
+            continue
+        db.execute(
+            insert(UserClaimDailyCount).values(
+                user_id=row.user_id,
+                day=row.day,
+                claim_count=row.actual
+            ).on_conflict_do_update(
+                index_elements=[UserClaimDailyCount.user_id, UserClaimDailyCount.day],
+                set_={"claim_count": row.actual}
+            )
+        )
+    db.commit()
+    if mismatches:
+        logger.warning(f"Repaired {len(mismatches)} user claim counters")
+    return len(mismatches)
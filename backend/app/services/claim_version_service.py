@@ -0,0 +1,59 @@
+"""
+Claim versions.
+
+claims.version is bumped in the same flush as any change that can alter what
+is derived from a claim, such as its risk assessment (see risk_service):
+
+- an update of the claim itself, except for the columns computed from it
+  (readiness_score, fraud_score);
+- an insert, update or delete of one of its documents: upload, background
+  processing, OCR.
+
+Results derived from a claim can then be cached under (claim id, version)
+without explicit invalidation. Writes that bypass the ORM (bulk SQL) do not
+bump the version.
+
+Importing this module registers the listeners. app.models imports it, so they
+are active in every process that loads the models.
+"""
+
+from sqlalchemy import event, inspect, update
+
+from app.models.claim import Claim
+from app.models.document import Document
+
+# Claim columns whose changes do not bump the version
+_UNVERSIONED_COLUMNS = {"readiness_score", "fraud_score", "updated_at", "version"}
+
+
+def _changed(target, mapper, ignore=()) -> bool:
+    state = inspect(target)
+    return any(
+        state.attrs[attr.key].history.has_changes()
+        for attr in mapper.column_attrs
+        if attr.key not in ignore
+    )
+
+
+@event.listens_for(Claim, "before_update")
+def _claim_updated(mapper, connection, target: Claim) -> None:
+    if _changed(target, mapper, _UNVERSIONED_COLUMNS):
+        # Incremented in SQL so a bump by a document in the same flush is kept
+        target.version = Claim.version + 1
+
+
+def _bump(connection, claim_id) -> None:
+    connection.execute(update(Claim).where(Claim.id == claim_id).values(version=Claim.version + 1))
+
+
+@event.listens_for(Document, "after_insert")
+@event.listens_for(Document, "after_delete")
+def _document_added_or_removed(mapper, connection, target: Document) -> None:
+    _bump(connection, target.claim_id)
+
+
+@event.listens_for(Document, "after_update")
+def _document_updated(mapper, connection, target: Document) -> None:
+    # after_update also runs for instances that were only marked dirty
+    if _changed(target, mapper):
+        _bump(connection, target.claim_id)
@@ -0,0 +1,286 @@
+"""
+Background processing queue for uploaded documents.
+
+With DOCUMENT_PROCESSING_MODE=background, uploads are stored with
+processing_status "pending" and analysed here: quality score, pHash,
+duplicate check, timeline event and readiness update.
+
+The documents table is the queue. With the "database" backend every API
+process polls it with SELECT ... FOR UPDATE SKIP LOCKED, so several
+processes or hosts can share the work; uploads in the same process wake the
+workers immediately. The "memory" backend hands document ids to the workers
+through an in-process asyncio queue, for single-process deployments.
+
+Transient errors (database, storage, a compute pool worker dying) send the
+document back to pending for another attempt after
+DOCUMENT_PROCESSING_RETRY_SECONDS, up to DOCUMENT_PROCESSING_MAX_ATTEMPTS.
+Any other error, or running out of attempts, marks it failed; failed
+documents can be queued again with reprocess_document.
+"""
+
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.db.session import SessionLocal
+from app.models.document import Document
+from app.services import rendition_service
+from app.services.document_service import finalize_document
+from app.storage import StorageError, open_local_async
+from app.utils import compute_pool
+from app.utils.constants import (
+    DOCUMENT_STATUS_FAILED,
+    DOCUMENT_STATUS_PENDING,
+    DOCUMENT_STATUS_PROCESSING,
+)
+from app.utils.image_analysis import analyze_image
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_workers: List[asyncio.Task] = []
+_wakeup: Optional[asyncio.Event] = None
+_queue: Optional[asyncio.Queue] = None
+
+# Errors that may not happen again on the next attempt
+TRANSIENT_ERRORS = (SQLAlchemyError, StorageError, BrokenProcessPool, OSError)
+
+
+def enqueue_document(document_id: UUID) -> None:
+    """Notify the workers that a pending document was stored."""
+    if _queue is not None:
+        _queue.put_nowait(document_id)
+    elif _wakeup is not None:
+        _wakeup.set()
+
+
+def claim_document(document_id: Optional[UUID] = None) -> Optional[Tuple[UUID, str]]:
+    """
+    Mark one pending document as processing and return (id, file_path).
+    Without document_id the oldest pending document is taken; documents left in
+    "processing" by a crashed worker are retried after DOCUMENT_QUEUE_STALE_SECONDS.
+    Documents retried after a transient error wait DOCUMENT_PROCESSING_RETRY_SECONDS.
+    A document that has used up its attempts is marked failed instead.
+    Returns None when there is nothing to do.
+    """
+    now = datetime.now(timezone.utc)
+    stale_before = now - timedelta(seconds=settings.DOCUMENT_QUEUE_STALE_SECONDS)
+    retry_before = now - timedelta(seconds=settings.DOCUMENT_PROCESSING_RETRY_SECONDS)
+
+    db = SessionLocal()
+    try:
+        while True:
+            query = db.query(Document).filter(or_(
+                and_(
+                    Document.processing_status == DOCUMENT_STATUS_PENDING,
+                    or_(
+                        Document.processing_started_at.is_(None),
+                        Document.processing_started_at < retry_before
+                    )
+                ),
+                and_(
+                    Document.processing_status == DOCUMENT_STATUS_PROCESSING,
+                    Document.processing_started_at < stale_before
+                )
+            ))
+            if document_id is not None:
+                query = query.filter(Document.id == document_id)
+
+            document = query.order_by(Document.created_at)\
+                .with_for_update(skip_locked=True)\
+                .first()
+            if document is None:
+                db.rollback()
+                return None
+
+            if document.processing_attempts >= settings.DOCUMENT_PROCESSING_MAX_ATTEMPTS:
+                # Its last attempt never finished (the worker kept crashing)
+                document.processing_status = DOCUMENT_STATUS_FAILED
+                document.processing_error = document.processing_error or "Processing did not finish"
+                document.processed_at = now
+                db.commit()
+                logger.error(f"Giving up on document {document.id} after {document.processing_attempts} attempts")
+                if document_id is not None:
+                    return None
+                continue
+
+            document.processing_status = DOCUMENT_STATUS_PROCESSING
+            document.processing_started_at = now
+            document.processing_attempts += 1
+            db.commit()
+            return document.id, document.file_path
+    finally:
+        db.close()
+
+
+def recover_pending_documents() -> List[UUID]:
+    """
+    Single-process recovery for the memory backend: documents left in
+    "processing" by a previous run go back to pending, and every pending id
+    is returned so it can be queued again (without waiting for a retry delay).
+    """
+    db = SessionLocal()
+    try:
+        db.query(Document)\
+            .filter(Document.processing_status == DOCUMENT_STATUS_PROCESSING)\
+            .update({Document.processing_status: DOCUMENT_STATUS_PENDING}, synchronize_session=False)
+        db.query(Document)\
+            .filter(Document.processing_status == DOCUMENT_STATUS_PENDING)\
+            .update({Document.processing_started_at: None}, synchronize_session=False)
+        db.commit()
+        rows = db.query(Document.id)\
+            .filter(Document.processing_status == DOCUMENT_STATUS_PENDING)\
+            .order_by(Document.created_at)\
+            .all()
+        return [row[0] for row in rows]
+    finally:
+        db.close()
+
+
+def reset_for_reprocessing(db: Session, document: Document) -> None:
+    """Put a failed document back in the queue with a fresh set of attempts."""
+    document.processing_status = DOCUMENT_STATUS_PENDING
+    document.processing_error = None
+    document.processing_attempts = 0
+    document.processing_started_at = None
+    document.processed_at = None
+    db.commit()
+    db.refresh(document)
+
+
+def _complete_document(document_id: UUID, analysis) -> Optional[str]:
+    """Store the analysis result; returns the document's content hash."""
+    db = SessionLocal()
+    try:
+        document = db.query(Document).filter(Document.id == document_id).first()
+        if document is None:
+            return None
+        finalize_document(db, document, analysis)
+        return document.content_sha256
+    finally:
+        db.close()
+
+
+def _record_failure(document_id: UUID, error: str, transient: bool) -> bool:
+    """
+    Record a failed attempt. Transient errors with attempts left send the
+    document back to pending; anything else marks it failed.
+    Returns True when the document will be retried.
+    """
+    now = datetime.now(timezone.utc)
+    db = SessionLocal()
+    try:
+        # Only a document this worker still holds; it may already have completed
+        document = db.query(Document).filter(
+            Document.id == document_id,
+            Document.processing_status == DOCUMENT_STATUS_PROCESSING
+        ).with_for_update().first()
+        if document is None:
+            db.rollback()
+            return False
+
+        retry = transient and document.processing_attempts < settings.DOCUMENT_PROCESSING_MAX_ATTEMPTS
+        document.processing_error = error[:1000]
+        if retry:
+            document.processing_status = DOCUMENT_STATUS_PENDING
+            document.processing_started_at = now  # start of the retry delay
+        else:
+            document.processing_status = DOCUMENT_STATUS_FAILED
+            document.processed_at = now
+        db.commit()
+        return retry
+    finally:
+        db.close()
+
+
+async def process_document(document_id: UUID, file_path: str, retry: bool = True) -> None:
+    """
+    Run the analysis stages for one claimed document.
+    With retry=False a transient error fails the document instead of queueing it again.
+    """
+    try:
+        async with open_local_async(file_path) as local_path:
+            analysis = await compute_pool.run(
+                analyze_image, local_path, None, rendition_service.pregenerate_sizes(), settings.RENDITION_FORMAT
+            )
+        content_sha256 = await run_in_threadpool(_complete_document, document_id, analysis)
+        logger.info(f"Processed document {document_id}")
+        if content_sha256:
+            rendition_service.schedule_pregeneration(content_sha256, file_path, analysis.renditions)
+    except Exception as e:
+        transient = retry and isinstance(e, TRANSIENT_ERRORS)
+        retry = await run_in_threadpool(_record_failure, document_id, str(e), transient)
+        if retry:
+            logger.warning(f"Processing document {document_id} failed, will retry: {str(e)}")
+            asyncio.get_running_loop().call_later(
+                settings.DOCUMENT_PROCESSING_RETRY_SECONDS, enqueue_document, document_id
+            )
+        else:
+            logger.error(f"Processing failed for document {document_id}: {str(e)}")
+
+
+async def _next_job() -> Optional[Tuple[UUID, str]]:
+    if _queue is not None:
+        document_id = await _queue.get()
+        return await run_in_threadpool(claim_document, document_id)
+
+    job = await run_in_threadpool(claim_document)
+    if job is None:
+        # Idle: sleep until an upload wakes us or the poll interval passes
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=settings.DOCUMENT_QUEUE_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
+    return job
+
+
+async def _worker(number: int) -> None:
+    logger.info(f"Document processing worker {number} started")
+    while True:
+        try:
+            job = await _next_job()
+            if job is not None:
+                await process_document(*job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Document processing worker {number} error: {str(e)}")
+            await asyncio.sleep(settings.DOCUMENT_QUEUE_POLL_SECONDS)
+
+
+async def start() -> None:
+    """Start the queue workers (called at application startup)."""
+    global _wakeup, _queue
+    if _workers:
+        return
+
+    if settings.DOCUMENT_QUEUE_BACKEND == "memory":
+        _queue = asyncio.Queue()
+        # Pick up documents left unfinished by a previous run
+        for document_id in await run_in_threadpool(recover_pending_documents):
+            _queue.put_nowait(document_id)
+    else:
+        _wakeup = asyncio.Event()
+
+    for number in range(settings.DOCUMENT_QUEUE_WORKERS):
+        _workers.append(asyncio.create_task(_worker(number)))
+
+
+async def stop() -> None:
+    """Cancel the queue workers (called at application shutdown)."""
+    global _wakeup, _queue
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    _wakeup = None
+    _queue = None
@@ -1,26 +1,98 @@
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 from fastapi import UploadFile, HTTPException, status
+from starlette.concurrency import run_in_threadpool
 from uuid import UUID
-from typing import List
+from typing import List, Optional, Tuple
+from datetime import datetime, timezone
 import magic
+import os
 
 from app.models.user import User
 from app.models.claim import Claim
 from app.models.document import Document
-from app.utils.file_storage import save_upload_file, ensure_upload_dir
-from app.utils.image_quality import compute_quality_score
-from app.utils.phash import compute_phash, compare_phash
+from app.utils.file_storage import save_upload_to_temp, sanitize_filename, ensure_upload_dir
+from app.utils.image_analysis import ImageAnalysis, analyze_image
+from app.utils import compute_pool
+from app.utils.metrics import observe_stages, stage_timer
+from app.storage import open_local_async
+from app.utils.constants import DOCUMENT_STATUS_COMPLETED, DOCUMENT_STATUS_FAILED, DOCUMENT_STATUS_PENDING, MAX_UPLOAD_SIZE
 from app.services.timeline_service import add_event
+from app.services.duplicate_service import find_duplicate, phash_columns, register_document_hash
+from app.services.blob_service import acquire_blob, find_exact_duplicate, release_blob
 from app.services.readiness_service import calculate_readiness_score
+from app.services import rendition_service
 from app.config import settings
 
-def upload_document(
+async def upload_document(
     db: Session, 
     current_user: User, 
     claim_id: UUID, 
     document_type: str, 
     file: UploadFile
 ) -> Document:
+    """
+    Store an uploaded document and record its analysis.
+    Blocking DB and disk work runs on the threadpool; image decoding runs in
+    the compute pool, so the event loop is never blocked.
+    
+    With DOCUMENT_PROCESSING_MODE=background the document is returned as soon
+    as the file is saved, with processing_status "pending"; the analysis stages
+    run later in the document processing queue.
+    """
+    # 0-2. Validate, verify ownership and save the file
+    file_path, file_name, mime_type, file_size, content_sha256 = await run_in_threadpool(
+        _store_upload, db, current_user, claim_id, file
+    )
+    
+    document = Document(
+        claim_id=claim_id,
+        uploaded_by_user_id=current_user.id,
+        document_type=document_type,
+        file_name=file_name,
+        file_path=file_path,
+        mime_type=mime_type,
+        file_size=file_size,
+        content_sha256=content_sha256
+    )
+    
+    try:
+        # Exact re-upload (any file type): reuse the stored analysis, no decode
+        original = await run_in_threadpool(find_exact_duplicate, db, content_sha256)
+        if original is not None:
+            analysis = ImageAnalysis(quality_score=original.quality_score, phash=original.phash)
+            db.add(document)
+            await run_in_threadpool(finalize_document, db, document, analysis, original.id)
+            # Renditions are keyed by content, so the original's are reused
+            return document
+        
+        if settings.DOCUMENT_PROCESSING_MODE == "background":
+            from app.services.document_processing_service import enqueue_document
+            
+            document.processing_status = DOCUMENT_STATUS_PENDING
+            await run_in_threadpool(_save_document, db, document)
+            # Previews are pregenerated by the queue, from its analysis decode
+            enqueue_document(document.id)
+            return document
+        
+        # 3-4. Compute quality score, pHash and previews from a single decode
+        # file_path is something like "uploads/blobs/<aa>/<sha256><ext>"; the
+        # storage backend provides a local copy (the file itself on local disk)
+        async with open_local_async(file_path) as local_path:
+            analysis = await compute_pool.run(
+                analyze_image, local_path, None, rendition_service.pregenerate_sizes(), settings.RENDITION_FORMAT
+            )
+        
+        # 5-8. Deduplicate, persist, log and update readiness
+        db.add(document)
+        await run_in_threadpool(finalize_document, db, document, analysis)
+        rendition_service.schedule_pregeneration(content_sha256, file_path, analysis.renditions)
+        return document
+    except Exception:
+        await run_in_threadpool(_discard_unsaved_document, db, document)
+        raise
+
+def _store_upload(db: Session, current_user: User, claim_id: UUID, file: UploadFile) -> Tuple[str, str, str, int, str]:
     # 0. Validate file before processing
     _validate_uploaded_file(file)
     # 1. Verify claim ownership
@@ -31,84 +103,88 @@ def upload_document(
             detail="Claim not found or access denied"
         )
         
-    # 2. Save file
-    file_path, file_name, mime_type, file_size = save_upload_file(settings.UPLOAD_DIR, str(claim_id), file)
+    # 2. Save file into content-addressed storage (one copy per distinct content)
+    with stage_timer("file_save"):
+        temp_path, file_size, content_sha256 = save_upload_to_temp(settings.UPLOAD_DIR, file)
+        file_name = sanitize_filename(file.filename)
+        extension = os.path.splitext(file_name)[1]
+        mime_type = file.content_type or "application/octet-stream"
+        file_path, _ = acquire_blob(db, content_sha256, file_size, temp_path, extension, mime_type)
     
-    # 3. Compute quality score
-    # We need the absolute path for image processing
-    # settings.UPLOAD_DIR is absolute or relative? Usually absolute in container.
-    # If save_upload_file returns relative path, we join with root or use UPLOAD_DIR + structure.
-    # Ideally file_storage returns relative path for DB, but we need full path for processing.
-    # Let's reconstruct full path.
-    # file_path is something like "uploads/<claim_id>/<filename>"
-    
-    # Assuming the app runs where "uploads" folder is accessible via relative path or we know the root.
-    # If UPLOAD_DIR is "/code/uploads", save_upload_file uses it.
-    # If save_upload_file returned a path relative to root (e.g. uploads/...), we can use it if CWD is correct.
-    
-    full_path = file_path # In valid docker setup, this works if CWD is correct.
-    # If file_storage logic used os.path.join(UPLOAD_DIR...), we might need to verify.
-    # save_upload_file returns relative path "uploads/..." 
-    
-    quality = compute_quality_score(full_path)
-    
-    # 4. Compute pHash
-    phash_str = compute_phash(full_path)
+    return file_path, file_name, mime_type, file_size, content_sha256
+
+def _save_document(db: Session, document: Document) -> None:
+    db.add(document)
+    db.commit()
+    db.refresh(document)
+
+def _discard_unsaved_document(db: Session, document: Document) -> None:
+    """Give back the blob reference of an upload whose document was never stored."""
+    db.rollback()
+    if not inspect(document).has_identity:
+        release_blob(db, document.content_sha256)
+
+def finalize_document(
+    db: Session,
+    document: Document,
+    analysis: ImageAnalysis,
+    duplicate_of: Optional[UUID] = None
+) -> Document:
+    """
+    Apply the analysis result to a document: duplicate check, persist,
+    timeline event and readiness update. Marks processing as completed.
+    duplicate_of marks an exact (same bytes) duplicate and skips the pHash search.
+    """
+    quality = analysis.quality_score
+    phash_str = analysis.phash
+    observe_stages(analysis.timings)
     
     # 5. Check duplicates
     is_duplicate = False
     duplicate_of_id = None
     
-    if phash_str:
-        # Search all documents for similar hash
-        # This can be slow if we scan everything. For MVP, we fetch all non-null hashes.
-        # Ideally we only check against this user's docs or this claim's docs? 
-        # Prompt says "search documents ... across ALL claims" (Global duplicate detection)
-        
-        potential_dupes = db.query(Document).filter(Document.phash.isnot(None)).all()
-        for doc in potential_dupes:
-            dist = compare_phash(phash_str, doc.phash)
-            if dist <= 5: # Threshold from requirements
-                is_duplicate = True
-                duplicate_of_id = doc.id
-                break
-    
-    # 6. Create Document record
-    new_doc = Document(
-        claim_id=claim_id,
-        uploaded_by_user_id=current_user.id,
-        document_type=document_type,
-        file_name=file_name,
-        file_path=file_path,
-        mime_type=mime_type,
-        file_size=file_size,
-        quality_score=quality,
-        phash=phash_str,
-        is_duplicate=is_duplicate,
-        duplicate_of_document_id=duplicate_of_id
-    )
+    if duplicate_of is not None:
+        is_duplicate = True
+        duplicate_of_id = duplicate_of
+    elif phash_str:
+        # Global duplicate detection across ALL claims via the pHash index
+        with stage_timer("duplicate_scan"):
+            match = find_duplicate(db, phash_str)
+        if match:
+            is_duplicate = True
+            duplicate_of_id = match[0]
+    
+    # 6. Update Document record
+    document.quality_score = quality
+    for column, value in phash_columns(phash_str).items():
+        setattr(document, column, value)
+    document.is_duplicate = is_duplicate
+    document.duplicate_of_document_id = duplicate_of_id
+    document.processing_status = DOCUMENT_STATUS_COMPLETED
+    document.processing_error = None
+    document.processed_at = datetime.now(timezone.utc)
     
-    db.add(new_doc)
     db.commit()
-    db.refresh(new_doc)
+    db.refresh(document)
+    register_document_hash(document)
     
     # 7. Add timeline event
     add_event(
         db, 
-        claim_id, 
+        document.claim_id, 
         "DOC_UPLOADED", 
-        f"Uploaded {document_type} ({file_name})",
+        f"Uploaded {document.document_type} ({document.file_name})",
         metadata={
-            "document_id": str(new_doc.id),
+            "document_id": str(document.id),
             "quality_score": quality,
             "is_duplicate": is_duplicate
         }
     )
     
     # 8. Update readiness score
-    calculate_readiness_score(db, claim_id)
+    calculate_readiness_score(db, document.claim_id)
     
-    return new_doc
+    return document
 
 def list_documents_for_claim(db: Session, current_user: User, claim_id: UUID) -> List[Document]:
     # Verify ownership
@@ -118,16 +194,59 @@ def list_documents_for_claim(db: Session, current_user: User, claim_id: UUID) ->
         
     return db.query(Document).filter(Document.claim_id == claim_id).all()
 
+def get_document_for_user(db: Session, current_user: User, document_id: UUID) -> Document:
+    # Verify ownership via claim
+    document = db.query(Document).join(Claim).filter(
+        Document.id == document_id,
+        Claim.user_id == current_user.id
+    ).first()
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found or access denied"
+        )
+    return document
+
+async def reprocess_document(db: Session, current_user: User, document_id: UUID) -> Document:
+    """
+    Run the analysis stages again for a document whose processing failed.
+    In background mode the document is queued with a fresh set of attempts
+    and returned as pending; in inline mode it is analysed before returning.
+    """
+    from app.services.document_processing_service import (
+        claim_document, enqueue_document, process_document, reset_for_reprocessing
+    )
+    
+    document = await run_in_threadpool(get_document_for_user, db, current_user, document_id)
+    if document.processing_status != DOCUMENT_STATUS_FAILED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Only failed documents can be reprocessed (status: {document.processing_status})"
+        )
+    
+    await run_in_threadpool(reset_for_reprocessing, db, document)
+    if settings.DOCUMENT_PROCESSING_MODE == "background":
+        enqueue_document(document.id)
+        return document
+    
+    # No queue workers in inline mode: take the job here (one attempt, no retry)
+    job = await run_in_threadpool(claim_document, document.id)
+    if job is not None:
+        await process_document(*job, retry=False)
+    await run_in_threadpool(db.refresh, document)
+    return document
+
 
 def _validate_uploaded_file(file: UploadFile) -> None:
     """
     Validate uploaded file for security and compliance.
     """
-    # Check file size (max 10MB)
-    if file.size and file.size > 10 * 1024 * 1024:  # 10MB
+    # Check declared file size (max 10MB); the streaming writer enforces the real limit
+    # and answers the same 413
+    if file.size and file.size > MAX_UPLOAD_SIZE:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File size exceeds 10MB limit"
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File size exceeds {MAX_UPLOAD_SIZE // (1024 * 1024)}MB limit"
         )
     
     # Check file type
@@ -0,0 +1,155 @@
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from uuid import UUID
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+from app.models.document import Document
+from app.utils.constants import PHASH_DB_BANDS
+from app.utils.phash import (
+    PHASH_BITS,
+    as_hash_array,
+    band_neighbours,
+    find_duplicate_pairs,
+    from_signed64,
+    hamming_distance,
+    phash_to_int,
+    split_bands,
+    to_signed64,
+)
+from app.utils.phash_index import PHashIndex
+from app.utils.logger import setup_logger
+from app.config import settings
+
+logger = setup_logger(__name__)
+
+# Process-wide near-neighbour index over every stored document pHash, used with
+# PHASH_INDEX_BACKEND=memory. Rebuilt from the documents table at startup and
+# kept current on insert by this process only, so it misses hashes stored by
+# other workers or hosts.
+phash_index = PHashIndex(bands=settings.PHASH_INDEX_BANDS)
+
+_BAND_COLUMNS = [getattr(Document, f"phash_band_{band}") for band in range(PHASH_DB_BANDS)]
+
+
+def phash_columns(phash_str: Optional[str]) -> Dict[str, Any]:
+    """
+    Build the pHash column values for a Document: the hex string, its signed
+    64-bit integer form and the banded lookup columns.
+    """
+    value = phash_to_int(phash_str)
+    if value is None:
+        return {"phash": phash_str}
+
+    columns = {"phash": phash_str, "phash_int": to_signed64(value)}
+    for band, band_value in enumerate(split_bands(value, PHASH_DB_BANDS)):
+        columns[f"phash_band_{band}"] = band_value
+    return columns
+
+
+def rebuild_phash_index(db: Session) -> int:
+    """
+    Load every stored pHash into the in-memory index.
+    Returns the number of hashes indexed.
+    """
+    rows = db.query(Document.id, Document.phash_int)\
+        .filter(Document.phash_int.isnot(None))\
+        .yield_per(10000)
+
+    count = phash_index.rebuild((doc_id, from_signed64(value)) for doc_id, value in rows)
+    logger.info(f"pHash index rebuilt with {count} hashes")
+    return count
+
+
+def register_document_hash(document: Document) -> None:
+    """Add a newly stored document's pHash to the in-memory index."""
+    if settings.PHASH_INDEX_BACKEND == "memory" and document.phash_int is not None:
+        phash_index.add(document.id, from_signed64(document.phash_int))
+
+
+def _find_duplicate_in_db(db: Session, value: int, threshold: int) -> Optional[Tuple[UUID, int]]:
+    """
+    Use the band columns to fetch only documents sharing a near-identical band,
+    then confirm the full Hamming distance in Python.
+    """
+    radius = threshold // PHASH_DB_BANDS
+    band_bits = PHASH_BITS // PHASH_DB_BANDS
+    conditions = [
+        column.in_(list(band_neighbours(band_value, radius, band_bits)))
+        for column, band_value in zip(_BAND_COLUMNS, split_bands(value, PHASH_DB_BANDS))
+    ]
+
+    candidates = db.query(Document.id, Document.phash_int).filter(or_(*conditions)).all()
+
+    best = None
+    for doc_id, stored in candidates:
+        dist = hamming_distance(value, from_signed64(stored))
+        if dist <= threshold and (best is None or dist < best[1]):
+            best = (doc_id, dist)
+    return best
+
+
+def find_duplicate(db: Session, phash_str: str) -> Optional[Tuple[UUID, int]]:
+    """
+    Find a stored document whose pHash is within the duplicate threshold.
+    Returns (document_id, distance) for the closest match, or None.
+    """
+    value = phash_to_int(phash_str)
+    if value is None:
+        return None
+
+    threshold = settings.PHASH_DUPLICATE_THRESHOLD
+
+    if settings.PHASH_INDEX_BACKEND == "database":
+        return _find_duplicate_in_db(db, value, threshold)
+
+    if phash_index.ready:
+        return phash_index.find_nearest(value, threshold)
+
+    # Index not built (e.g. startup rebuild failed): fall back to the band columns
+    logger.warning("pHash index not ready, falling back to database band lookup")
+    return _find_duplicate_in_db(db, value, threshold)
+
+
+def find_duplicate_clusters(
+    db: Session,
+    threshold: Optional[int] = None,
+    chunk_size: int = 2048
+) -> List[List[UUID]]:
+    """
+    Offline audit: group every stored document into clusters of near-duplicate
+    images using the vectorized all-pairs scan. Singletons are omitted.
+    """
+    if threshold is None:
+        threshold = settings.PHASH_DUPLICATE_THRESHOLD
+
+    rows = db.query(Document.id, Document.phash_int)\
+        .filter(Document.phash_int.isnot(None))\
+        .order_by(Document.created_at)\
+        .all()
+    if not rows:
+        return []
+
+    doc_ids = [row[0] for row in rows]
+    hashes = as_hash_array(np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows)))
+
+    # Union-find over matching pairs
+    parent = list(range(len(doc_ids)))
+
+    def root(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for left, right, _ in find_duplicate_pairs(hashes, threshold, chunk_size):
+        for i, j in zip(left.tolist(), right.tolist()):
+            root_i, root_j = root(i), root(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    clusters: Dict[int, List[UUID]] = {}
+    for i, doc_id in enumerate(doc_ids):
+        clusters.setdefault(root(i), []).append(doc_id)
+
+    return [members for members in clusters.values() if len(members) > 1]
@@ -0,0 +1,283 @@
+"""
+Bulk fraud re-scoring.
+
+After a change to the fraud rules, rescore_claims() recomputes fraud_score
+for every claim in the given statuses (open claims by default):
+
+- the claim ids are read in keyset-paginated chunks (id > last id, ordered by
+  the primary key), so every page is an index range scan however deep the
+  run is;
+- each chunk goes to a thread pool worker, which loads the features of the
+  whole chunk with one set-based query (load_fraud_features_batch), scores
+  it in memory with the rule plan captured at the start of the run, and
+  writes the changed scores back with one UPDATE ... FROM (VALUES ...);
+- the result is a RescoreSummary: how many scores changed, in which
+  direction, which decision bands they moved between and the largest moves.
+
+Workers use their own sessions, so DB connections in use are workers + 1.
+Runs from the command line (scripts/rescore_fraud.py) or in the background
+of an API process through the admin endpoints (start_rescore_job).
+"""
+
+import heapq
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import Integer, column, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+
+from app.config import settings
+from app.db.session import SessionLocal
+from app.models.claim import Claim
+from app.services.fraud_rules import RulePlan, get_plan
+from app.services.fraud_service import fraud_feature_values, load_fraud_features_batch
+from app.utils.constants import OPEN_CLAIM_STATUSES
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Claims listed in a summary's "largest_changes"
+LARGEST_CHANGES = 20
+
+# (claim id, claim number, old score, new score)
+ScoreChange = Tuple[UUID, str, Optional[int], int]
+
+
+def score_band(score: Optional[int]) -> str:
+    """Decision engine band of a score (thresholds as in workflow_service)."""
+    if score is None:
+        return "unscored"
+    if score < 30:
+        return "low"
+    if score <= 60:
+        return "review"
+    return "high"
+
+
+class RescoreSummary:
+    """Thread-safe running totals of a re-scoring run."""
+
+    def __init__(self, dry_run: bool):
+        self.dry_run = dry_run
+        self._lock = threading.Lock()
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.monotonic()
+        self.elapsed_seconds = 0.0
+        self.scanned = 0
+        self.changed = 0
+        self.increased = 0
+        self.decreased = 0
+        self.newly_scored = 0
+        self.band_changes: Dict[str, int] = {}
+        self._largest: List[Tuple[int, str, str, Optional[int], int]] = []
+
+    def add(self, scanned: int, changes: List[ScoreChange]) -> None:
+        with self._lock:
+            self.scanned += scanned
+            self.changed += len(changes)
+            for claim_id, claim_number, before, after in changes:
+                if before is None:
+                    self.newly_scored += 1
+                elif after > before:
+                    self.increased += 1
+                else:
+                    self.decreased += 1
+
+                old_band, new_band = score_band(before), score_band(after)
+                if old_band != new_band:
+                    key = f"{old_band}->{new_band}"
+                    self.band_changes[key] = self.band_changes.get(key, 0) + 1
+
+                entry = (abs(after - (before or 0)), str(claim_id), claim_number, before, after)
+                if len(self._largest) < LARGEST_CHANGES:
+                    heapq.heappush(self._largest, entry)
+                else:
+                    heapq.heappushpop(self._largest, entry)
+            self.elapsed_seconds = time.monotonic() - self._started
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            largest = sorted(self._largest, reverse=True)
+            return {
+                "dry_run": self.dry_run,
+                "started_at": self.started_at.isoformat(),
+                "elapsed_seconds": round(self.elapsed_seconds, 3),
+                "scanned": self.scanned,
+                "changed": self.changed,
+                "unchanged": self.scanned - self.changed,
+                "increased": self.increased,
+                "decreased": self.decreased,
+                "newly_scored": self.newly_scored,
+                "band_changes": dict(self.band_changes),
+                "largest_changes": [
+                    {"claim_id": claim_id, "claim_number": claim_number, "before": before, "after": after}
+                    for _, claim_id, claim_number, before, after in largest
+                ],
+            }
+
+
+def _rescore_chunk(
+    claim_ids: List[UUID],
+    user_ids: List[UUID],
+    plan: RulePlan,
+    dry_run: bool
+) -> Tuple[int, List[ScoreChange]]:
+    db = SessionLocal()
+    try:
+        changes: List[ScoreChange] = []
+        rows = load_fraud_features_batch(db, claim_ids, user_ids)
+        for row, features in rows:
+            score, _ = plan.evaluate(fraud_feature_values(row, features))
+            if score != row.fraud_score:
+                changes.append((row.id, row.claim_number, row.fraud_score, score))
+
+        if changes and not dry_run:
+            rescored = values(
+                column("id", PG_UUID(as_uuid=True)),
+                column("fraud_score", Integer),
+                name="rescored"
+            ).data([(claim_id, after) for claim_id, _, _, after in changes])
+            db.execute(
+                update(Claim)
+                .where(Claim.id == rescored.c.id)
+                .values(fraud_score=rescored.c.fraud_score)
+            )
+        db.commit()
+        return len(rows), changes
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def rescore_claims(
+    statuses: Sequence[str] = OPEN_CLAIM_STATUSES,
+    chunk_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    dry_run: bool = False,
+    summary: Optional[RescoreSummary] = None
+) -> RescoreSummary:
+    """
+    Recompute fraud_score for all claims in `statuses` with the current rules.
+    Pass a summary to follow progress from another thread. With dry_run the
+    changes are only counted. An error in any chunk stops the run; chunks
+    already written stay written.
+    """
+    chunk_size = chunk_size or settings.FRAUD_RESCORE_CHUNK_SIZE
+    workers = workers or settings.FRAUD_RESCORE_WORKERS
+    summary = summary or RescoreSummary(dry_run)
+    plan = get_plan()
+
+    db = SessionLocal()
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fraud-rescore") as executor:
+            pending: Set[Future] = set()
+            last_id: Optional[UUID] = None
+            try:
+                while True:
+                    query = db.query(Claim.id, Claim.user_id).filter(Claim.status.in_(list(statuses)))
+                    if last_id is not None:
+                        query = query.filter(Claim.id > last_id)
+                    page = query.order_by(Claim.id).limit(chunk_size).all()
+                    # Do not hold a snapshot open for the whole run
+                    db.commit()
+                    if not page:
+                        break
+                    last_id = page[-1].id
+                    claim_ids = [row.id for row in page]
+                    user_ids = list({row.user_id for row in page})
+                    pending.add(executor.submit(_rescore_chunk, claim_ids, user_ids, plan, dry_run))
+
+                    # Bound the chunks held in memory
+                    if len(pending) >= workers * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            summary.add(*future.result())
+
+                for future in pending:
+                    summary.add(*future.result())
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+    finally:
+        db.close()
+
+    logger.info(
+        f"Fraud re-scoring {'(dry run) ' if dry_run else ''}finished: "
+        f"{summary.changed} of {summary.scanned} claims changed in {summary.elapsed_seconds:.1f}s"
+    )
+    return summary
+
+
+class RescoreJob:
+    """A background re-scoring run started from the admin API."""
+
+    def __init__(self, dry_run: bool):
+        self.id = uuid.uuid4().hex
+        self.status = "running"
+        self.error: Optional[str] = None
+        self.summary = RescoreSummary(dry_run)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"job_id": self.id, "status": self.status, "error": self.error, "summary": self.summary.to_dict()}
+
+
+# Jobs of this process, most recent last
+_jobs: Dict[str, RescoreJob] = {}
+_jobs_lock = threading.Lock()
+MAX_KEPT_JOBS = 20
+
+
+def _run_job(job: RescoreJob, statuses: Sequence[str], chunk_size: int, workers: int) -> None:
+    try:
+        rescore_claims(statuses, chunk_size, workers, job.summary.dry_run, job.summary)
+        job.status = "completed"
+    except Exception as e:
+        logger.error(f"Fraud re-scoring job {job.id} failed: {str(e)}")
+        job.error = str(e)
+        job.status = "failed"
+
+
+def start_rescore_job(
+    statuses: Sequence[str],
+    chunk_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    dry_run: bool = False
+) -> RescoreJob:
+    """Start a re-scoring run in a background thread. One run at a time per process."""
+    with _jobs_lock:
+        if any(job.status == "running" for job in _jobs.values()):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A re-scoring job is already running"
+            )
+        job = RescoreJob(dry_run)
+        _jobs[job.id] = job
+        while len(_jobs) > MAX_KEPT_JOBS:
+            del _jobs[next(iter(_jobs))]
+
+    threading.Thread(
+        target=_run_job,
+        args=(job, statuses, chunk_size, workers),
+        name=f"fraud-rescore-{job.id[:8]}",
+        daemon=True
+    ).start()
+    return job
+
+
+def get_rescore_job(job_id: str) -> RescoreJob:
+    job = _jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
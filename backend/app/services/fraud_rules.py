@@ -0,0 +1,255 @@
+"""
+Declarative fraud rules.
+
+The rules live in a JSON file (FRAUD_RULES_FILE, by default the bundled
+app/rules/fraud_rules.json):
+
+    {"rules": [{"id": "claim_frequency", "type": "frequency_anomaly",
+                "conditions": [{"feature": "claims_in_window", "op": ">", "value": 3}],
+                "weight": 15,
+                "message": "High claim frequency ({claims_in_window} in last year)"}]}
+
+A rule fires when all of its conditions hold and then adds its weight to the
+score; the message may reference features as {name}. Conditions can only use
+the features in FEATURES, which fraud_service loads for a claim in one query,
+so adding a rule never adds a query. A condition on a missing value (e.g. no
+hospital bill) does not hold.
+
+The file is compiled into a RulePlan: conditions become (feature, operator,
+operand) tuples with operands converted once, and per-rule metric children
+are bound up front. The file's modification time is checked at most every
+FRAUD_RULES_RELOAD_SECONDS and a changed file is recompiled, so rules can be
+edited without a redeploy. A file that fails to compile is logged and the
+previous plan stays in use.
+"""
+
+import hashlib
+import json
+import operator
+import os
+import string
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.utils.logger import setup_logger
+from app.utils.metrics import FRAUD_RULE_DURATION, FRAUD_RULE_EVALUATIONS
+
+logger = setup_logger(__name__)
+
+DEFAULT_RULES_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "rules", "fraud_rules.json")
+
+# Features a rule can use, by value type
+FEATURES = {
+    "has_duplicate": "bool",  # any document of the claim is a duplicate
+    "avg_quality": "number",  # average document quality score (0-100)
+    "bill_ocr_confidence": "number",  # OCR confidence of the hospital bill, missing OCR counts as 0
+    "claims_in_window": "number",  # claims by the same user since the same UTC day a year ago, this one included
+    "sum_insured": "number",
+    "claimed_amount": "number",
+    "amount_to_sum_insured": "number",  # claimed_amount / sum_insured
+    "claim_type": "string",
+}
+
+_COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+_MEMBERSHIP: Dict[str, Callable[[Any, Any], bool]] = {
+    "in": lambda value, operand: value in operand,
+    "not_in": lambda value, operand: value not in operand,
+}
+# Operators allowed per feature type
+_TYPE_OPERATORS = {
+    "bool": {"==", "!="},
+    "number": set(_COMPARISONS) | set(_MEMBERSHIP),
+    "string": {"==", "!=", "in", "not_in"},
+}
+
+
+class RuleConfigError(ValueError):
+    """The rules file is not valid."""
+
+
+@dataclass
+class CompiledRule:
+    id: str
+    type: str
+    weight: int
+    message: str
+    conditions: List[Tuple[str, Callable[[Any, Any], bool], Any]]
+    hits: Any  # bound metric children
+    misses: Any
+    duration: Any
+
+    def matches(self, features: Dict[str, Any]) -> bool:
+        for feature, compare, operand in self.conditions:
+            value = features.get(feature)
+            if value is None or not compare(value, operand):
+                return False
+        return True
+
+
+class RulePlan:
+    """Compiled rules, evaluated in file order against one feature dict."""
+
+    def __init__(self, rules: List[CompiledRule], fingerprint: str = ""):
+        self.rules = rules
+        # Hash of the rule config: identifies the rule set across processes
+        self.fingerprint = fingerprint
+
+    def evaluate(self, features: Dict[str, Any]) -> Tuple[int, List[dict]]:
+        """Returns (score clamped to 0-100, signals of the rules that fired)."""
+        score = 0
+        signals = []
+        for rule in self.rules:
+            started = time.perf_counter()
+            hit = rule.matches(features)
+            rule.duration.observe(time.perf_counter() - started)
+            if not hit:
+                rule.misses.inc()
+                continue
+            rule.hits.inc()
+            score += rule.weight
+            signals.append({"type": rule.type, "score": rule.weight, "message": rule.message.format_map(features)})
+        return max(0, min(score, 100)), signals
+
+
+def _convert_operand(rule_id: str, feature: str, op: str, value: Any) -> Any:
+    kind = FEATURES[feature]
+    if op in _MEMBERSHIP:
+        if not isinstance(value, list) or not value:
+            raise RuleConfigError(f"Rule {rule_id}: '{op}' needs a non-empty list")
+        return frozenset(_convert_operand(rule_id, feature, "==", item) for item in value)
+
+    if kind == "bool" and isinstance(value, bool):
+        return value
+    if kind == "number" and isinstance(value, (int, float)) and not isinstance(value, bool):
+        # Features are Decimal or int; a Decimal operand compares exactly
+        return Decimal(str(value))
+    if kind == "string" and isinstance(value, str):
+        return value
+    raise RuleConfigError(f"Rule {rule_id}: {feature} is a {kind}, got {value!r}")
+
+
+def _compile_rule(raw: Any, seen: set) -> CompiledRule:
+    if not isinstance(raw, dict):
+        raise RuleConfigError(f"Rule must be an object, got {raw!r}")
+    rule_id = raw.get("id")
+    if not isinstance(rule_id, str) or not rule_id:
+        raise RuleConfigError(f"Rule without an id: {raw!r}")
+    if rule_id in seen:
+        raise RuleConfigError(f"Duplicate rule id: {rule_id}")
+    seen.add(rule_id)
+
+    weight = raw.get("weight")
+    if not isinstance(weight, int) or isinstance(weight, bool):
+        raise RuleConfigError(f"Rule {rule_id}: weight must be an integer")
+    message = raw.get("message", rule_id)
+    if not isinstance(message, str):
+        raise RuleConfigError(f"Rule {rule_id}: message must be a string")
+    for _, field_name, _, _ in string.Formatter().parse(message):
+        if field_name is not None and field_name not in FEATURES:
+            raise RuleConfigError(f"Rule {rule_id}: unknown feature {{{field_name}}} in message")
+
+    raw_conditions = raw.get("conditions")
+    if not isinstance(raw_conditions, list) or not raw_conditions:
+        raise RuleConfigError(f"Rule {rule_id}: needs at least one condition")
+    conditions = []
+    for condition in raw_conditions:
+        if not isinstance(condition, dict):
+            raise RuleConfigError(f"Rule {rule_id}: condition must be an object, got {condition!r}")
+        feature, op = condition.get("feature"), condition.get("op")
+        if feature not in FEATURES:
+            raise RuleConfigError(f"Rule {rule_id}: unknown feature {feature!r}")
+        if op not in _TYPE_OPERATORS[FEATURES[feature]]:
+            raise RuleConfigError(f"Rule {rule_id}: operator {op!r} not supported for {feature}")
+        operand = _convert_operand(rule_id, feature, op, condition.get("value"))
+        conditions.append((feature, _COMPARISONS.get(op) or _MEMBERSHIP[op], operand))
+
+    return CompiledRule(
+        id=rule_id,
+        type=raw.get("type", rule_id),
+        weight=weight,
+        message=message,
+        conditions=conditions,
+        hits=FRAUD_RULE_EVALUATIONS.labels(rule_id, "hit"),
+        misses=FRAUD_RULE_EVALUATIONS.labels(rule_id, "miss"),
+        duration=FRAUD_RULE_DURATION.labels(rule_id)
+    )
+
+
+def compile_rules(data: Any) -> RulePlan:
+    """Validate parsed rule config and compile it. Raises RuleConfigError."""
+    if not isinstance(data, dict) or not isinstance(data.get("rules"), list):
+        raise RuleConfigError('Expected an object with a "rules" list')
+    seen: set = set()
+    rules = [_compile_rule(raw, seen) for raw in data["rules"]]
+    fingerprint = hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()[:16]
+    return RulePlan(rules, fingerprint)
+
+
+def load_rules_file(path: str) -> RulePlan:
+    """Read and compile a rules file. Raises RuleConfigError."""
+    try:
+        with open(path, encoding="utf-8") as rules_file:
+            data = json.load(rules_file)
+    except (OSError, ValueError) as e:
+        raise RuleConfigError(f"Cannot read {path}: {str(e)}")
+    return compile_rules(data)
+
+
+_plan: Optional[RulePlan] = None
+_plan_mtime: Optional[float] = None
+_next_check = 0.0
+_lock = threading.Lock()
+
+
+def rules_file() -> str:
+    return settings.FRAUD_RULES_FILE or DEFAULT_RULES_FILE
+
+
+def get_plan() -> RulePlan:
+    """
+    The current compiled plan, recompiled when the rules file changed.
+    Raises RuleConfigError only if no valid plan was ever loaded.
+    """
+    global _plan, _plan_mtime, _next_check
+    if _plan is not None and (settings.FRAUD_RULES_RELOAD_SECONDS <= 0 or time.monotonic() < _next_check):
+        return _plan
+
+    with _lock:
+        if _plan is not None and time.monotonic() < _next_check:
+            return _plan
+        _next_check = time.monotonic() + settings.FRAUD_RULES_RELOAD_SECONDS
+        path = rules_file()
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError as e:
+            if _plan is None:
+                raise RuleConfigError(f"Cannot read {path}: {str(e)}")
+            logger.error(f"Keeping previous fraud rules, cannot read {path}: {str(e)}")
+            return _plan
+        if _plan is not None and mtime == _plan_mtime:
+            return _plan
+
+        try:
+            plan = load_rules_file(path)
+        except RuleConfigError as e:
+            if _plan is None:
+                raise
+            logger.error(f"Keeping previous fraud rules, {path} is invalid: {str(e)}")
+            # Not retried until the file changes again
+            _plan_mtime = mtime
+            return _plan
+
+        _plan, _plan_mtime = plan, mtime
+        logger.info(f"Loaded {len(plan.rules)} fraud rules from {path}")
+        return _plan
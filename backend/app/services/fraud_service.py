@@ -1,82 +1,182 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import datetime, timedelta
-import collections
+from sqlalchemy import func, outerjoin, select, true
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
 
 from app.models.claim import Claim
 from app.models.policy import Policy
 from app.models.document import Document
+from app.services.claim_stats_service import claims_since, claims_since_by_user
+from app.services.fraud_rules import get_plan
+from app.utils.constants import DOCUMENT_STATUS_COMPLETED
+from app.utils.metrics import stage_timer
 
-def calculate_fraud_score(db: Session, claim: Claim) -> dict:
+# Window for the claims_in_window feature, in whole UTC days
+CLAIM_FREQUENCY_WINDOW_DAYS = 365
+
+
+def _window_start():
+    return (datetime.now(timezone.utc) - timedelta(days=CLAIM_FREQUENCY_WINDOW_DAYS)).date()
+
+
+@dataclass
+class FraudFeatures:
+    """Everything the fraud rules look at, loaded in one query."""
+    has_duplicate: bool = False
+    avg_quality: Optional[Decimal] = None  # None when the claim has no analysed documents
+    bill_ocr_confidence: Optional[int] = None  # None when there is no hospital bill
+    claims_in_window: int = 0  # claims by the same user, this one included
+    sum_insured: Optional[Decimal] = None  # None when the policy is missing
+
+
+def load_fraud_features(db: Session, claim: Claim) -> FraudFeatures:
     """
-    Calculate fraud score (0-100) based on signals.
-    Returns: { "fraud_score": int, "signals": list[dict] }
+    Fetch the fraud features of a claim in a single round trip: document
+    aggregates, the hospital bill's OCR confidence (lateral), the user's
+    claim count in the frequency window (from the daily counters) and the
+    policy's sum insured.
     """
-    score = 0
-    signals = []
-    
-    # 1. Duplicates check
-    # if any document.is_duplicate true => +40
-    has_duplicates = db.query(Document).filter(
+
+    # Only analysed documents: pending ones have no quality score or duplicate
+    # check yet, failed ones never will
+    docs = select(
+        func.coalesce(func.bool_or(Document.is_duplicate), False).label("has_duplicate"),
+        func.avg(Document.quality_score).label("avg_quality")
+    ).where(
         Document.claim_id == claim.id,
-        Document.is_duplicate == True
-    ).first()
-    
-    if has_duplicates:
-        mod = 40
-        score += mod
-        signals.append({"type": "document_anomaly", "score": mod, "message": "Duplicate documents detected"})
-
-    # 2. Amount anomaly
-    # if claimed_amount > 0.8 * policy.sum_insured => +20
-    policy = db.query(Policy).filter(Policy.id == claim.policy_id).first()
-    if policy:
-        limit = policy.sum_insured * Decimal("0.8")
-        # Ensure conversion if needed, sqlalchemy usually handles Decimal comparison
-        if claim.claimed_amount > limit:
-            mod = 20
-            score += mod
-            signals.append({"type": "amount_anomaly", "score": mod, "message": "Claim amount > 80% of sum insured"})
-
-    # 3. Too many claims
-    # if same user has >3 claims in last 365 days => +15
-    one_year_ago = datetime.now() - timedelta(days=365)
-    claim_count = db.query(Claim).filter(
-        Claim.user_id == claim.user_id,
-        Claim.created_at >= one_year_ago
-    ).count()
-    
-    # Current claim counts as one, so >3 means check if count > 3 inclusive?
-    # Requirement: ">3 claims". logic: if count > 3.
-    if claim_count > 3:
-        mod = 15
-        score += mod
-        signals.append({"type": "frequency_anomaly", "score": mod, "message": f"High claim frequency ({claim_count} in last year)"})
-
-    # 4. Low doc quality
-    # if average document quality_score < 50 => +15
-    docs = db.query(Document).filter(Document.claim_id == claim.id).all()
-    if docs:
-        avg_quality = sum(d.quality_score for d in docs) / len(docs)
-        if avg_quality < 50:
-            mod = 15
-            score += mod
-            signals.append({"type": "quality_anomaly", "score": mod, "message": "Low average document quality"})
-
-    # 5. Missing OCR confidence
-    # if health claim and hospital_bill OCR confidence < 50 => +10
-    if claim.claim_type == "health":
-        bill_doc = next((d for d in docs if d.document_type == "hospital_bill"), None)
-        if bill_doc:
-            # Check confidence. Handle None as 0
-            conf = bill_doc.ocr_confidence or 0
-            if conf < 50:
-                mod = 10
-                score += mod
-                signals.append({"type": "ocr_anomaly", "score": mod, "message": "Low OCR confidence for hospital bill"})
+        Document.processing_status == DOCUMENT_STATUS_COMPLETED
+    ).subquery("docs")
+
+    # Missing OCR confidence counts as 0; no row at all means there is no bill
+    bill = select(func.coalesce(Document.ocr_confidence, 0).label("ocr_confidence"))\
+        .where(Document.claim_id == claim.id, Document.document_type == "hospital_bill")\
+        .order_by(Document.created_at)\
+        .limit(1)\
+        .lateral("bill")
+
+    claims_in_window = claims_since(claim.user_id, _window_start()).scalar_subquery()
+    sum_insured = select(Policy.sum_insured)\
+        .where(Policy.id == claim.policy_id)\
+        .scalar_subquery()
+
+    row = db.execute(
+        select(
+            docs.c.has_duplicate,
+            docs.c.avg_quality,
+            bill.c.ocr_confidence,
+            claims_in_window.label("claims_in_window"),
+            sum_insured.label("sum_insured")
+        ).select_from(docs.outerjoin(bill, true()))
+    ).one()
+
+    return FraudFeatures(
+        has_duplicate=row.has_duplicate,
+        avg_quality=row.avg_quality,
+        bill_ocr_confidence=row.ocr_confidence,
+        claims_in_window=row.claims_in_window,
+        sum_insured=row.sum_insured
+    )
+
+
+def load_fraud_features_batch(
+    db: Session,
+    claim_ids: List[UUID],
+    user_ids: List[UUID]
+) -> List[Tuple[Any, FraudFeatures]]:
+    """
+    Set-based version of load_fraud_features for a chunk of claims: one query
+    with grouped document aggregates, the earliest hospital bill per claim
+    (DISTINCT ON), per-user claim counters and the policies. user_ids are the
+    owners of the claims (the caller has them from paging).
+    Returns (row, features) pairs; row has id, claim_number, claim_type,
+    claimed_amount and the stored fraud_score.
+    """
 
+    # Every part filters on a literal id list (not a join to the chunk) so the
+    # planner sees the real chunk size and uses the claim_id / user_id indexes
+    docs = select(
+        Document.claim_id,
+        func.bool_or(Document.is_duplicate).label("has_duplicate"),
+        func.avg(Document.quality_score).label("avg_quality")
+    ).where(
+        Document.claim_id.in_(claim_ids),
+        Document.processing_status == DOCUMENT_STATUS_COMPLETED
+    ).group_by(Document.claim_id)\
+        .subquery("docs")
+
+    bills = select(Document.claim_id, func.coalesce(Document.ocr_confidence, 0).label("ocr_confidence"))\
+        .where(Document.claim_id.in_(claim_ids), Document.document_type == "hospital_bill")\
+        .distinct(Document.claim_id)\
+        .order_by(Document.claim_id, Document.created_at)\
+        .subquery("bills")
+
+    windows = claims_since_by_user(user_ids, _window_start()).subquery("windows")
+
+    rows = db.execute(
+        select(
+            Claim.id,
+            Claim.claim_number,
+            Claim.claim_type,
+            Claim.claimed_amount,
+            Claim.fraud_score,
+            docs.c.has_duplicate,
+            docs.c.avg_quality,
+            bills.c.ocr_confidence,
+            windows.c.claims_in_window,
+            Policy.sum_insured
+        ).select_from(
+            outerjoin(Claim, docs, docs.c.claim_id == Claim.id)
+                .outerjoin(bills, bills.c.claim_id == Claim.id)
+                .outerjoin(windows, windows.c.user_id == Claim.user_id)
+                .outerjoin(Policy, Policy.id == Claim.policy_id)
+        ).where(Claim.id.in_(claim_ids))
+    ).all()
+
+    return [
+        (row, FraudFeatures(
+            has_duplicate=bool(row.has_duplicate),
+            avg_quality=row.avg_quality,
+            bill_ocr_confidence=row.ocr_confidence,
+            claims_in_window=row.claims_in_window or 0,
+            sum_insured=row.sum_insured
+        ))
+        for row in rows
+    ]
+
+
+def fraud_feature_values(claim: Claim, features: FraudFeatures) -> dict:
+    """The feature dict the fraud rules are evaluated against (see fraud_rules.FEATURES)."""
+    values = asdict(features)
+    values["claim_type"] = claim.claim_type
+    values["claimed_amount"] = claim.claimed_amount
+    if features.sum_insured is None:
+        values["amount_to_sum_insured"] = None
+    elif features.sum_insured > 0:
+        values["amount_to_sum_insured"] = claim.claimed_amount / features.sum_insured
+    else:
+        values["amount_to_sum_insured"] = Decimal("Infinity") if claim.claimed_amount > 0 else Decimal(0)
+    return values
+
+
+def score_fraud_features(claim: Claim, features: FraudFeatures) -> dict:
+    """
+    Apply the configured fraud rules to preloaded features. No database access.
+    Returns: { "fraud_score": int, "signals": list[dict] }
+    """
+    score, signals = get_plan().evaluate(fraud_feature_values(claim, features))
     return {
-        "fraud_score": min(score, 100),
+        "fraud_score": score,
         "signals": signals
     }
+
+
+@stage_timer("fraud_scoring")
+def calculate_fraud_score(db: Session, claim: Claim) -> dict:
+    """
+    Calculate fraud score (0-100) based on signals, with one query for the features.
+    Returns: { "fraud_score": int, "signals": list[dict] }
+    """
+    return score_fraud_features(claim, load_fraud_features(db, claim))
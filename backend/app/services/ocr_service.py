@@ -1,6 +1,8 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
 from uuid import UUID
+from typing import Tuple
 import pytesseract
 from PIL import Image
 
@@ -8,8 +10,41 @@ from app.models.document import Document
 from app.models.claim import Claim
 from app.models.user import User
 from app.services.timeline_service import add_event
+from app.utils import compute_pool
+from app.utils.metrics import stage_timer
+from app.storage import StorageError, get_storage, open_local_async, storage_key
 
 def extract_ocr_for_document(db: Session, current_user: User, document_id: UUID):
+    """Run OCR on a document in the compute pool, blocking the calling thread."""
+    document = _get_document(db, current_user, document_id)
+    with stage_timer("ocr"):
+        if not document.mime_type.startswith('image/'):
+            extracted_text, confidence = run_ocr(document.file_path, document.mime_type)
+        else:
+            try:
+                with get_storage().open_local(storage_key(document.file_path)) as local_path:
+                    extracted_text, confidence = compute_pool.run_sync(run_ocr, local_path, document.mime_type)
+            except StorageError:
+                # Missing file: same fallback as a failed OCR run
+                extracted_text, confidence = "", 0
+    return _save_ocr_result(db, document, extracted_text, confidence)
+
+async def extract_ocr_for_document_async(db: Session, current_user: User, document_id: UUID):
+    """Run OCR on a document in the compute pool without blocking the event loop."""
+    document = await run_in_threadpool(_get_document, db, current_user, document_id)
+    # Wall time including any wait for a free compute pool worker
+    with stage_timer("ocr"):
+        if not document.mime_type.startswith('image/'):
+            extracted_text, confidence = run_ocr(document.file_path, document.mime_type)
+        else:
+            try:
+                async with open_local_async(document.file_path) as local_path:
+                    extracted_text, confidence = await compute_pool.run(run_ocr, local_path, document.mime_type)
+            except StorageError:
+                extracted_text, confidence = "", 0
+    return await run_in_threadpool(_save_ocr_result, db, document, extracted_text, confidence)
+
+def _get_document(db: Session, current_user: User, document_id: UUID) -> Document:
     # 1. Fetch document and verify ownership via claim
     document = db.query(Document).join(Claim).filter(
         Document.id == document_id,
@@ -21,9 +56,14 @@ def extract_ocr_for_document(db: Session, current_user: User, document_id: UUID)
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document not found or access denied"
         )
-        
+    return document
+
+def run_ocr(file_path: str, mime_type: str) -> Tuple[str, int]:
+    """
+    Extract text from a file. Returns (text, confidence).
+    Module-level and DB-free so it can run in a compute pool worker.
+    """
     # 2. Run OCR
-    file_path = document.file_path
     extracted_text = ""
     confidence = 0
     
@@ -32,8 +72,9 @@ def extract_ocr_for_document(db: Session, current_user: User, document_id: UUID)
         # User said "fallback to return empty text... (do not crash)"
         
         # Simple check if image
-        if document.mime_type.startswith('image/'):
-            text = pytesseract.image_to_string(Image.open(file_path))
+        if mime_type.startswith('image/'):
+            with Image.open(file_path) as img:
+                text = pytesseract.image_to_string(img)
             extracted_text = text.strip()
             
             # Simple confidence score heuristic
@@ -53,7 +94,10 @@ def extract_ocr_for_document(db: Session, current_user: User, document_id: UUID)
         extracted_text = ""
         confidence = 0
         # Optional: log error
-        
+    
+    return extracted_text, confidence
+
+def _save_ocr_result(db: Session, document: Document, extracted_text: str, confidence: int) -> Document:
     # 3. Update document
     document.ocr_text = extracted_text
     document.ocr_confidence = confidence
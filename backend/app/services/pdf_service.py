@@ -1,3 +1,4 @@
+import io
 import os
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
@@ -10,9 +11,10 @@ from app.models.claim import Claim
 from app.models.policy import Policy
 from app.models.document import Document
 from app.services.timeline_service import get_timeline
-from app.config import settings
-from app.utils.file_storage import ensure_upload_dir
+from app.storage import get_storage, storage_key
+from app.utils.metrics import stage_timer
 
+@stage_timer("pdf_render")
 def generate_claim_summary_pdf(db: Session, current_user: User, claim_id: UUID) -> str:
     """
     Generate a simple PDF summary of the claim.
@@ -29,13 +31,12 @@ def generate_claim_summary_pdf(db: Session, current_user: User, claim_id: UUID)
 
     # Define path
     # uploads/<claim_id>/summary.pdf
-    claim_dir = os.path.join(settings.UPLOAD_DIR, str(claim_id))
-    ensure_upload_dir(claim_dir)
     file_name = "summary.pdf"
-    file_path = os.path.join(claim_dir, file_name)
+    file_path = os.path.join("uploads", str(claim_id), file_name)
     
-    # Create PDF
-    c = canvas.Canvas(file_path, pagesize=letter)
+    # Create PDF in memory, then write it through the storage backend
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
     width, height = letter
     
     # Header
@@ -105,6 +106,7 @@ def generate_claim_summary_pdf(db: Session, current_user: User, claim_id: UUID)
             break
 
     c.save()
+    get_storage().put(storage_key(file_path), buffer.getvalue(), "application/pdf")
     
     # Return relative path for API
-    return os.path.join("uploads", str(claim_id), file_name)
+    return file_path
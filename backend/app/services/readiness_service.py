@@ -5,6 +5,7 @@ from typing import List, Set
 from app.models.claim import Claim
 from app.models.document import Document
 from app.services.timeline_service import add_event
+from app.utils.constants import DOCUMENT_STATUS_COMPLETED
 
 REQUIRED_DOCS_HEALTH = {"hospital_bill", "discharge_summary", "prescription"}
 REQUIRED_DOCS_MOTOR = {"accident_photo", "repair_estimate", "rc_book"}
@@ -35,9 +36,11 @@ def calculate_readiness_score(db: Session, claim_id: UUID) -> int:
     # Duplicates usually shouldn't count if they are copies of existing ones, but assuming at least one valid copy exists.
     # Let's count all non-duplicate docs to be safe, or just distinct types.
     
+    # Pending and failed documents have no duplicate check yet and do not count
     uploaded_types = db.query(Document.document_type).filter(
         Document.claim_id == claim_id,
-        Document.is_duplicate == False
+        Document.is_duplicate == False,
+        Document.processing_status == DOCUMENT_STATUS_COMPLETED
     ).all()
     
     uploaded_set = {row[0] for row in uploaded_types}
@@ -0,0 +1,122 @@
+"""
+Thumbnails and previews of documents, cached on local disk.
+
+Renditions are keyed by content hash, size and format, so exact re-uploads
+share them. They are rendered once, either right after upload
+(RENDITION_PREGENERATE_SIZES) or on first request, in the compute pool, and
+kept in a DiskCache bounded by RENDITION_CACHE_MAX_MB. Pregenerated photo
+previews come from the upload's image analysis decode (see
+pregenerate_sizes()); only sizes it could not produce, and PDFs, are
+rendered from the file.
+"""
+
+import asyncio
+from typing import Dict, Mapping, Optional, Set
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.models.document import Document
+from app.storage import StorageError, open_local_async
+from app.utils import compute_pool
+from app.utils.constants import RENDITION_SIZES
+from app.utils.disk_cache import DiskCache
+from app.utils.logger import setup_logger
+from app.utils.renditions import render_rendition
+
+logger = setup_logger(__name__)
+
+_cache: Optional[DiskCache] = None
+_inflight: Dict[str, asyncio.Future] = {}
+_background: Set[asyncio.Task] = set()
+
+
+def get_cache() -> DiskCache:
+    global _cache
+    if _cache is None:
+        _cache = DiskCache(settings.RENDITION_CACHE_DIR, settings.RENDITION_CACHE_MAX_MB * 1024 * 1024)
+    return _cache
+
+
+def rendition_key(content: str, size: str) -> str:
+    return f"{content}-{size}.{settings.RENDITION_FORMAT}"
+
+
+def _content_id(document: Document) -> str:
+    # Files stored before content hashing fall back to the document id
+    return document.content_sha256 or f"doc{document.id.hex}"
+
+
+async def _render(file_path: str, size: str, key: str) -> Optional[str]:
+    try:
+        async with open_local_async(file_path) as local_path:
+            data = await compute_pool.run(
+                render_rendition, local_path, RENDITION_SIZES[size], settings.RENDITION_FORMAT
+            )
+    except StorageError:
+        return None
+    if data is None:
+        return None
+    return await run_in_threadpool(get_cache().put, key, data)
+
+
+async def _get_rendition(content: str, file_path: str, size: str) -> Optional[str]:
+    key = rendition_key(content, size)
+    path = await run_in_threadpool(get_cache().get, key)
+    if path is not None:
+        return path
+
+    # Concurrent requests for the same rendition share one render
+    pending = _inflight.get(key)
+    if pending is None:
+        pending = asyncio.ensure_future(_render(file_path, size, key))
+        _inflight[key] = pending
+        pending.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await asyncio.shield(pending)
+
+
+async def get_rendition(document: Document, size: str) -> Optional[str]:
+    """
+    Local path of the cached rendition of document at size (a RENDITION_SIZES
+    name), rendering it on a miss. Returns None when the file type has no preview.
+    """
+    return await _get_rendition(_content_id(document), document.file_path, size)
+
+
+def pregenerate_sizes() -> Dict[str, int]:
+    """RENDITION_PREGENERATE_SIZES as {size name: longest side}, for analyze_image."""
+    names = (size.strip() for size in settings.RENDITION_PREGENERATE_SIZES.split(","))
+    return {name: RENDITION_SIZES[name] for name in names if name in RENDITION_SIZES}
+
+
+async def _pregenerate(content_sha256: str, file_path: str, rendered: Mapping[str, bytes]) -> None:
+    for size in pregenerate_sizes():
+        try:
+            data = rendered.get(size)
+            if data is not None:
+                await run_in_threadpool(get_cache().put, rendition_key(content_sha256, size), data)
+            elif await _get_rendition(content_sha256, file_path, size) is None:
+                return  # no preview for this file type
+        except Exception as e:
+            logger.warning(f"Could not render {size} preview of {file_path}: {str(e)}")
+            return
+
+
+def schedule_pregeneration(
+    content_sha256: str,
+    file_path: str,
+    rendered: Optional[Mapping[str, bytes]] = None
+) -> None:
+    """
+    Store the RENDITION_PREGENERATE_SIZES previews of a newly stored file in
+    the background. rendered holds the previews the image analysis already
+    encoded (ImageAnalysis.renditions); missing sizes are rendered from the
+    file. Takes plain values: the request's session is gone by the time the
+    task runs.
+    """
+    if not settings.RENDITION_PREGENERATE_SIZES:
+        return
+    task = asyncio.create_task(_pregenerate(content_sha256, file_path, rendered or {}))
+    # Keep a reference so the task is not garbage collected before it finishes
+    _background.add(task)
+    task.add_done_callback(_background.discard)
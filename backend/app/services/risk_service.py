@@ -0,0 +1,110 @@
+"""
+Risk assessment of a claim (readiness and fraud score), cached per claim version.
+
+The claim detail page polls GET /claims/{id}/risk. An assessment is cached
+under the claim id, the claim's version (bumped on document upload, OCR and
+claim updates, see claim_version_service) and the fingerprint of the fraud
+rules, so a hit is served with no recomputation and no writes. Each
+assessment carries an ETag derived from its content for conditional GETs.
+
+The claim frequency feature also depends on the user's other claims and on
+the date, which the version does not cover: entries are tagged with the user
+and dropped when a transaction that creates or deletes one of the user's
+claims commits, and RISK_CACHE_TTL_SECONDS bounds the rest.
+"""
+
+import hashlib
+import json
+from itertools import chain
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.claim import Claim
+from app.services.fraud_rules import get_plan
+from app.services.fraud_service import calculate_fraud_score
+from app.services.readiness_service import calculate_readiness_score
+from app.utils.cache import create_cache
+
+_cache = None
+
+# Session.info key for the users whose claims changed in the open transaction
+_CHANGED_USERS_KEY = "risk_changed_user_ids"
+
+
+def _get_cache():
+    global _cache
+    if _cache is None:
+        _cache = create_cache(
+            "claim-risk",
+            maxsize=settings.RISK_CACHE_SIZE,
+            ttl=settings.RISK_CACHE_TTL_SECONDS
+        )
+    return _cache
+
+
+def _user_tag(user_id: Any) -> str:
+    return f"user:{user_id}"
+
+
+def _assess(db: Session, claim: Claim) -> Dict[str, Any]:
+    claim_id = claim.id
+    # May commit a new readiness score and log a timeline event
+    readiness_score = calculate_readiness_score(db, claim_id)
+    fraud_result = calculate_fraud_score(db, claim)
+    assessment = {
+        "claim_id": str(claim_id),
+        "readiness_score": readiness_score,
+        "fraud_score": fraud_result.get("fraud_score", 0),
+        "signals": fraud_result.get("signals", [])
+    }
+    digest = hashlib.sha256(json.dumps(assessment, sort_keys=True, default=str).encode()).hexdigest()
+    assessment["etag"] = f'"{digest[:32]}"'
+    return assessment
+
+
+def get_risk_assessment(db: Session, claim: Claim) -> Dict[str, Any]:
+    """
+    Risk assessment of a claim the caller may read, from the cache when the
+    claim has not changed. Do not modify the returned dict.
+    Returns: { "claim_id", "readiness_score", "fraud_score", "signals", "etag" }
+    """
+    if settings.RISK_CACHE_TTL_SECONDS <= 0:
+        return _assess(db, claim)
+
+    key = f"{claim.id}:{claim.version}:{get_plan().fingerprint}"
+    tags = (_user_tag(claim.user_id),)
+    assessment = _get_cache().get(key)
+    if assessment is None:
+        assessment = _assess(db, claim)
+        _get_cache().set(key, assessment, tags=tags)
+    return assessment
+
+
+def invalidate_user_claims(user_id: Any) -> None:
+    """Forget the cached assessments of all claims of a user."""
+    if _cache is not None:
+        _cache.invalidate_tag(_user_tag(user_id))
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_user_claim_changes(session: Session, flush_context) -> None:
+    # new/deleted still hold the pre-flush state here
+    user_ids = {obj.user_id for obj in chain(session.new, session.deleted) if isinstance(obj, Claim)}
+    if user_ids:
+        session.info.setdefault(_CHANGED_USERS_KEY, set()).update(user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _user_claims_committed(session: Session) -> None:
+    # Invalidating before the commit would let a concurrent request re-cache
+    # an assessment computed from the uncommitted claims
+    for user_id in session.info.pop(_CHANGED_USERS_KEY, ()):
+        invalidate_user_claims(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _user_claims_rolled_back(session: Session) -> None:
+    session.info.pop(_CHANGED_USERS_KEY, None)
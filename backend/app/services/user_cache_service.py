@@ -0,0 +1,124 @@
+"""
+Cache of authenticated users, keyed by a hash of the access token.
+
+Without it get_current_user decodes the JWT and loads the user row on every
+request. An entry is a snapshot of the user's columns (never the password
+hash) and lives for AUTH_USER_CACHE_TTL_SECONDS, and never past the token's
+own expiry. Updating or deleting a user drops all of that user's entries once
+the transaction commits.
+
+A cached user is a transient User instance: read its attributes, but do not
+add it to a session or modify it.
+"""
+
+import hashlib
+import time
+from datetime import datetime
+from itertools import chain
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.user import User
+from app.utils.cache import create_cache
+
+_cache = None
+
+# Session.info key for the users changed in the open transaction
+_CHANGED_USERS_KEY = "auth_changed_user_ids"
+
+_SNAPSHOT_COLUMNS = ("id", "name", "phone", "email", "language_preference", "created_at", "updated_at")
+
+
+def _get_cache():
+    global _cache
+    if _cache is None:
+        _cache = create_cache(
+            "auth-user",
+            maxsize=settings.AUTH_USER_CACHE_SIZE,
+            ttl=settings.AUTH_USER_CACHE_TTL_SECONDS
+        )
+    return _cache
+
+
+def _token_key(token: str) -> str:
+    # Raw tokens are credentials; only their hash is used as a key
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _user_tag(user_id: Any) -> str:
+    return f"user:{user_id}"
+
+
+def _snapshot(user: User) -> Dict[str, Any]:
+    """JSON-safe copy of the user's public columns (shared caches store JSON)."""
+    snapshot = {}
+    for column in _SNAPSHOT_COLUMNS:
+        value = getattr(user, column)
+        if isinstance(value, UUID):
+            value = str(value)
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        snapshot[column] = value
+    return snapshot
+
+
+def _from_snapshot(snapshot: Dict[str, Any]) -> User:
+    values = dict(snapshot)
+    values["id"] = UUID(values["id"])
+    for column in ("created_at", "updated_at"):
+        if values.get(column):
+            values[column] = datetime.fromisoformat(values[column])
+    return User(**values)
+
+
+def get_cached_user(token: str) -> Optional[User]:
+    """User previously cached for this token, or None."""
+    if settings.AUTH_USER_CACHE_TTL_SECONDS <= 0:
+        return None
+    snapshot = _get_cache().get(_token_key(token))
+    return _from_snapshot(snapshot) if snapshot is not None else None
+
+
+def cache_user(token: str, user: User, expires_at: Optional[int] = None) -> None:
+    """Remember the user authenticated by token until the TTL or the token's exp, whichever is first."""
+    ttl = settings.AUTH_USER_CACHE_TTL_SECONDS
+    if expires_at is not None:
+        ttl = min(ttl, expires_at - time.time())
+    if ttl <= 0:
+        return
+    _get_cache().set(_token_key(token), _snapshot(user), ttl, tags=(_user_tag(user.id),))
+
+
+def invalidate_user(user_id: Any) -> None:
+    """Forget every cached token of a user."""
+    if _cache is not None:
+        _cache.invalidate_tag(_user_tag(user_id))
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_user_changes(session: Session, flush_context) -> None:
+    # dirty/deleted still hold the pre-flush state here; dirty also lists
+    # instances that were only touched, so check for real changes
+    user_ids = {
+        obj.id for obj in chain(session.dirty, session.deleted)
+        if isinstance(obj, User) and (obj in session.deleted or session.is_modified(obj))
+    }
+    if user_ids:
+        session.info.setdefault(_CHANGED_USERS_KEY, set()).update(user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _users_committed(session: Session) -> None:
+    # Invalidating before the commit would let a concurrent request re-cache
+    # the old row until the TTL runs out
+    for user_id in session.info.pop(_CHANGED_USERS_KEY, ()):
+        invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _users_rolled_back(session: Session) -> None:
+    session.info.pop(_CHANGED_USERS_KEY, None)
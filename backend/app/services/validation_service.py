@@ -5,6 +5,7 @@ from app.models.claim import Claim
 from app.models.policy import Policy
 from app.models.document import Document
 from app.services.timeline_service import add_event
+from app.utils.constants import DOCUMENT_STATUS_COMPLETED
 
 REQUIRED_DOCS_HEALTH = {"hospital_bill", "discharge_summary", "prescription"}
 REQUIRED_DOCS_MOTOR = {"accident_photo", "repair_estimate", "rc_book"}
@@ -55,9 +56,11 @@ def validate_claim(db: Session, claim: Claim) -> dict:
         required_docs = REQUIRED_DOCS_MOTOR
     
     if required_docs:
+        # Only analysed documents: the duplicate check has not run on the others
         uploaded_docs = db.query(Document.document_type).filter(
             Document.claim_id == claim.id,
-            Document.is_duplicate == False
+            Document.is_duplicate == False,
+            Document.processing_status == DOCUMENT_STATUS_COMPLETED
         ).all()
         uploaded_types = {row[0] for row in uploaded_docs}
         
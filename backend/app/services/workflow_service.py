@@ -11,6 +11,7 @@ from app.services.validation_service import validate_claim
 from app.services.fraud_service import calculate_fraud_score
 from app.services.ocr_service import extract_ocr_for_document
 from app.schemas.workflow import SubmitClaimResponse, Signal
+from app.utils.constants import DOCUMENT_STATUS_PENDING, DOCUMENT_STATUS_PROCESSING
 
 def submit_claim(db: Session, current_user: User, claim_id: UUID) -> SubmitClaimResponse:
     """
@@ -26,6 +27,18 @@ def submit_claim(db: Session, current_user: User, claim_id: UUID) -> SubmitClaim
     if claim.status != "DRAFT":
         raise HTTPException(status_code=400, detail=f"Claim status is {claim.status}, cannot submit")
     
+    # Documents still in the processing queue have no quality score or
+    # duplicate check yet; deciding now would skip both
+    unprocessed = db.query(Document.id).filter(
+        Document.claim_id == claim.id,
+        Document.processing_status.in_([DOCUMENT_STATUS_PENDING, DOCUMENT_STATUS_PROCESSING])
+    ).count()
+    if unprocessed:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"{unprocessed} document(s) still being processed, submit again once processing is complete"
+        )
+    
     # 3. Update status to SUBMITTED
     claim.status = "SUBMITTED"
     add_event(db, claim_id, "STATUS_CHANGED", "Claim submitted for processing")
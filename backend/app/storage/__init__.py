@@ -0,0 +1,102 @@
+"""
+File storage backends.
+
+All reads and writes of uploaded files and generated PDFs go through
+get_storage(), selected by settings.STORAGE_BACKEND:
+"local" (UPLOAD_DIR on disk), "s3" (S3-compatible bucket) or "memory".
+"""
+
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.storage.base import ObjectStat, StorageBackend, StorageError, StorageNotFound
+from app.storage.local import LocalStorage
+from app.storage.memory import InMemoryStorage
+from app.storage.s3 import S3Storage
+
+_storage: Optional[StorageBackend] = None
+_storage_lock = threading.Lock()
+
+
+def create_storage() -> StorageBackend:
+    """Build the backend configured in settings."""
+    backend = settings.STORAGE_BACKEND
+    if backend == "local":
+        return LocalStorage(settings.UPLOAD_DIR)
+    if backend == "s3":
+        return S3Storage(
+            bucket=settings.S3_BUCKET,
+            prefix=settings.S3_PREFIX,
+            # Empty values in .env mean "use the boto3 default"
+            endpoint_url=settings.S3_ENDPOINT_URL or None,
+            region_name=settings.S3_REGION or None,
+            access_key_id=settings.S3_ACCESS_KEY_ID or None,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY or None
+        )
+    if backend == "memory":
+        return InMemoryStorage()
+    raise StorageError(f"Unknown STORAGE_BACKEND: {backend}")
+
+
+def get_storage() -> StorageBackend:
+    """Return the process-wide storage backend, creating it on first use."""
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            _storage = create_storage()
+        return _storage
+
+
+def set_storage(storage: Optional[StorageBackend]) -> None:
+    """Replace the process-wide backend (tests, scripts). None resets to settings."""
+    global _storage
+    with _storage_lock:
+        _storage = storage
+
+
+def storage_key(file_path: str) -> str:
+    """
+    Map a stored path such as "uploads/blobs/ab/<sha256>.pdf" to its storage
+    key ("blobs/ab/<sha256>.pdf").
+    """
+    parts = [part for part in file_path.replace("\\", "/").split("/") if part and part != "."]
+    if parts and parts[0] == "uploads":
+        parts = parts[1:]
+    if not parts or ".." in parts:
+        raise StorageError(f"Invalid file path: {file_path}")
+    return "/".join(parts)
+
+
+
+@asynccontextmanager
+async def open_local_async(file_path: str) -> AsyncIterator[str]:
+    """
+    Async form of StorageBackend.open_local for a stored file path; any
+    download or cleanup runs on the threadpool.
+    """
+    context = get_storage().open_local(storage_key(file_path))
+    local_path = await run_in_threadpool(context.__enter__)
+    try:
+        yield local_path
+    finally:
+        await run_in_threadpool(context.__exit__, None, None, None)
+
+
+__all__ = [
+    "InMemoryStorage",
+    "LocalStorage",
+    "ObjectStat",
+    "S3Storage",
+    "StorageBackend",
+    "StorageError",
+    "StorageNotFound",
+    "create_storage",
+    "get_storage",
+    "open_local_async",
+    "set_storage",
+    "storage_key",
+]
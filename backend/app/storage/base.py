@@ -0,0 +1,119 @@
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import BinaryIO, Iterator, Optional, Union
+
+from app.utils.constants import UPLOAD_CHUNK_SIZE
+
+
+class StorageError(Exception):
+    """Raised when a storage operation fails."""
+
+
+class StorageNotFound(StorageError):
+    """Raised when a key does not exist."""
+
+
+@dataclass
+class ObjectStat:
+    size: int
+    modified: Optional[datetime] = None
+
+
+class StorageBackend(ABC):
+    """
+    Interface for stored file contents.
+
+    Keys are "/"-separated paths relative to the storage root, e.g.
+    "blobs/ab/ab12....pdf". Document.file_path values ("uploads/...") are
+    mapped to keys with storage_key().
+    """
+
+    @abstractmethod
+    def put(self, key: str, data: Union[bytes, BinaryIO], content_type: Optional[str] = None) -> None:
+        """Store data under key, replacing any existing object."""
+
+    @abstractmethod
+    def put_file(self, key: str, local_path: str, content_type: Optional[str] = None) -> None:
+        """Store a local file under key. The local file is consumed (moved or deleted)."""
+
+    @abstractmethod
+    def get(self, key: str) -> bytes:
+        """Return the whole object. Raises StorageNotFound."""
+
+    @abstractmethod
+    def stream(
+        self,
+        key: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: int = UPLOAD_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """Yield the bytes in [start, end] (inclusive; end=None means to the end)."""
+
+    @abstractmethod
+    def stat(self, key: str) -> Optional[ObjectStat]:
+        """Return size and modification time, or None if the key does not exist."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Delete key. Deleting a missing key is not an error."""
+
+    def exists(self, key: str) -> bool:
+        return self.stat(key) is not None
+
+    def presign(
+        self,
+        key: str,
+        expires_in: int = 300,
+        filename: Optional[str] = None,
+        disposition: str = "inline"
+    ) -> Optional[str]:
+        """
+        Return a time-limited URL that serves key without going through the API,
+        or None when the backend cannot issue one.
+        """
+        return None
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Filesystem path of key when the backend stores files locally, else None."""
+        return None
+
+    @contextmanager
+    def open_local(self, key: str) -> Iterator[str]:
+        """
+        Yield a local filesystem path with the contents of key, for libraries
+        that need a real file (PIL, tesseract). Remote objects are downloaded to
+        a temporary file that is removed afterwards.
+        """
+        path = self.local_path(key)
+        if path is not None:
+            if not os.path.exists(path):
+                raise StorageNotFound(key)
+            yield path
+            return
+
+        suffix = os.path.splitext(key)[1]
+        fd, temp_path = tempfile.mkstemp(suffix=suffix)
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                for chunk in self.stream(key):
+                    temp_file.write(chunk)
+            yield temp_path
+        finally:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+
+def copy_to(source: Union[bytes, BinaryIO], destination: BinaryIO) -> None:
+    """Write bytes or a file-like object to destination."""
+    if isinstance(source, (bytes, bytearray)):
+        destination.write(source)
+    else:
+        shutil.copyfileobj(source, destination, UPLOAD_CHUNK_SIZE)
@@ -0,0 +1,56 @@
+import threading
+from datetime import datetime, timezone
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple, Union
+import io
+import os
+
+from app.storage.base import ObjectStat, StorageBackend, StorageNotFound, copy_to
+from app.utils.constants import UPLOAD_CHUNK_SIZE
+
+
+class InMemoryStorage(StorageBackend):
+    """Process-local object store for tests and single-process development."""
+
+    def __init__(self):
+        self._objects: Dict[str, Tuple[bytes, datetime]] = {}
+        self._lock = threading.Lock()
+
+    def put(self, key: str, data: Union[bytes, BinaryIO], content_type: Optional[str] = None) -> None:
+        buffer = io.BytesIO()
+        copy_to(data, buffer)
+        with self._lock:
+            self._objects[key] = (buffer.getvalue(), datetime.now(timezone.utc))
+
+    def put_file(self, key: str, local_path: str, content_type: Optional[str] = None) -> None:
+        with open(local_path, "rb") as f:
+            self.put(key, f, content_type)
+        os.remove(local_path)
+
+    def get(self, key: str) -> bytes:
+        with self._lock:
+            if key not in self._objects:
+                raise StorageNotFound(key)
+            return self._objects[key][0]
+
+    def stream(
+        self,
+        key: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: int = UPLOAD_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        data = self.get(key)
+        stop = len(data) if end is None else min(end + 1, len(data))
+        for offset in range(start, stop, chunk_size):
+            yield data[offset:min(offset + chunk_size, stop)]
+
+    def stat(self, key: str) -> Optional[ObjectStat]:
+        with self._lock:
+            entry = self._objects.get(key)
+        if entry is None:
+            return None
+        return ObjectStat(size=len(entry[0]), modified=entry[1])
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._objects.pop(key, None)
@@ -0,0 +1,120 @@
+import os
+from typing import Any, BinaryIO, Iterator, Optional, Union
+
+from app.storage.base import ObjectStat, StorageBackend, StorageError, StorageNotFound
+from app.utils.constants import UPLOAD_CHUNK_SIZE
+
+
+def _is_not_found(error: Exception) -> bool:
+    code = getattr(error, "response", {}).get("Error", {}).get("Code")
+    return code in ("404", "NoSuchKey", "NotFound")
+
+
+class S3Storage(StorageBackend):
+    """
+    Objects in an S3-compatible bucket (AWS S3, MinIO, ...).
+
+    client is any object with the boto3 S3 client API; when omitted a boto3
+    client is created from the remaining arguments (boto3 must be installed).
+    scripts/check_s3_storage.py runs the backend contract against an
+    in-process fake client or an S3-compatible server such as MinIO.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        client: Any = None,
+        endpoint_url: Optional[str] = None,
+        region_name: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None
+    ):
+        if not bucket:
+            raise StorageError("S3_BUCKET must be set for the S3 storage backend")
+
+        if client is None:
+            try:
+                import boto3
+            except ImportError:
+                raise StorageError("boto3 is required for STORAGE_BACKEND=s3 (pip install boto3)")
+            client = boto3.client(
+                "s3",
+                endpoint_url=endpoint_url,
+                region_name=region_name,
+                aws_access_key_id=access_key_id,
+                aws_secret_access_key=secret_access_key
+            )
+
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def put(self, key: str, data: Union[bytes, BinaryIO], content_type: Optional[str] = None) -> None:
+        extra = {"ContentType": content_type} if content_type else {}
+        self.client.put_object(Bucket=self.bucket, Key=self._key(key), Body=data, **extra)
+
+    def put_file(self, key: str, local_path: str, content_type: Optional[str] = None) -> None:
+        extra = {"ExtraArgs": {"ContentType": content_type}} if content_type else {}
+        # upload_file switches to multipart uploads for large files
+        self.client.upload_file(local_path, self.bucket, self._key(key), **extra)
+        os.remove(local_path)
+
+    def _get_object(self, key: str, byte_range: Optional[str] = None) -> dict:
+        extra = {"Range": byte_range} if byte_range else {}
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self._key(key), **extra)
+        except Exception as e:
+            if _is_not_found(e):
+                raise StorageNotFound(key)
+            raise
+
+    def get(self, key: str) -> bytes:
+        return self._get_object(key)["Body"].read()
+
+    def stream(
+        self,
+        key: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: int = UPLOAD_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        byte_range = None
+        if start or end is not None:
+            byte_range = f"bytes={start}-{'' if end is None else end}"
+        body = self._get_object(key, byte_range)["Body"]
+        try:
+            while True:
+                chunk = body.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+    def stat(self, key: str) -> Optional[ObjectStat]:
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except Exception as e:
+            if _is_not_found(e):
+                return None
+            raise
+        return ObjectStat(size=head["ContentLength"], modified=head.get("LastModified"))
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def presign(
+        self,
+        key: str,
+        expires_in: int = 300,
+        filename: Optional[str] = None,
+        disposition: str = "inline"
+    ) -> Optional[str]:
+        params = {"Bucket": self.bucket, "Key": self._key(key)}
+        if filename:
+            params["ResponseContentDisposition"] = f'{disposition}; filename="{filename}"'
+        return self.client.generate_presigned_url("get_object", Params=params, ExpiresIn=expires_in)
@@ -0,0 +1,175 @@
+"""
+Small key/value caches with per-entry expiry.
+
+TTLCache is an in-process LRU; RedisCache shares entries between API
+processes and hosts (requires the redis package). Both support tags: entries
+stored with a tag can be dropped together with invalidate_tag(), e.g. every
+cached token of one user. create_cache() picks the backend from
+settings.CACHE_BACKEND.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from app.config import settings
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class TTLCache:
+    """Thread-safe LRU cache with a maximum size and per-entry time to live."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # key -> (expires_at, value, tags)
+        self._data: "OrderedDict[str, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _remove(self, key: str) -> None:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                self._remove(key)
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        tags = tuple(tags)
+        with self._lock:
+            self._remove(key)
+            self._data[key] = (time.monotonic() + ttl, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._data) > self.maxsize:
+                self._remove(next(iter(self._data)))
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def invalidate_tag(self, tag: str) -> None:
+        """Drop every entry stored with tag."""
+        with self._lock:
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._tags.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_redis_clients: Dict[str, Any] = {}
+_redis_lock = threading.Lock()
+
+
+def _redis_client(url: str) -> Any:
+    with _redis_lock:
+        if url not in _redis_clients:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("redis is required for CACHE_BACKEND=redis (pip install redis)")
+            _redis_clients[url] = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        return _redis_clients[url]
+
+
+class RedisCache:
+    """
+    TTLCache interface on a shared Redis. Values must be JSON-serialisable.
+    Redis errors are logged and treated as cache misses, so an unavailable
+    cache slows requests down instead of failing them.
+    """
+
+    def __init__(self, namespace: str, ttl: float = 60.0, client: Any = None, url: Optional[str] = None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.client = client if client is not None else _redis_client(url or settings.REDIS_URL)
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.namespace}:tag:{tag}"
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self.client.get(self._key(key))
+        except Exception as e:
+            logger.warning(f"Cache read failed ({self.namespace}): {str(e)}")
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        milliseconds = max(int(ttl * 1000), 1)
+        try:
+            pipe = self.client.pipeline()
+            pipe.set(self._key(key), json.dumps(value), px=milliseconds)
+            for tag in tags:
+                tag_key = self._tag_key(tag)
+                pipe.sadd(tag_key, key)
+                # The tag set only has to outlive the entries added to it
+                pipe.pexpire(tag_key, max(milliseconds, int(self.ttl * 1000)))
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Cache write failed ({self.namespace}): {str(e)}")
+
+    def delete(self, key: str) -> None:
+        try:
+            self.client.delete(self._key(key))
+        except Exception as e:
+            logger.warning(f"Cache delete failed ({self.namespace}): {str(e)}")
+
+    def invalidate_tag(self, tag: str) -> None:
+        tag_key = self._tag_key(tag)
+        try:
+            keys = self.client.smembers(tag_key)
+            self.client.delete(tag_key, *[self._key(k.decode() if isinstance(k, bytes) else k) for k in keys])
+        except Exception as e:
+            logger.warning(f"Cache invalidation failed ({self.namespace}): {str(e)}")
+
+    def clear(self) -> None:
+        try:
+            keys = list(self.client.scan_iter(match=f"{self.namespace}:*"))
+            if keys:
+                self.client.delete(*keys)
+        except Exception as e:
+            logger.warning(f"Cache clear failed ({self.namespace}): {str(e)}")
+
+
+def create_cache(namespace: str, maxsize: int, ttl: float):
+    """Cache for one use (namespace) on the configured CACHE_BACKEND: "memory" or "redis"."""
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCache(namespace, ttl=ttl)
+    if settings.CACHE_BACKEND == "memory":
+        return TTLCache(maxsize=maxsize, ttl=ttl)
+    raise ValueError(f"Unknown CACHE_BACKEND: {settings.CACHE_BACKEND}")
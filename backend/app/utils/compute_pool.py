@@ -0,0 +1,130 @@
+"""
+Process pool for CPU-bound work (image decoding, quality scoring, pHash, OCR).
+
+Work submitted here runs in separate worker processes so it neither holds the
+GIL of the API worker nor ties up its threadpool. Functions and arguments must
+be picklable, i.e. module-level functions taking plain values.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> Optional[ProcessPoolExecutor]:
+    """
+    Return the shared process pool, creating it on first use.
+    Returns None when COMPUTE_POOL_WORKERS is 0 (work then runs in-process).
+    """
+    global _executor
+    if settings.COMPUTE_POOL_WORKERS <= 0:
+        return None
+
+    with _executor_lock:
+        if _executor is None:
+            # spawn, not fork: the API process has threads and open DB connections
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.COMPUTE_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"Compute pool started with {settings.COMPUTE_POOL_WORKERS} workers")
+        return _executor
+
+
+def _reset_executor(broken: ProcessPoolExecutor) -> None:
+    """Drop a pool whose worker died so the next submission starts a fresh one."""
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit(fn: Callable[..., Any], *args: Any) -> Tuple[Optional[ProcessPoolExecutor], Future]:
+    """Submit fn(*args) and return the executor it went to (None when run in-process) and its Future."""
+    executor = get_executor()
+    if executor is None:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return None, future
+
+    try:
+        return executor, executor.submit(fn, *args)
+    except BrokenProcessPool:
+        logger.warning("Compute pool was broken, restarting it")
+        _reset_executor(executor)
+        executor = get_executor()
+        return executor, executor.submit(fn, *args)
+
+
+def _restart_broken(executor: ProcessPoolExecutor, fn: Callable[..., Any]) -> None:
+    """A worker died while fn was in flight: restart the pool before fn is resubmitted once."""
+    logger.warning(f"Compute pool worker died while running {fn.__name__}, restarting the pool and retrying")
+    _reset_executor(executor)
+
+
+def submit(fn: Callable[..., Any], *args: Any) -> Future:
+    """Submit fn(*args) to the pool and return a concurrent Future."""
+    return _submit(fn, *args)[1]
+
+
+def run_sync(fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run fn(*args) in the pool and block the calling thread until it finishes.
+    If a worker dies while fn is in flight the pool is restarted and fn is
+    resubmitted once; a second BrokenProcessPool is raised.
+    """
+    executor, future = _submit(fn, *args)
+    try:
+        return future.result()
+    except BrokenProcessPool:
+        if executor is None:
+            raise
+        _restart_broken(executor, fn)
+    return submit(fn, *args).result()
+
+
+async def run(fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run fn(*args) in the pool and await the result without blocking the event loop.
+    Retries once on a fresh pool if a worker dies, like run_sync.
+    """
+    if get_executor() is None:
+        return await run_in_threadpool(fn, *args)
+
+    executor, future = _submit(fn, *args)
+    try:
+        return await asyncio.wrap_future(future)
+    except BrokenProcessPool:
+        _restart_broken(executor, fn)
+    return await asyncio.wrap_future(submit(fn, *args))
+
+
+def start() -> None:
+    """Create the pool eagerly (called at application startup)."""
+    get_executor()
+
+
+def shutdown() -> None:
+    """Stop the pool's worker processes (called at application shutdown)."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -17,4 +17,23 @@ DB_NAMING_CONVENTION = {
 
 # File Upload
 MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10MB
+MAX_REQUEST_BODY_SIZE = MAX_UPLOAD_SIZE + 1024 * 1024  # upload plus multipart form overhead
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB read/write chunks
 ALLOWED_EXTENSIONS = {".pdf", ".jpg", ".jpeg", ".png", ".docx"}
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}  # analysed for quality and pHash
+PDF_EXTENSIONS = {".pdf"}
+
+# Renditions (longest side in pixels)
+RENDITION_SIZES = {"small": 160, "medium": 320, "large": 800}
+
+# Duplicate Detection
+PHASH_DB_BANDS = 4  # number of phash_band_* columns on documents
+
+# Document Processing
+DOCUMENT_STATUS_PENDING = "pending"  # saved, waiting for analysis
+DOCUMENT_STATUS_PROCESSING = "processing"
+DOCUMENT_STATUS_COMPLETED = "completed"
+DOCUMENT_STATUS_FAILED = "failed"
+
+# Claims
+OPEN_CLAIM_STATUSES = ("DRAFT", "SUBMITTED", "UNDER_REVIEW")  # not yet decided or paid
@@ -0,0 +1,245 @@
+import mimetypes
+import re
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import HTTPException, Request, status
+from starlette.responses import FileResponse, Response, StreamingResponse
+from typing import List, Optional, Tuple
+from urllib.parse import quote
+
+from app.config import settings
+from app.models.document import Document
+from app.storage import ObjectStat, StorageError, get_storage, storage_key
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def guess_media_type(file_path: str) -> str:
+    content_type, _ = mimetypes.guess_type(file_path)
+    return content_type or "application/octet-stream"
+
+
+def make_etag(sha256: Optional[str], stat: ObjectStat) -> str:
+    """
+    Strong ETag from the content hash; files stored before hashing get a weak
+    ETag from size and modification time.
+    """
+    if sha256:
+        return f'"{sha256}"'
+    modified = int(stat.modified.timestamp()) if stat.modified else 0
+    return f'W/"{stat.size:x}-{modified:x}"'
+
+
+def _etag_list(header: str) -> List[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def _weak_match(etag: str, candidates: List[str]) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored."""
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    return any(
+        candidate == "*" or (candidate[2:] if candidate.startswith("W/") else candidate) == opaque
+        for candidate in candidates
+    )
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match lists etag (weak comparison)."""
+    if_none_match = request.headers.get("if-none-match")
+    return if_none_match is not None and _weak_match(etag, _etag_list(if_none_match))
+
+
+def _not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if request.headers.get("if-none-match") is not None:
+        # If-Modified-Since is ignored when If-None-Match is present
+        return etag_matches(request, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second resolution
+        return int(last_modified.timestamp()) <= int(since.timestamp())
+    return False
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range "bytes=" header into inclusive (start, end).
+    Returns None for headers we do not honour (multiple ranges, other units),
+    which means "send the whole file". Raises ValueError if unsatisfiable.
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError("Unsatisfiable range")
+    return start, min(end, size - 1)
+
+
+def _range_applies(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """If-Range: only honour Range when the client's copy is still current."""
+    if_range = request.headers.get("if-range")
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        # Strong comparison; weak validators never match
+        return not etag.startswith("W/") and if_range == etag
+    try:
+        return last_modified is not None and \
+            int(parsedate_to_datetime(if_range).timestamp()) == int(last_modified.timestamp())
+    except (TypeError, ValueError):
+        return False
+
+
+def proxy_delivery_response(
+    local_path: Optional[str],
+    key: str,
+    media_type: str,
+    headers: dict
+) -> Optional[Response]:
+    """
+    Empty response with an internal-redirect header for FILE_DELIVERY_MODE
+    "x-accel" (nginx X-Accel-Redirect to X_ACCEL_REDIRECT_PREFIX/<key>) or
+    "x-sendfile" (absolute path). Returns None in "app" mode or when the file
+    is not on local disk (remote storage is streamed by the app).
+    """
+    mode = settings.FILE_DELIVERY_MODE
+    if mode == "app" or local_path is None:
+        return None
+
+    headers = dict(headers)
+    if mode == "x-accel":
+        headers["X-Accel-Redirect"] = f"{settings.X_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{quote(key)}"
+    elif mode == "x-sendfile":
+        headers["X-Sendfile"] = local_path
+    else:
+        raise ValueError(f"Unknown FILE_DELIVERY_MODE: {mode}")
+
+    # The proxy computes Content-Length and serves ranges from the file itself
+    return Response(media_type=media_type, headers=headers)
+
+
+def stored_file_response(
+    request: Request,
+    file_path: str,
+    filename: str,
+    media_type: Optional[str] = None,
+    disposition: str = "inline",
+    sha256: Optional[str] = None,
+    cache_control: str = "private, no-cache"
+) -> Response:
+    """
+    Serve a stored file through the configured storage backend with
+    conditional GET (ETag / If-None-Match, If-Modified-Since -> 304) and
+    single byte-range support (206 / 416).
+    Full local files are sent with FileResponse, or by the reverse proxy when
+    FILE_DELIVERY_MODE is set; everything else is streamed.
+    """
+    storage = get_storage()
+    try:
+        key = storage_key(file_path)
+        stat = storage.stat(key)
+    except StorageError:
+        stat = None
+
+    if stat is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found"
+        )
+
+    etag = make_etag(sha256, stat)
+    last_modified = stat.modified
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        # Per-user access control by default: browsers may keep it but must revalidate
+        "Cache-Control": cache_control,
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    media_type = media_type or guess_media_type(file_path)
+    headers["Content-Disposition"] = f'{disposition}; filename="{filename}"'
+
+    # Hand the bytes (including Range requests) to the reverse proxy
+    proxied = proxy_delivery_response(storage.local_path(key), key, media_type, headers)
+    if proxied is not None:
+        return proxied
+
+    range_header = request.headers.get("range")
+    if range_header and _range_applies(request, etag, last_modified):
+        try:
+            byte_range = parse_range(range_header, stat.size)
+        except ValueError:
+            return Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={"Content-Range": f"bytes */{stat.size}", "ETag": etag, "Accept-Ranges": "bytes"}
+            )
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{stat.size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                storage.stream(key, start, end),
+                status_code=status.HTTP_206_PARTIAL_CONTENT,
+                media_type=media_type,
+                headers=headers
+            )
+
+    local_path = storage.local_path(key)
+    if local_path is not None:
+        return FileResponse(path=local_path, media_type=media_type, headers=headers)
+
+    headers["Content-Length"] = str(stat.size)
+    return StreamingResponse(storage.stream(key), media_type=media_type, headers=headers)
+
+
+def cached_file_response(
+    request: Request,
+    path: str,
+    media_type: str,
+    etag: str,
+    cache_control: str = "private, no-cache"
+) -> Response:
+    """
+    Send a local file whose content never changes for a given etag (e.g. a
+    rendition keyed by content hash), answering If-None-Match with 304.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if _not_modified(request, etag, None):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return FileResponse(path=path, media_type=media_type, headers=headers)
+
+
+def document_file_response(request: Request, document: Document, disposition: str = "inline") -> Response:
+    """stored_file_response for a Document, using its stored MIME type and content hash."""
+    return stored_file_response(
+        request,
+        document.file_path,
+        document.file_name,
+        media_type=document.mime_type,
+        disposition=disposition,
+        sha256=document.content_sha256
+    )
@@ -1,70 +1,89 @@
 import os
-import shutil
+import uuid
+import hashlib
 from pathlib import Path
-from datetime import datetime
 from fastapi import UploadFile, HTTPException, status
-from typing import Tuple
+from typing import BinaryIO, Tuple
 
 from app.config import settings
+from app.storage import get_storage, storage_key
+from app.utils.constants import MAX_UPLOAD_SIZE, UPLOAD_CHUNK_SIZE
 
 def ensure_upload_dir(directory: str) -> None:
     """Ensure the upload directory exists."""
     os.makedirs(directory, exist_ok=True)
 
-def save_upload_file(
-    upload_dir: str, 
-    claim_id: str, 
-    uploaded_file: UploadFile
-) -> Tuple[str, str, str, int]:
+def write_stream(
+    source: BinaryIO,
+    destination: str,
+    max_bytes: int = MAX_UPLOAD_SIZE,
+    chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> Tuple[int, str]:
     """
-    Save an uploaded file to the disk with security validation.
+    Copy source to destination in fixed-size chunks, hashing as it goes.
+    Stops and removes the partial file as soon as more than max_bytes arrive.
     
     Returns:
-        (file_path, file_name, mime_type, file_size)
+        (size, sha256 hex digest)
     """
-    """
-    Save an uploaded file to the disk.
-    
-    Returns:
-        (file_path, file_name, mime_type, file_size)
-    """
-    # Validate claim_id to prevent path traversal
-    if not claim_id or ".." in str(claim_id) or "/" in str(claim_id):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid claim ID"
-        )
-    
-    claim_dir = os.path.join(upload_dir, str(claim_id))
-    ensure_upload_dir(claim_dir)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(destination, "wb") as buffer:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"File size exceeds {max_bytes // (1024 * 1024)}MB limit"
+                    )
+                digest.update(chunk)
+                buffer.write(chunk)
+    except BaseException:
+        # Never leave a partial file behind
+        try:
+            os.remove(destination)
+        except OSError:
+            pass
+        raise
     
-    original_filename = uploaded_file.filename or "unnamed_file"
+    return size, digest.hexdigest()
+
+def sanitize_filename(filename: str) -> str:
+    """Strip directories and unsafe characters from a client-supplied file name."""
     # Sanitize filename to prevent path traversal and invalid characters
-    original_filename = os.path.basename(original_filename)
+    name = os.path.basename(filename or "unnamed_file")
     # Remove dangerous characters
-    original_filename = "".join(c for c in original_filename if c.isalnum() or c in "._- ()[]")
-    if not original_filename:
-        original_filename = "unnamed_file"
+    name = "".join(c for c in name if c.isalnum() or c in "._- ()[]")
+    return name or "unnamed_file"
+
+def blob_storage_path(sha256: str, extension: str) -> str:
+    """
+    Stored path of a content-addressed blob:
+    uploads/blobs/<first two hex chars>/<sha256><extension>
+    """
+    return os.path.join("uploads", "blobs", sha256[:2], f"{sha256}{extension.lower()}")
+
+def save_upload_to_temp(upload_dir: str, uploaded_file: UploadFile) -> Tuple[str, int, str]:
+    """
+    Stream an upload into the upload directory's tmp/ area, hashing as it goes.
+    The file can then be moved into content-addressed storage with place_blob.
     
-    timestamp = int(datetime.utcnow().timestamp())
-    file_name = f"{timestamp}_{original_filename}"
-    file_path = os.path.join(claim_dir, file_name)
+    Returns:
+        (temp_path, file_size, sha256)
+    """
+    tmp_dir = os.path.join(upload_dir, "tmp")
+    ensure_upload_dir(tmp_dir)
+    temp_path = os.path.join(tmp_dir, uuid.uuid4().hex)
     
-    # Write file
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(uploaded_file.file, buffer)
-            
-        file_size = os.path.getsize(file_path)
-        
-        # Calculate relative path for storage
-        # Store path format: uploads/<claim_id>/<timestamp>_<original_filename>
-        # This ensures consistent format for file serving verification
-            
-        relative_path = os.path.join("uploads", str(claim_id), file_name)
-        
-        return relative_path, original_filename, uploaded_file.content_type or "application/octet-stream", file_size
-        
+        file_size, sha256 = write_stream(uploaded_file.file, temp_path)
+        return temp_path, file_size, sha256
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -72,3 +91,19 @@ def save_upload_file(
         )
     finally:
         uploaded_file.file.close()
+
+def place_blob(temp_path: str, storage_path: str, content_type: str = None) -> bool:
+    """
+    Move a hashed temp file into storage at its blob location, or discard it
+    when the blob is already stored (same digest, same bytes).
+    Returns True if the file was stored.
+    """
+    storage = get_storage()
+    key = storage_key(storage_path)
+    if storage.exists(key):
+        os.remove(temp_path)
+        return False
+    
+    # Local storage renames the file (tmp/ is on the same disk); remote backends upload it
+    storage.put_file(key, temp_path, content_type)
+    return True
@@ -0,0 +1,122 @@
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from PIL import Image
+import os
+import time
+
+from app.utils.constants import IMAGE_EXTENSIONS
+from app.utils.image_quality import quality_score_from_image
+from app.utils.phash import phash_from_image
+from app.utils.renditions import EXIF_ORIENTATION_TAG, render_from_image
+from app.config import settings
+
+# Score used for files that are not images or cannot be decoded
+DEFAULT_QUALITY_SCORE = 50
+
+
+@dataclass
+class ImageAnalysis:
+    """Combined result of the upload image analysis stage."""
+    quality_score: int = DEFAULT_QUALITY_SCORE
+    phash: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    # Encoded previews by rendition size name, only for the requested sizes
+    renditions: Dict[str, bytes] = field(default_factory=dict)
+    # Stage durations in seconds, recorded by the caller (this may run in a worker process)
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+def analyze_image(
+    file_path: str,
+    max_side: Optional[int] = None,
+    rendition_sizes: Optional[Dict[str, int]] = None,
+    rendition_format: str = "webp"
+) -> ImageAnalysis:
+    """
+    Decode an uploaded file once and run quality scoring, pHash and preview
+    rendering (rendition_sizes, {name: longest side}) on the shared in-memory
+    image. Sizes larger than a reduced working image are left out, to be
+    rendered from the file on demand.
+
+    The image is decoded at a bounded working resolution (max_side, defaulting
+    to settings.IMAGE_ANALYSIS_MAX_SIDE; 0 decodes at full size). The resolution
+    part of the quality score still uses the original dimensions, and the
+    sharpness of a reduced decode is mapped to the full-decode scale (see
+    image_quality.estimate_full_edge_variance).
+    Non-image or unreadable files get the default quality score and no hash.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext not in IMAGE_EXTENSIONS:
+        return ImageAnalysis()
+
+    if max_side is None:
+        max_side = settings.IMAGE_ANALYSIS_MAX_SIDE
+
+    try:
+        timings = {}
+        with Image.open(file_path) as img:
+            # Dimensions come from the header, before any reduced decode
+            width, height = img.size
+
+            started = time.perf_counter()
+            orientation = img.getexif().get(EXIF_ORIENTATION_TAG) if rendition_sizes else None
+            working = _decode_reduced(img, max_side, grayscale=not rendition_sizes)
+
+            # One grayscale conversion shared by the sharpness filter and pHash
+            gray = working if working.mode == 'L' else working.convert('L')
+            decoded = time.perf_counter()
+            bits_per_pixel = None
+            if img.format == 'JPEG':
+                bits_per_pixel = os.path.getsize(file_path) * 8 / (width * height)
+            quality = quality_score_from_image(
+                working, gray=gray, original_size=(width, height), jpeg_bits_per_pixel=bits_per_pixel
+            )
+            scored = time.perf_counter()
+            phash = phash_from_image(gray)
+            timings = {
+                "image_decode": decoded - started,
+                "quality_score": scored - decoded,
+                "phash": time.perf_counter() - scored,
+            }
+
+            renditions = {}
+            if rendition_sizes:
+                hashed = time.perf_counter()
+                reduced = working.size != (width, height)
+                for name, size in rendition_sizes.items():
+                    if reduced and max(working.size) < size:
+                        continue
+                    try:
+                        renditions[name] = render_from_image(working, size, rendition_format, orientation)
+                    except Exception:
+                        pass
+                timings["renditions"] = time.perf_counter() - hashed
+
+            return ImageAnalysis(
+                quality_score=quality,
+                phash=phash,
+                width=width,
+                height=height,
+                renditions=renditions,
+                timings=timings
+            )
+    except Exception:
+        return ImageAnalysis()
+
+
+def _decode_reduced(img: Image.Image, max_side: int, grayscale: bool) -> Image.Image:
+    """
+    Decode img so that its longest side is at most max_side.
+    JPEGs use draft mode, which lets libjpeg scale by 1/2, 1/4 or 1/8 while
+    decoding (and convert straight to grayscale when no colour is needed);
+    anything still too large is shrunk with a box-filter reduce().
+    """
+    if max_side and max(img.size) > max_side:
+        img.draft('L' if grayscale else 'RGB', (max_side, max_side))
+    img.load()
+
+    if max_side and max(img.size) > max_side:
+        factor = -(-max(img.size) // max_side)  # ceil division
+        return img.reduce(factor)
+    return img
@@ -0,0 +1,136 @@
+"""
+Prometheus metrics.
+
+HTTP request count, latency and in-flight requests are recorded per route
+template by MetricsMiddleware; the hot processing stages (file save, image
+decode, quality score, pHash, duplicate scan, OCR, fraud scoring, PDF render)
+are timed with stage_timer(), and every fraud rule counts its hits and
+evaluation time. Everything is served at /metrics in the text exposition
+format, together with the DB connection pool numbers.
+
+Metrics live in the process that records them. When the API runs with several
+worker processes, set the PROMETHEUS_MULTIPROC_DIR environment variable to an
+empty directory shared by the workers so /metrics aggregates all of them (the
+per-process DB pool metrics are then left out).
+"""
+
+import os
+from typing import Dict, Iterable
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    Summary,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+
+# Upper bounds (seconds) for stage timings: sub-millisecond hash lookups up to slow OCR runs
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by method, route template and status code",
+    ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method, route template and status code",
+    ["method", "route", "status"]
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served",
+    ["method", "route"],
+    multiprocess_mode="livesum"
+)
+STAGE_DURATION = Histogram(
+    "stage_duration_seconds",
+    "Duration of document and claim processing stages",
+    ["stage"],
+    buckets=STAGE_BUCKETS
+)
+FRAUD_RULE_EVALUATIONS = Counter(
+    "fraud_rule_evaluations_total",
+    "Fraud rule evaluations by rule and result (hit or miss)",
+    ["rule", "result"]
+)
+FRAUD_RULE_DURATION = Summary(
+    "fraud_rule_duration_seconds",
+    "Time spent evaluating each fraud rule",
+    ["rule"]
+)
+
+
+def stage_timer(stage: str):
+    """Time a block or function into stage_duration_seconds{stage=...}."""
+    return STAGE_DURATION.labels(stage).time()
+
+
+def observe_stages(timings: Dict[str, float]) -> None:
+    """Record stage durations (seconds) measured elsewhere, e.g. in a compute pool worker."""
+    for stage, seconds in timings.items():
+        STAGE_DURATION.labels(stage).observe(seconds)
+
+
+class DBPoolCollector:
+    """Exports the instrumented DB pool gauges and checkout statistics at scrape time."""
+
+    def describe(self) -> Iterable:
+        # Nothing to declare up front; collect() runs only when scraped
+        return []
+
+    def collect(self) -> Iterable:
+        from app.db.pool import CHECKOUT_BUCKETS_MS
+        from app.db.session import async_engine, engine
+
+        connections = GaugeMetricFamily("db_pool_connections", "DB pool connections by state", labels=["pool", "state"])
+        capacity = GaugeMetricFamily("db_pool_capacity", "Configured DB pool size and overflow", labels=["pool", "kind"])
+        checkouts = CounterMetricFamily("db_pool_checkouts", "DB connection checkouts by outcome", labels=["pool", "outcome"])
+        latency = HistogramMetricFamily("db_pool_checkout_seconds", "DB connection checkout latency", labels=["pool"])
+
+        for pool in (engine.pool, async_engine.sync_engine.pool):
+            if not hasattr(pool, "stats"):
+                continue
+            name, gauges, stats = pool.stats.name, pool.gauges(), pool.stats.snapshot()
+            for state in ("checked_out", "idle", "overflow"):
+                connections.add_metric([name, state], gauges[state])
+            capacity.add_metric([name, "size"], gauges["size"])
+            capacity.add_metric([name, "max_overflow"], gauges["max_overflow"])
+
+            checkouts.add_metric([name, "all"], stats["checkouts"])
+            checkouts.add_metric([name, "waited"], stats["waits"])
+            checkouts.add_metric([name, "timed_out"], stats["timeouts"])
+            checkouts.add_metric([name, "slow"], stats["slow_checkouts"])
+
+            histogram = stats["checkout_ms_histogram"]
+            buckets, running = [], 0
+            for bound in CHECKOUT_BUCKETS_MS:
+                running += histogram[f"le_{bound}"]
+                buckets.append((str(bound / 1000), running))
+            buckets.append(("+Inf", running + histogram["inf"]))
+            total_seconds = stats["checkout_ms_avg"] * stats["checkouts"] / 1000
+            latency.add_metric([name], buckets, total_seconds)
+
+        yield connections
+        yield capacity
+        yield checkouts
+        yield latency
+
+
+REGISTRY.register(DBPoolCollector())
+
+
+def render_latest() -> bytes:
+    """All metrics in the Prometheus text exposition format."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
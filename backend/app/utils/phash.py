@@ -1,44 +1,56 @@
 from PIL import Image
+from itertools import combinations
+from typing import Iterator, List, Tuple
 import imagehash
+import numpy as np
 import os
 
+from app.utils.constants import IMAGE_EXTENSIONS
+
+PHASH_BITS = 64
+_PHASH_MASK = (1 << PHASH_BITS) - 1
+
 def compute_phash(file_path: str) -> str | None:
     """
     Compute perceptual hash using imagehash.
     Returns None if file is not an image or error occurs.
     """
     ext = os.path.splitext(file_path)[1].lower()
-    if ext not in ['.jpg', '.jpeg', '.png', '.webp']:
+    if ext not in IMAGE_EXTENSIONS:
         return None
         
     try:
         with Image.open(file_path) as img:
-            phash = imagehash.phash(img)
-            return str(phash)
-            
+            return phash_from_image(img)
+    except Exception:
+        return None
+
+def phash_from_image(img: Image.Image) -> str | None:
+    """
+    Compute perceptual hash of an already decoded image.
+    Falls back to a simple average hash if imagehash fails.
+    """
+    try:
+        return str(imagehash.phash(img))
     except Exception:
-        # If imagehash not installed or image load fails, try simple fallback
+        # If imagehash not installed or hashing fails, try simple fallback
         # But we are instructed to use Pillow if imagehash fails
-        try:
-            return _simple_phash_fallback(file_path)
-        except Exception:
-            return None
+        return _simple_phash_fallback(img)
 
-def _simple_phash_fallback(file_path: str) -> str | None:
+def _simple_phash_fallback(img: Image.Image) -> str | None:
     """Simple 8x8 average hash implementation using Pillow."""
     try:
-        with Image.open(file_path) as img:
-            # Resize to 8x8, convert to grayscale
-            img = img.resize((8, 8), Image.Resampling.LANCZOS).convert('L')
-            pixels = list(img.getdata())
-            avg = sum(pixels) / len(pixels)
-            
-            # Create bits
-            bits = "".join(['1' if p > avg else '0' for p in pixels])
-            
-            # Convert binary string to hex
-            hex_val = hex(int(bits, 2))[2:]
-            return hex_val
+        # Resize to 8x8, convert to grayscale
+        small = img.resize((8, 8), Image.Resampling.LANCZOS).convert('L')
+        pixels = list(small.getdata())
+        avg = sum(pixels) / len(pixels)
+        
+        # Create bits
+        bits = "".join(['1' if p > avg else '0' for p in pixels])
+        
+        # Convert binary string to hex
+        hex_val = hex(int(bits, 2))[2:]
+        return hex_val
     except Exception:
         return None
 
@@ -48,25 +60,118 @@ def compare_phash(hash1: str, hash2: str) -> int:
     Lower distance = more similar.
     Returns distance integer.
     """
-    if not hash1 or not hash2:
-        return 100 # High distance if None
-        
-    # Use imagehash logic if strings are hex
-    try:
-        if hasattr(imagehash, 'hex_to_hash'):
-             h1 = imagehash.hex_to_hash(hash1)
-             h2 = imagehash.hex_to_hash(hash2)
-             return h1 - h2
-    except (ValueError, AttributeError, ImportError):
-        pass
-        
-    # Manual hamming distance for hex strings
+    n1 = phash_to_int(hash1)
+    n2 = phash_to_int(hash2)
+    if n1 is None or n2 is None:
+        return 100 # High distance if None or malformed
+    return hamming_distance(n1, n2)
+
+def phash_to_int(hash_str: str | None) -> int | None:
+    """
+    Convert a hex perceptual hash to its integer value.
+    Returns None if the hash is missing or malformed.
+    """
+    if not hash_str:
+        return None
     try:
-        # Convert hex to int
-        n1 = int(hash1, 16)
-        n2 = int(hash2, 16)
-        # XOR and count bits
-        x = n1 ^ n2
-        return bin(x).count('1')
-    except Exception:
-        return 100
+        return int(hash_str, 16)
+    except ValueError:
+        return None
+
+
+def hamming_distance(value1: int, value2: int) -> int:
+    """Hamming distance between two 64-bit hash values."""
+    return ((value1 ^ value2) & _PHASH_MASK).bit_count()
+
+
+def to_signed64(value: int) -> int:
+    """Map an unsigned 64-bit hash onto the signed range of a Postgres BIGINT."""
+    return value - (1 << PHASH_BITS) if value >= 1 << (PHASH_BITS - 1) else value
+
+
+def from_signed64(value: int) -> int:
+    """Inverse of to_signed64."""
+    return value & _PHASH_MASK
+
+
+def split_bands(value: int, bands: int) -> List[int]:
+    """Split a 64-bit hash into equal-width bands, least significant band first."""
+    band_bits = PHASH_BITS // bands
+    band_mask = (1 << band_bits) - 1
+    return [(value >> (band * band_bits)) & band_mask for band in range(bands)]
+
+
+def band_neighbours(band_value: int, radius: int, band_bits: int) -> Iterator[int]:
+    """Yield every band value within Hamming distance `radius` of band_value."""
+    yield band_value
+    for distance in range(1, radius + 1):
+        for bits in combinations(range(band_bits), distance):
+            flipped = band_value
+            for bit in bits:
+                flipped ^= 1 << bit
+            yield flipped
+
+
+# Popcount lookup for one byte, used when numpy has no bitwise_count (< 2.0)
+_BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount64(values: np.ndarray) -> np.ndarray:
+    """Per-element popcount of a uint64 array, returned as uint8."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values).astype(np.uint8, copy=False)
+    as_bytes = values.reshape(values.shape + (1,)).view(np.uint8)
+    return _BYTE_POPCOUNT[as_bytes].sum(axis=-1, dtype=np.uint8)
+
+
+def as_hash_array(values) -> np.ndarray:
+    """
+    Convert hash values to a uint64 array.
+    Accepts unsigned ints or the signed BIGINT form stored in phash_int.
+    """
+    array = np.asarray(values)
+    if array.dtype == np.uint64:
+        return array
+    if array.dtype == np.int64:
+        return array.view(np.uint64)
+    return np.array([from_signed64(int(v)) for v in values], dtype=np.uint64)
+
+
+def hamming_distances(query: int, hashes: np.ndarray) -> np.ndarray:
+    """Hamming distance from query to every hash in a uint64 array."""
+    return _popcount64(np.bitwise_xor(hashes, np.uint64(query & _PHASH_MASK)))
+
+
+def find_within_distance(query: int, hashes: np.ndarray, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized scan of a uint64 hash array.
+    Returns (indices, distances) of every hash within threshold of query.
+    """
+    distances = hamming_distances(query, hashes)
+    indices = np.flatnonzero(distances <= threshold)
+    return indices, distances[indices]
+
+
+def find_duplicate_pairs(
+    hashes: np.ndarray,
+    threshold: int,
+    chunk_size: int = 2048
+) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    All-pairs scan of a uint64 hash array, computed block by block so memory
+    stays at chunk_size^2 regardless of corpus size.
+    Yields (left_indices, right_indices, distances) with left < right.
+    """
+    total = len(hashes)
+    for row_start in range(0, total, chunk_size):
+        rows = hashes[row_start:row_start + chunk_size]
+        for col_start in range(row_start, total, chunk_size):
+            cols = hashes[col_start:col_start + chunk_size]
+            distances = _popcount64(np.bitwise_xor(rows[:, None], cols[None, :]))
+            left, right = np.nonzero(distances <= threshold)
+            left = left + row_start
+            right = right + col_start
+            keep = left < right
+            if keep.any():
+                left, right = left[keep], right[keep]
+                yield left, right, distances[left - row_start, right - col_start]
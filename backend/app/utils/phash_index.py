@@ -0,0 +1,95 @@
+import threading
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from app.utils.phash import PHASH_BITS, band_neighbours, hamming_distance, split_bands
+
+
+class PHashIndex:
+    """
+    In-memory multi-index hash table for 64-bit perceptual hashes.
+
+    Each hash is split into equal-width bands and every band is stored in its own
+    lookup table. Two hashes within Hamming distance d must have at least one band
+    within distance d // bands of each other (pigeonhole), so a query only probes
+    the neighbours of each band instead of scanning every stored hash.
+    """
+
+    def __init__(self, bands: int = 4):
+        if bands <= 0 or PHASH_BITS % bands != 0:
+            raise ValueError(f"Band count must divide {PHASH_BITS}")
+
+        self.bands = bands
+        self.band_bits = PHASH_BITS // bands
+        self._tables: List[Dict[int, Set[Hashable]]] = [defaultdict(set) for _ in range(bands)]
+        self._hashes: Dict[Hashable, int] = {}
+        self._lock = threading.RLock()
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def add(self, key: Hashable, value: int) -> None:
+        """Add or replace the hash stored for key."""
+        with self._lock:
+            if key in self._hashes:
+                self.remove(key)
+            self._hashes[key] = value
+            for band, band_value in enumerate(split_bands(value, self.bands)):
+                self._tables[band][band_value].add(key)
+
+    def remove(self, key: Hashable) -> None:
+        with self._lock:
+            value = self._hashes.pop(key, None)
+            if value is None:
+                return
+            for band, band_value in enumerate(split_bands(value, self.bands)):
+                bucket = self._tables[band].get(band_value)
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self._tables[band][band_value]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tables = [defaultdict(set) for _ in range(self.bands)]
+            self._hashes = {}
+            self.ready = False
+
+    def rebuild(self, entries: Iterable[Tuple[Hashable, int]]) -> int:
+        """Replace the index contents with entries. Returns the number of hashes indexed."""
+        with self._lock:
+            self.clear()
+            for key, value in entries:
+                self.add(key, value)
+            self.ready = True
+            return len(self._hashes)
+
+    def search(self, value: int, max_distance: int) -> List[Tuple[Hashable, int]]:
+        """
+        Return (key, distance) for every stored hash within max_distance of value,
+        closest first.
+        """
+        radius = max_distance // self.bands
+        with self._lock:
+            candidates: Set[Hashable] = set()
+            for band, band_value in enumerate(split_bands(value, self.bands)):
+                table = self._tables[band]
+                for probe in band_neighbours(band_value, radius, self.band_bits):
+                    bucket = table.get(probe)
+                    if bucket:
+                        candidates.update(bucket)
+
+            matches = []
+            for key in candidates:
+                distance = hamming_distance(self._hashes[key], value)
+                if distance <= max_distance:
+                    matches.append((key, distance))
+
+        matches.sort(key=lambda match: match[1])
+        return matches
+
+    def find_nearest(self, value: int, max_distance: int) -> Optional[Tuple[Hashable, int]]:
+        """Return the closest (key, distance) within max_distance, or None."""
+        matches = self.search(value, max_distance)
+        return matches[0] if matches else None
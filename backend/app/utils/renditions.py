@@ -0,0 +1,109 @@
+"""
+Preview renditions: small WebP/JPEG images of uploaded documents.
+
+Photos are shrunk during decode (Pillow's thumbnail() uses JPEG draft mode and
+reduce() before resampling). At upload, render_from_image() builds the
+pregenerated sizes from the image the analysis stage already decoded. PDFs are rasterised from their first page with
+pypdfium2 when it is installed. Runs in the compute pool, so everything here
+takes and returns plain values.
+"""
+
+import io
+import os
+from typing import Optional
+
+from PIL import Image, ImageOps
+
+from app.utils.constants import IMAGE_EXTENSIONS, PDF_EXTENSIONS
+
+RENDITION_MEDIA_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+EXIF_ORIENTATION_TAG = 0x0112
+
+# EXIF orientation -> transpose that shows the image upright (as ImageOps.exif_transpose)
+_ORIENTATION_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+
+def _encode(img: Image.Image, fmt: str) -> bytes:
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    buffer = io.BytesIO()
+    if fmt == "webp":
+        img.save(buffer, format="WEBP", quality=80, method=4)
+    else:
+        img.save(buffer, format="JPEG", quality=82, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def _render_image(file_path: str, size: int) -> Image.Image:
+    with Image.open(file_path) as img:
+        img.thumbnail((size, size), Image.Resampling.LANCZOS, reducing_gap=2.0)
+        # Phone photos are often stored sideways with an EXIF orientation tag
+        return ImageOps.exif_transpose(img)
+
+
+def render_from_image(img: Image.Image, size: int, fmt: str = "webp", orientation: Optional[int] = None) -> bytes:
+    """
+    Encode a preview of an already decoded image whose longest side is at most
+    size pixels. orientation is the EXIF orientation of the file img was
+    decoded from (reduced or converted copies no longer carry it).
+    """
+    preview = img.copy()
+    preview.thumbnail((size, size), Image.Resampling.LANCZOS, reducing_gap=2.0)
+    method = _ORIENTATION_TRANSPOSE.get(orientation)
+    if method is not None:
+        preview = preview.transpose(method)
+    return _encode(preview, fmt)
+
+
+def _render_pdf(file_path: str, size: int) -> Optional[Image.Image]:
+    try:
+        import pypdfium2
+    except ImportError:
+        return None
+
+    pdf = pypdfium2.PdfDocument(file_path)
+    try:
+        if len(pdf) == 0:
+            return None
+        page = pdf[0]
+        try:
+            width, height = page.get_size()
+            # Render straight at the target size instead of full page resolution
+            bitmap = page.render(scale=size / max(width, height, 1))
+            return bitmap.to_pil()
+        finally:
+            page.close()
+    finally:
+        pdf.close()
+
+
+def render_rendition(file_path: str, size: int, fmt: str = "webp") -> Optional[bytes]:
+    """
+    Encode a preview of file_path whose longest side is at most size pixels.
+    Returns None for file types without a preview, unreadable files and PDFs
+    when pypdfium2 is not installed.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    try:
+        if ext in IMAGE_EXTENSIONS:
+            img = _render_image(file_path, size)
+        elif ext in PDF_EXTENSIONS:
+            img = _render_pdf(file_path, size)
+        else:
+            return None
+
+        if img is None:
+            return None
+        return _encode(img, fmt)
+    except Exception:
+        # Unreadable or corrupt file: no preview
+        return None
@@ -1,9 +1,15 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 
 from app.config import settings
+from app.utils.cache import TTLCache
 from app.utils.logger import setup_logger
 from pathlib import Path
 
@@ -11,7 +17,23 @@ logger = setup_logger(__name__)
 
 # Password hashing context using bcrypt
 # Note: bcrypt automatically handles UTF-8 encoding
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes with any other cost than BCRYPT_ROUNDS are flagged for rehashing on login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS
+)
+
+# bcrypt releases the GIL, so a small thread pool hashes in parallel without
+# blocking the event loop. Admission is bounded: beyond the running and queued
+# slots, requests are rejected with 429 instead of piling up behind each other.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+_hash_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_SIZE)
 
 
 def hash_password(password: str) -> str:
@@ -55,6 +77,51 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and return (valid, new_hash). new_hash is set when the
+    stored hash was made with a different cost than BCRYPT_ROUNDS and should
+    replace it.
+    """
+    try:
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+    except Exception as e:
+        logger.error(f"Password verification failed: {str(e)}")
+        return False, None
+
+
+async def _run_hashing(fn, *args):
+    if not _hash_slots.acquire(blocking=False):
+        logger.warning("Password hashing pool saturated, rejecting request")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many authentication requests, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
+    try:
+        future = _hash_executor.submit(fn, *args)
+    except Exception:
+        _hash_slots.release()
+        raise
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return await asyncio.wrap_future(future)
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password in the bounded hashing pool. Raises 429 when it is saturated."""
+    return await _run_hashing(hash_password, password)
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """verify_and_update_password in the bounded hashing pool. Raises 429 when it is saturated."""
+    return await _run_hashing(verify_and_update_password, plain_password, hashed_password)
+
+
+def shutdown_hashing_pool() -> None:
+    """Stop the hashing threads (called at application shutdown)."""
+    _hash_executor.shutdown(wait=False, cancel_futures=True)
+
+
 def create_access_token(data: Dict[str, Any], expires_minutes: int = None) -> str:
     """
     Create a JWT access token.
@@ -85,10 +152,20 @@ def create_access_token(data: Dict[str, Any], expires_minutes: int = None) -> st
     return encoded_jwt
 
 
+# Verified payloads until their exp, and recently rejected tokens with the reason
+_decoded_tokens = TTLCache(maxsize=settings.JWT_CACHE_SIZE)
+_rejected_tokens = TTLCache(maxsize=settings.JWT_CACHE_SIZE, ttl=settings.JWT_NEGATIVE_CACHE_SECONDS)
+
+
 def decode_access_token(token: str) -> Dict[str, Any]:
     """
     Decode and validate a JWT access token.
     
+    Verified payloads are cached until the token's exp, so repeated requests
+    with the same token skip signature verification. Rejected tokens are
+    remembered for JWT_NEGATIVE_CACHE_SECONDS and rejected again without
+    verification or logging.
+    
     Args:
         token: JWT token string
         
@@ -98,16 +175,31 @@ def decode_access_token(token: str) -> Dict[str, Any]:
     Raises:
         JWTError: If token is invalid or expired
     """
+    payload = _decoded_tokens.get(token)
+    if payload is not None:
+        return dict(payload)
+    
+    reason = _rejected_tokens.get(token)
+    if reason is not None:
+        logger.debug(f"JWT rejected (cached): {reason}")
+        raise JWTError(reason)
+    
     try:
         payload = jwt.decode(
             token,
             settings.JWT_SECRET,
             algorithms=[settings.JWT_ALGORITHM]
         )
-        return payload
     except JWTError as e:
-        logger.error(f"JWT decode error: {str(e)}")
+        # A client error, not ours: warn once per token, not once per retry
+        logger.warning(f"JWT decode error: {str(e)}")
+        _rejected_tokens.set(token, str(e))
         raise
+    
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        _decoded_tokens.set(token, payload, exp - time.time())
+    return dict(payload)
 
 
 def sanitize_phone(phone: str) -> str:
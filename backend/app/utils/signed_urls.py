@@ -0,0 +1,83 @@
+"""
+HMAC-signed, expiring tokens for file URLs.
+
+A token carries everything needed to serve the file (storage path, name, MIME
+type, content hash, disposition and expiry), so the serving route checks only
+the signature and expiry and never touches the database. Anyone holding the
+URL can fetch the file until it expires, so keep SIGNED_URL_EXPIRE_SECONDS short.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from app.config import settings
+from app.models.document import Document
+
+
+@dataclass(frozen=True)
+class SignedFile:
+    file_path: str
+    file_name: str
+    mime_type: Optional[str]
+    sha256: Optional[str]
+    disposition: str
+    expires_at: int
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _signature(body: str) -> str:
+    secret = (settings.FILE_URL_SECRET or settings.JWT_SECRET).encode()
+    # Derived key: a file URL signature can never double as any other HMAC of the secret
+    key = hmac.new(secret, b"file-url", hashlib.sha256).digest()
+    return _b64encode(hmac.new(key, body.encode("ascii"), hashlib.sha256).digest())
+
+
+def sign_document(document: Document, disposition: str = "inline", expires_in: Optional[int] = None) -> Tuple[str, int]:
+    """Return (token, expires_at) granting access to document's file until expires_at (unix time)."""
+    expires_at = int(time.time()) + (expires_in or settings.SIGNED_URL_EXPIRE_SECONDS)
+    payload = {
+        "p": document.file_path,
+        "n": document.file_name,
+        "t": document.mime_type,
+        "h": document.content_sha256,
+        "d": disposition,
+        "e": expires_at,
+    }
+    body = _b64encode(json.dumps(payload, separators=(",", ":")).encode())
+    return f"{body}.{_signature(body)}", expires_at
+
+
+def verify_token(token: str) -> Optional[SignedFile]:
+    """Decode a token from sign_document. Returns None if it is forged, malformed or expired."""
+    body, _, signature = token.partition(".")
+    if not body or not hmac.compare_digest(signature, _signature(body)):
+        return None
+
+    try:
+        payload = json.loads(_b64decode(body))
+        signed = SignedFile(
+            file_path=payload["p"],
+            file_name=payload["n"],
+            mime_type=payload["t"],
+            sha256=payload["h"],
+            disposition=payload["d"],
+            expires_at=int(payload["e"])
+        )
+    except (ValueError, KeyError, TypeError):
+        return None
+
+    if signed.expires_at < time.time():
+        return None
+    return signed
@@ -0,0 +1,150 @@
+"""
+Compare request throughput of the sync and async database paths.
+
+Three variants of the same endpoint run the get_current_user lookup (a user by
+primary key) under concurrent load, in-process on one event loop:
+
+    async+sync   async def endpoint calling a sync Session (blocks the loop)
+    threadpool   def endpoint calling a sync Session (FastAPI threadpool)
+    async        async def endpoint awaiting an AsyncSession (asyncpg)
+
+--latency-ms adds pg_sleep to every query to emulate a database on another
+host; on a local socket the blocking variant looks deceptively fast.
+Keep --concurrency below the sync pool size (pool_size + max_overflow = 30):
+past it the blocking variant stalls the loop while waiting for a connection
+that can only be returned by the loop, until the pool timeout fires.
+
+Usage:
+    python -m scripts.benchmark_async_db [--requests 2000] [--concurrency 25] [--latency-ms 5]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+from fastapi import Depends, FastAPI
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.session import async_engine, engine, get_async_db, get_db
+from app.models.user import User
+
+LATENCY_SECONDS = 0.0
+
+
+def _query(latency: float):
+    stmt = select(User.id).limit(1)
+    if latency:
+        # Same round trip plus simulated network/server time
+        stmt = select(User.id, text(f"pg_sleep({latency})")).limit(1)
+    return stmt
+
+
+bench = FastAPI()
+
+
+@bench.get("/async-sync")
+async def async_with_sync_session(db: Session = Depends(get_db)) -> dict:
+    db.execute(_query(LATENCY_SECONDS)).first()
+    return {"ok": True}
+
+
+@bench.get("/threadpool")
+def threadpool_with_sync_session(db: Session = Depends(get_db)) -> dict:
+    db.execute(_query(LATENCY_SECONDS)).first()
+    return {"ok": True}
+
+
+@bench.get("/async")
+async def async_with_async_session(db: AsyncSession = Depends(get_async_db)) -> dict:
+    (await db.execute(_query(LATENCY_SECONDS))).first()
+    return {"ok": True}
+
+
+async def _request(path: str) -> int:
+    """One in-process GET through the ASGI interface; returns the status code."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [],
+        "client": ("127.0.0.1", 0),
+        "server": ("benchmark", 80),
+    }
+    status_code = 0
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+
+    await bench(scope, receive, send)
+    return status_code
+
+
+async def _run(path: str, total: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def client() -> None:
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            if await _request(path) != 200:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+async def _main(args: argparse.Namespace) -> None:
+    header = f"{'variant':<12} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}"
+    print(f"{args.requests} requests, concurrency {args.concurrency}, added latency {args.latency_ms} ms")
+    print(header)
+    print("-" * len(header))
+    for label, path in (("async+sync", "/async-sync"), ("threadpool", "/threadpool"), ("async", "/async")):
+        # Warm up the connection pools before measuring
+        await _run(path, args.concurrency, args.concurrency)
+        r = await _run(path, args.requests, args.concurrency)
+        print(f"{label:<12} {r['rps']:>9.0f} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['errors']:>7}")
+    await async_engine.dispose()
+    engine.dispose()
+
+
+def main() -> None:
+    global LATENCY_SECONDS
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async database sessions")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per variant")
+    parser.add_argument("--concurrency", type=int, default=25, help="Concurrent clients")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Simulated query latency (pg_sleep)")
+    args = parser.parse_args()
+
+    LATENCY_SECONDS = args.latency_ms / 1000
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Benchmark the upload image analysis stage against the baseline quality scorer.
+
+Modes per image: "baseline" is compute_quality_score (whole-image full decode,
+the scorer the upload path used before analyze_image), "full" is analyze_image
+at full size and "max N" is analyze_image at the reduced working resolution.
+Each (image, mode) run happens in a fresh process so peak RSS is per image.
+Without arguments, synthetic 6 MP, 12 MP and 48 MP JPEGs are generated.
+Exits with status 1 when an analyze_image quality score differs from the
+baseline by more than --max-quality-diff points, so calibration drift fails
+the run.
+
+Usage:
+    python -m scripts.benchmark_image_analysis [image ...] [--max-side 1024] [--repeat 3] [--max-quality-diff 1]
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from typing import Optional
+
+from PIL import Image, ImageDraw
+
+from app.utils.phash import compare_phash
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    # VmHWM is reset on exec; ru_maxrss on Linux can carry the parent's peak over
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run(file_path: str, max_side: Optional[int], repeat: int, queue) -> None:
+    """Time one mode; max_side None runs the baseline compute_quality_score."""
+    from app.utils.image_analysis import analyze_image
+    from app.utils.image_quality import compute_quality_score
+
+    baseline_mb = _peak_rss_mb()
+    cpu_times = []
+    for _ in range(repeat):
+        started = time.process_time()
+        if max_side is None:
+            quality_score, phash = compute_quality_score(file_path), None
+        else:
+            result = analyze_image(file_path, max_side=max_side)
+            quality_score, phash = result.quality_score, result.phash
+        cpu_times.append(time.process_time() - started)
+
+    queue.put({
+        "cpu_ms": min(cpu_times) * 1000,
+        "peak_rss_mb": _peak_rss_mb(),
+        "rss_delta_mb": _peak_rss_mb() - baseline_mb,
+        "quality_score": quality_score,
+        "phash": phash,
+    })
+
+
+def _measure(file_path: str, max_side: Optional[int], repeat: int) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_run, args=(file_path, max_side, repeat, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def _synthetic_jpeg(directory: str, width: int, height: int) -> str:
+    """Photo-like test image: smooth gradient, a few shapes and mild sensor noise."""
+    gradient = Image.linear_gradient("L").resize((width, height))
+    img = Image.merge("RGB", (gradient, gradient.transpose(Image.Transpose.ROTATE_180), gradient))
+    draw = ImageDraw.Draw(img)
+    for i in range(12):
+        x, y = (i * 37 % 10) * width // 10, (i * 53 % 10) * height // 10
+        draw.ellipse([x, y, x + width // 5, y + height // 4], fill=(40 + i * 15, 200 - i * 10, 90), outline=(255, 255, 255), width=8)
+    noise = Image.effect_noise((width, height), 12).convert("RGB")
+    img = Image.blend(img, noise, 0.08)
+    path = os.path.join(directory, f"synthetic_{width}x{height}.jpg")
+    img.save(path, quality=90)
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark image analysis decode modes")
+    parser.add_argument("images", nargs="*", help="Image files to analyse")
+    parser.add_argument("--max-side", type=int, default=1024, help="Reduced working resolution")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per image (best CPU time is kept)")
+    parser.add_argument(
+        "--max-quality-diff", type=int, default=1,
+        help="Allowed quality score difference between the baseline and the reduced decode"
+    )
+    args = parser.parse_args()
+
+    drifted = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        images = args.images or [
+            _synthetic_jpeg(tmp, 3000, 2000),   # 6 MP
+            _synthetic_jpeg(tmp, 4000, 3000),   # 12 MP
+            _synthetic_jpeg(tmp, 8000, 6000),   # 48 MP
+        ]
+
+        header = (
+            f"{'image':<32} {'mode':<12} {'cpu ms':>9} {'cpu x':>6} {'peak MB':>9} {'delta MB':>9} "
+            f"{'quality':>8} {'diff':>5} {'phash':>17} {'dist':>5}"
+        )
+        print(header)
+        print("-" * len(header))
+        modes = (("baseline", None), ("full", 0), (f"max {args.max_side}", args.max_side))
+        for path in images:
+            baseline = full_hash = None
+            for label, max_side in modes:
+                r = _measure(path, max_side, args.repeat)
+                baseline = baseline or r
+                # Hamming distance to the full-resolution hash shows pHash stability
+                full_hash = full_hash or r["phash"]
+                distance = compare_phash(full_hash, r["phash"]) if r["phash"] else "-"
+                diff = r["quality_score"] - baseline["quality_score"]
+                print(
+                    f"{os.path.basename(path)[:32]:<32} {label:<12} {r['cpu_ms']:>9.1f} "
+                    f"{r['cpu_ms'] / baseline['cpu_ms']:>6.2f} {r['peak_rss_mb']:>9.1f} "
+                    f"{r['rss_delta_mb']:>9.1f} {r['quality_score']:>8} {diff:>+5} "
+                    f"{str(r['phash']):>17} {distance:>5}"
+                )
+                if max_side is not None and abs(diff) > args.max_quality_diff:
+                    drifted.append((path, label, baseline["quality_score"], r["quality_score"]))
+
+    for path, label, baseline_score, score in drifted:
+        print(
+            f"FAIL {os.path.basename(path)}: quality {baseline_score} from compute_quality_score, "
+            f"{score} from analyze_image ({label})"
+        )
+    if drifted:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Compare the per-user daily claim counters with the claims table.
+
+Lists every (user, day) whose counter differs from the number of claims the
+user created that UTC day. With --repair the differing counters are
+rewritten from the claims table.
+
+Usage:
+    python -m scripts.check_claim_counters [--limit 50] [--repair]
+"""
+
+import argparse
+import sys
+
+from app.db.session import SessionLocal
+from app.services.claim_stats_service import find_counter_mismatches, repair_counters
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check the per-user daily claim counters")
+    parser.add_argument("--limit", type=int, default=50, help="Mismatches to list")
+    parser.add_argument("--repair", action="store_true", help="Rewrite the counters that differ")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.repair:
+            print(f"Repaired {repair_counters(db)} counters")
+            return
+
+        mismatches = find_counter_mismatches(db, args.limit)
+        for row in mismatches:
+            print(f"{row.user_id} {row.day} counted {row.counted}, actual {row.actual}")
+        if not mismatches:
+            print("OK: counters match the claims table")
+            return
+        print(f"{len(mismatches)} mismatches shown (limit {args.limit})")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Local harness for the file delivery modes.
+
+Creates a throwaway owner, a second user and one stored document in the
+configured database and storage, calls the files endpoints in-process for
+each FILE_DELIVERY_MODE and checks the response headers and access control,
+then removes everything it created.
+
+Usage:
+    python -m scripts.check_file_delivery
+"""
+
+import asyncio
+import hashlib
+import sys
+import uuid
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.db.session import SessionLocal
+from app.main import app
+from app.models.claim import Claim
+from app.models.document import Document
+from app.models.document_blob import DocumentBlob
+from app.models.policy import Policy
+from app.models.user import User
+from app.storage import get_storage, storage_key
+from app.utils.file_storage import blob_storage_path
+from app.utils.security import create_access_token, hash_password
+
+CONTENT = b"%PDF-1.4\n% file delivery harness\n" + bytes(range(256)) * 64
+
+
+async def _call(path: str, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+    """Minimal in-process ASGI GET request."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("127.0.0.1", 0),
+        "server": ("testserver", 80),
+    }
+    messages: List[dict] = []
+    request_sent = False
+    response_done = asyncio.Event()
+
+    async def receive() -> dict:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Streaming responses listen for a disconnect; report one once the body is sent
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        messages.append(message)
+        if message["type"] == "http.response.body" and not message.get("more_body", False):
+            response_done.set()
+
+    await app(scope, receive, send)
+    start = next(m for m in messages if m["type"] == "http.response.start")
+    body = b"".join(m.get("body", b"") for m in messages if m["type"] == "http.response.body")
+    response_headers = {k.decode().lower(): v.decode() for k, v in start["headers"]}
+    return start["status"], response_headers, body
+
+
+def _get(path: str, token: Optional[str] = None, **extra: str) -> Tuple[int, Dict[str, str], bytes]:
+    headers = dict(extra)
+    if token:
+        headers["authorization"] = f"Bearer {token}"
+    return asyncio.run(_call(path, headers))
+
+
+def _create_fixtures(db) -> Tuple[User, User, Document]:
+    owner = User(name="Delivery Harness", phone=f"9{uuid.uuid4().int % 10**9:09d}", password_hash=hash_password("harness-pass"))
+    other = User(name="Delivery Harness Other", phone=f"8{uuid.uuid4().int % 10**9:09d}", password_hash=hash_password("harness-pass"))
+    db.add_all([owner, other])
+    db.flush()
+
+    policy = Policy(
+        user_id=owner.id,
+        policy_number=f"HARNESS-{uuid.uuid4().hex[:10]}",
+        policy_type="health",
+        insurer_name="Harness",
+        sum_insured=1000,
+        start_date=date(2020, 1, 1),
+        end_date=date(2099, 1, 1)
+    )
+    db.add(policy)
+    db.flush()
+
+    claim = Claim(
+        claim_number=f"HARNESS-{uuid.uuid4().hex[:10]}",
+        user_id=owner.id,
+        policy_id=policy.id,
+        claim_type="health",
+        incident_date=datetime.now(timezone.utc),
+        claimed_amount=1,
+        status="DRAFT"
+    )
+    db.add(claim)
+    db.flush()
+
+    sha256 = hashlib.sha256(CONTENT).hexdigest()
+    file_path = blob_storage_path(sha256, ".pdf")
+    get_storage().put(storage_key(file_path), CONTENT, "application/pdf")
+    if db.get(DocumentBlob, sha256) is None:
+        db.add(DocumentBlob(sha256=sha256, storage_path=file_path, size=len(CONTENT), ref_count=0))
+        db.flush()
+    blob = db.get(DocumentBlob, sha256)
+    blob.ref_count += 1
+
+    document = Document(
+        claim_id=claim.id,
+        uploaded_by_user_id=owner.id,
+        document_type="hospital_bill",
+        file_name="harness.pdf",
+        file_path=blob.storage_path,
+        mime_type="application/pdf",
+        file_size=len(CONTENT),
+        content_sha256=sha256,
+        quality_score=50
+    )
+    db.add(document)
+    db.commit()
+    return owner, other, document
+
+
+def _cleanup(db, owner: User, other: User, document: Document) -> None:
+    claim = db.get(Claim, document.claim_id)
+    policy = db.get(Policy, claim.policy_id)
+    blob = db.get(DocumentBlob, document.content_sha256)
+    db.delete(document)
+    db.flush()
+    blob.ref_count -= 1
+    if blob.ref_count <= 0:
+        db.delete(blob)
+        get_storage().delete(storage_key(blob.storage_path))
+    for row in (claim, policy, owner, other):
+        db.delete(row)
+        db.flush()
+    db.commit()
+
+
+def main() -> int:
+    db = SessionLocal()
+    owner, other, document = _create_fixtures(db)
+    owner_token = create_access_token({"sub": str(owner.id)})
+    other_token = create_access_token({"sub": str(other.id)})
+    local = get_storage().local_path(storage_key(document.file_path)) is not None
+
+    prefix = f"{settings.API_PREFIX}/files/files"
+    urls = [f"{prefix}/{document.id}/view", f"{prefix}/{document.id}/download", f"{prefix}/{document.file_path}"]
+    failures = 0
+
+    def check(label: str, ok: bool) -> None:
+        nonlocal failures
+        failures += 0 if ok else 1
+        print(f"  [{'PASS' if ok else 'FAIL'}] {label}")
+
+    original_mode = settings.FILE_DELIVERY_MODE
+    try:
+        for mode in ("app", "x-accel", "x-sendfile"):
+            settings.FILE_DELIVERY_MODE = mode
+            proxied = mode != "app" and local
+            print(f"FILE_DELIVERY_MODE={mode}")
+            for url in urls:
+                status_code, headers, body = _get(url, owner_token)
+                check(f"owner {url.rsplit('/', 1)[-1]}: 200", status_code == 200)
+                check("  ETag is the content hash", headers.get("etag") == f'"{document.content_sha256}"')
+                if proxied:
+                    header = "x-accel-redirect" if mode == "x-accel" else "x-sendfile"
+                    check(f"  {header} set, empty body", header in headers and body == b"")
+                else:
+                    check("  body sent by the app", body == CONTENT)
+
+            status_code, headers, _ = _get(urls[0], owner_token, **{"if-none-match": f'"{document.content_sha256}"'})
+            check("owner revalidation: 304", status_code == 304)
+
+            for url in urls:
+                status_code, headers, body = _get(url, other_token)
+                check(
+                    f"other user {url.rsplit('/', 1)[-1]}: denied, nothing delegated",
+                    status_code in (403, 404) and "x-accel-redirect" not in headers
+                    and "x-sendfile" not in headers and CONTENT not in body
+                )
+
+            status_code, headers, _ = _get(urls[0])
+            check("anonymous: 401", status_code == 401 and "x-accel-redirect" not in headers)
+    finally:
+        settings.FILE_DELIVERY_MODE = original_mode
+        _cleanup(db, owner, other, document)
+        db.close()
+
+    print(f"\n{'All checks passed' if not failures else f'{failures} check(s) failed'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""
+Validate a fraud rules file before putting it live, and preview its effect.
+
+The file is compiled exactly as the API would compile it. With --claims, the
+most recent claims are scored with both the active rules (FRAUD_RULES_FILE or
+the bundled file) and the candidate, and every claim whose score changes is
+listed. Features are loaded once per claim and shared by both rule sets.
+
+Usage:
+    python -m scripts.check_fraud_rules rules.json [--claims 200]
+"""
+
+import argparse
+import sys
+
+from app.db.session import SessionLocal
+from app.models.claim import Claim
+from app.services.fraud_rules import RuleConfigError, load_rules_file, rules_file
+from app.services.fraud_service import fraud_feature_values, load_fraud_features
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Validate and preview a fraud rules file")
+    parser.add_argument("rules", help="Candidate rules file (JSON)")
+    parser.add_argument("--claims", type=int, default=0, help="Score this many recent claims with both rule sets")
+    args = parser.parse_args()
+
+    try:
+        candidate = load_rules_file(args.rules)
+    except RuleConfigError as e:
+        print(f"Invalid: {str(e)}")
+        sys.exit(1)
+    print(f"OK: {len(candidate.rules)} rules ({', '.join(rule.id for rule in candidate.rules)})")
+
+    if args.claims <= 0:
+        return
+
+    active = load_rules_file(rules_file())
+    db = SessionLocal()
+    try:
+        claims = db.query(Claim).order_by(Claim.created_at.desc()).limit(args.claims).all()
+        changed = 0
+        for claim in claims:
+            features = fraud_feature_values(claim, load_fraud_features(db, claim))
+            before, _ = active.evaluate(features)
+            after, signals = candidate.evaluate(features)
+            if before != after:
+                changed += 1
+                fired = ", ".join(signal["type"] for signal in signals) or "-"
+                print(f"{claim.claim_number:<20} {before:>4} -> {after:<4} {fired}")
+        print(f"{changed} of {len(claims)} claims change score")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Contract check for the S3 storage backend.
+
+Runs put, put_file, get, stream (whole object and byte ranges), stat, exists,
+open_local, delete and presign through S3Storage and checks the results. By
+default the backend talks to FakeS3Client, an in-process stand-in for the
+boto3 S3 client API that S3Storage uses; with --endpoint-url the same checks
+run against a real S3-compatible server such as MinIO (boto3 required, the
+bucket must exist).
+
+Usage:
+    python -m scripts.check_s3_storage [--prefix uploads]
+    python -m scripts.check_s3_storage --endpoint-url http://localhost:9000 --bucket smartclaim \\
+        --access-key minioadmin --secret-key minioadmin
+"""
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import quote
+
+from app.storage import S3Storage, StorageNotFound
+
+CONTENT = bytes(range(256)) * 40  # 10240 bytes, every offset distinguishable
+
+
+class FakeClientError(Exception):
+    """Shaped like botocore's ClientError: the error code is in response["Error"]["Code"]."""
+
+    def __init__(self, code: str, operation: str):
+        super().__init__(f"An error occurred ({code}) when calling the {operation} operation")
+        self.response = {"Error": {"Code": code}}
+
+
+class FakeS3Client:
+    """In-memory subset of the boto3 S3 client used by S3Storage."""
+
+    def __init__(self):
+        # (bucket, key) -> (data, content type, last modified)
+        self.objects: Dict[Tuple[str, str], Tuple[bytes, Optional[str], datetime]] = {}
+
+    def _object(self, bucket: str, key: str, operation: str, code: str = "NoSuchKey"):
+        try:
+            return self.objects[(bucket, key)]
+        except KeyError:
+            raise FakeClientError(code, operation)
+
+    def put_object(self, Bucket: str, Key: str, Body: Any, ContentType: Optional[str] = None) -> dict:
+        data = Body if isinstance(Body, (bytes, bytearray)) else Body.read()
+        self.objects[(Bucket, Key)] = (bytes(data), ContentType, datetime.now(timezone.utc))
+        return {}
+
+    def upload_file(self, Filename: str, Bucket: str, Key: str, ExtraArgs: Optional[dict] = None) -> None:
+        with open(Filename, "rb") as f:
+            self.put_object(Bucket=Bucket, Key=Key, Body=f.read(), **(ExtraArgs or {}))
+
+    def get_object(self, Bucket: str, Key: str, Range: Optional[str] = None) -> dict:
+        data, content_type, modified = self._object(Bucket, Key, "GetObject")
+        if Range:
+            first, last = Range[len("bytes="):].split("-")
+            data = data[int(first):int(last) + 1 if last else None]
+        return {
+            "Body": io.BytesIO(data),
+            "ContentLength": len(data),
+            "ContentType": content_type,
+            "LastModified": modified
+        }
+
+    def head_object(self, Bucket: str, Key: str) -> dict:
+        # HeadObject has no body, so S3 reports a bare 404
+        data, content_type, modified = self._object(Bucket, Key, "HeadObject", code="404")
+        return {"ContentLength": len(data), "ContentType": content_type, "LastModified": modified}
+
+    def delete_object(self, Bucket: str, Key: str) -> dict:
+        self.objects.pop((Bucket, Key), None)
+        return {}
+
+    def generate_presigned_url(self, ClientMethod: str, Params: dict, ExpiresIn: int = 3600) -> str:
+        url = f"https://{Params['Bucket']}.s3.fake/{quote(Params['Key'])}?X-Amz-Expires={ExpiresIn}"
+        if "ResponseContentDisposition" in Params:
+            url += f"&response-content-disposition={quote(Params['ResponseContentDisposition'])}"
+        return url
+
+
+def run_checks(storage: S3Storage, fake: Optional[FakeS3Client]) -> int:
+    """Exercise storage and return the number of failed checks."""
+    failures = 0
+
+    def check(label: str, ok: bool) -> None:
+        nonlocal failures
+        failures += 0 if ok else 1
+        print(f"  [{'PASS' if ok else 'FAIL'}] {label}")
+
+    key = "blobs/ab/check-s3-storage.bin"
+    file_key = "blobs/cd/check-s3-storage-file.bin"
+    missing = "blobs/ef/check-s3-storage-missing.bin"
+    size = len(CONTENT)
+
+    storage.put(key, CONTENT, content_type="application/octet-stream")
+    check("put + get returns the bytes", storage.get(key) == CONTENT)
+    if fake is not None:
+        stored_key = f"{storage.prefix}/{key}" if storage.prefix else key
+        check("object stored under the prefixed key", (storage.bucket, stored_key) in fake.objects)
+
+    storage.put(key, io.BytesIO(CONTENT[::-1]))
+    check("put of a file object replaces the object", storage.get(key) == CONTENT[::-1])
+    storage.put(key, CONTENT)
+
+    fd, local_path = tempfile.mkstemp()
+    with os.fdopen(fd, "wb") as f:
+        f.write(CONTENT)
+    storage.put_file(file_key, local_path, content_type="application/pdf")
+    check("put_file uploads the file", storage.get(file_key) == CONTENT)
+    check("put_file consumes the local file", not os.path.exists(local_path))
+
+    check("stream returns the whole object", b"".join(storage.stream(key, chunk_size=1000)) == CONTENT)
+    check("stream yields chunk_size chunks", [len(c) for c in storage.stream(key, chunk_size=4096)] == [4096, 4096, 2048])
+    check("stream range start-end (inclusive)", b"".join(storage.stream(key, 100, 199)) == CONTENT[100:200])
+    check("stream range start- (open end)", b"".join(storage.stream(key, size - 10)) == CONTENT[-10:])
+    check("stream range 0-0 (first byte)", b"".join(storage.stream(key, 0, 0)) == CONTENT[:1])
+    check("stream range ending at the last byte", b"".join(storage.stream(key, 5000, size - 1)) == CONTENT[5000:])
+
+    stat = storage.stat(key)
+    check("stat size", stat is not None and stat.size == size)
+    check("stat modified time", stat is not None and stat.modified is not None)
+    check("stat of a missing key is None", storage.stat(missing) is None)
+    check("exists", storage.exists(key) and not storage.exists(missing))
+
+    try:
+        storage.get(missing)
+        check("get of a missing key raises StorageNotFound", False)
+    except StorageNotFound:
+        check("get of a missing key raises StorageNotFound", True)
+    try:
+        list(storage.stream(missing))
+        check("stream of a missing key raises StorageNotFound", False)
+    except StorageNotFound:
+        check("stream of a missing key raises StorageNotFound", True)
+
+    with storage.open_local(key) as path:
+        with open(path, "rb") as f:
+            check("open_local downloads to a temporary file", f.read() == CONTENT)
+    check("open_local removes the temporary file", not os.path.exists(path))
+
+    url = storage.presign(key, expires_in=120, filename="bill.pdf", disposition="attachment")
+    check("presign returns a URL", bool(url) and url.startswith("http"))
+    check("presign URL names the object", url is not None and quote(key.rsplit("/", 1)[-1]) in url)
+    check("presign URL carries the disposition", url is not None and "attachment" in url and "bill.pdf" in url)
+
+    storage.delete(key)
+    storage.delete(file_key)
+    check("delete removes the object", storage.stat(key) is None and storage.stat(file_key) is None)
+    storage.delete(missing)
+    check("delete of a missing key is not an error", True)
+
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check S3Storage against a fake client or an S3-compatible server")
+    parser.add_argument("--endpoint-url", help="S3-compatible server (e.g. MinIO); default is the in-process fake")
+    parser.add_argument("--bucket", default="smartclaim-check", help="Bucket to use (must exist on a real server)")
+    parser.add_argument("--prefix", default="uploads", help="Key prefix inside the bucket")
+    parser.add_argument("--region", default=None)
+    parser.add_argument("--access-key", default=None)
+    parser.add_argument("--secret-key", default=None)
+    args = parser.parse_args()
+
+    if args.endpoint_url:
+        fake = None
+        storage = S3Storage(
+            bucket=args.bucket,
+            prefix=args.prefix,
+            endpoint_url=args.endpoint_url,
+            region_name=args.region,
+            access_key_id=args.access_key,
+            secret_access_key=args.secret_key
+        )
+        print(f"S3Storage against {args.endpoint_url} (bucket {args.bucket}, prefix {args.prefix!r})")
+    else:
+        fake = FakeS3Client()
+        storage = S3Storage(bucket=args.bucket, prefix=args.prefix, client=fake)
+        print(f"S3Storage against the in-process fake client (prefix {args.prefix!r})")
+
+    failures = run_checks(storage, fake)
+    print(f"{failures} check(s) failed" if failures else "All checks passed")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Offline near-duplicate audit over every stored document pHash.
+
+Usage:
+    python -m scripts.find_duplicate_clusters [--threshold 5] [--chunk-size 2048]
+"""
+
+import argparse
+import time
+
+from app.db.session import SessionLocal
+from app.services.duplicate_service import find_duplicate_clusters
+from app.config import settings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Find clusters of near-duplicate documents")
+    parser.add_argument("--threshold", type=int, default=settings.PHASH_DUPLICATE_THRESHOLD,
+                        help="Maximum Hamming distance between duplicates")
+    parser.add_argument("--chunk-size", type=int, default=2048,
+                        help="Block size for the all-pairs scan")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        clusters = find_duplicate_clusters(db, args.threshold, args.chunk_size)
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+
+    for members in sorted(clusters, key=len, reverse=True):
+        print(f"{len(members)} documents: original {members[0]}")
+        for doc_id in members[1:]:
+            print(f"    {doc_id}")
+
+    print(f"\n{len(clusters)} clusters found in {elapsed:.1f}s (threshold {args.threshold})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Re-score fraud for all open claims (or the given statuses) with the current
+fraud rules, and print a summary of the score changes.
+
+Usage:
+    python -m scripts.rescore_fraud [--status SUBMITTED ...] [--chunk-size 1000] [--workers 4] [--dry-run]
+"""
+
+import argparse
+import json
+
+from app.services.fraud_rescore_service import rescore_claims
+from app.utils.constants import OPEN_CLAIM_STATUSES
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk fraud re-scoring")
+    parser.add_argument("--status", action="append", dest="statuses", help="Claim status to include (repeatable, default: open claims)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Claims per chunk (default FRAUD_RESCORE_CHUNK_SIZE)")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel chunks (default FRAUD_RESCORE_WORKERS)")
+    parser.add_argument("--dry-run", action="store_true", help="Report the changes without writing them")
+    args = parser.parse_args()
+
+    summary = rescore_claims(
+        args.statuses or OPEN_CLAIM_STATUSES,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        dry_run=args.dry_run
+    )
+    print(json.dumps(summary.to_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()